@@ -0,0 +1,65 @@
+"""
+Times completing item names in a 50,000 item keychain: the first
+completion, which builds the name cache from contents.js, later ones
+answered from the cache, and, for comparison, loading a Keychain and
+filtering its names. Finally times a whole `bin/1pass --complete` run.
+
+    python -m benchmarks.complete_benchmark
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+
+from onepassword.keychain import Keychain
+from onepassword.name_cache import NameCache
+
+from benchmarks.vault import item_rows, write_keychain
+
+ITEMS = 50000
+RUNS = 20
+SCRIPT = os.path.join(os.path.dirname(__file__), "..", "bin", "1pass")
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, "complete.agilekeychain")
+        rows = item_rows(ITEMS)
+        write_keychain(path, "badger", 1000, rows=rows)
+        run(path, rows[ITEMS // 2][2][0:3], os.path.join(directory, "cache"))
+    finally:
+        shutil.rmtree(directory)
+
+
+def keychain_complete(path, prefix):
+    prefix = prefix.lower()
+    names = Keychain(path)._items.names
+    return sorted(name for name in names if name.lower().startswith(prefix))
+
+
+def run(path, prefix, cache_directory):
+    cache = NameCache(cache_directory)
+    timer = timeit.Timer(lambda: cache.complete(path, prefix))
+    print("prefix %r: %d names" % (prefix, len(cache.complete(path, prefix))))
+    shutil.rmtree(cache_directory)
+    print("%-16s %9.1fms" % ("first completion",
+                             timer.timeit(number=1) * 1000))
+    print("%-16s %9.1fms" % ("cached",
+                             min(timer.repeat(repeat=RUNS, number=1)) * 1000))
+    timer = timeit.Timer(lambda: keychain_complete(path, prefix))
+    print("%-16s %9.1fms" % ("Keychain",
+                             min(timer.repeat(repeat=3, number=1)) * 1000))
+
+    environment = dict(os.environ, XDG_CACHE_HOME=cache_directory)
+    command = [sys.executable, SCRIPT, "--path", path, "--complete", prefix]
+    timer = timeit.Timer(lambda: subprocess.check_call(
+        command, env=environment, stdout=open(os.devnull, "w")))
+    print("%-16s %9.1fms" % ("bin/1pass",
+                             min(timer.repeat(repeat=RUNS, number=1)) * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Times 10,000 item decryptions with the original OpenSSL key derivation
+loop, the rewritten derivation, and the memoized derivation, both for one
+item decrypted repeatedly and for 10,000 different items. Then compares
+the throughput of EncryptionKey.decrypt with EncryptionKey.decrypt_many,
+and finding a password in a decrypted item that has 100KB of notes with
+json.loads and with find_field, with the notes before and after the fields.
+
+    python -m benchmarks.decrypt_benchmark
+"""
+from hashlib import md5
+import json
+import timeit
+
+from onepassword.encryption_key import EncryptionKey
+from onepassword.fields import find_field
+
+from benchmarks.vault import encryption_key, openssl_encrypt
+
+DECRYPTS = 10000
+PAYLOAD = b'{"fields":[{"designation":"password","value":"123456"}]}'
+LARGE_PAYLOAD = b'{"notesPlain":"%s"}' % (b"x" * 4000)
+FIELDS = '"fields":[{"designation":"password","value":"123456"}]'
+NOTES = '"notesPlain":"%s"' % ("a \\\"quoted\\\" note\\n" * 6000)
+
+
+def original_derive_openssl(key, salt):
+    key = key[0:-16]
+    key_and_iv = b""
+    prev = b""
+    while len(key_and_iv) < 32:
+        prev = md5(prev + key + salt).digest()
+        key_and_iv += prev
+    return (
+        key_and_iv[0:16],
+        key_and_iv[16:],
+    )
+
+
+def unlocked_key():
+    _, definition = encryption_key("badger", 1000)
+    key = EncryptionKey(**definition)
+    key.unlock("badger")
+    return key
+
+
+def derivation_timings(key):
+    material = key._decrypted_key[0:-16]
+    same_item = [openssl_encrypt(material, PAYLOAD)] * DECRYPTS
+    different_items = [openssl_encrypt(material, PAYLOAD)
+                       for _ in range(DECRYPTS)]
+
+    derivations = (
+        ("original loop", original_derive_openssl),
+        ("rewritten", key._derive_openssl_uncached),
+        ("memoized", key._derive_openssl),
+    )
+
+    print("%-16s %14s %14s" % ("", "same item", "different items"))
+    for label, derive in derivations:
+        key._derive_openssl = derive
+        timings = []
+        for payloads in (same_item, different_items):
+            key._openssl_keys.clear()
+            timer = timeit.Timer(lambda: [key.decrypt(p) for p in payloads])
+            timings.append(min(timer.repeat(repeat=3, number=1)))
+        print("%-16s %13.3fs %13.3fs" % ((label,) + tuple(timings)))
+    del key._derive_openssl
+
+
+def throughput(key):
+    material = key._decrypted_key[0:-16]
+    payloads = [openssl_encrypt(material, LARGE_PAYLOAD)
+                for _ in range(DECRYPTS)]
+    megabytes = len(LARGE_PAYLOAD) * DECRYPTS / 1e6
+
+    print("%-16s %14s" % ("", "throughput"))
+    for label, decrypt_all in (
+        ("decrypt", lambda: [key.decrypt(p) for p in payloads]),
+        ("decrypt_many", lambda: list(key.decrypt_many(payloads))),
+    ):
+        elapsed = min(timeit.Timer(decrypt_all).repeat(repeat=3, number=1))
+        print("%-16s %10.1fMB/s" % (label, megabytes / elapsed))
+
+
+def json_password(decrypted_json):
+    for field in json.loads(decrypted_json)["fields"]:
+        if field.get("designation") == "password":
+            return field["value"]
+
+
+def field_extraction():
+    print("%-16s %14s %14s" % ("", "notes first", "fields first"))
+    for label, find in (
+        ("json.loads", json_password),
+        ("find_field", lambda text: find_field(text, "password")),
+    ):
+        timings = []
+        for text in ("{%s,%s}" % (NOTES, FIELDS), "{%s,%s}" % (FIELDS, NOTES)):
+            assert find(text) == "123456"
+            timer = timeit.Timer(lambda: find(text))
+            timings.append(min(timer.repeat(repeat=3, number=1000)))
+        print("%-16s %12.3fms %12.3fms" % (
+            (label,) + tuple(timing for timing in timings)))
+
+
+def main():
+    key = unlocked_key()
+    derivation_timings(key)
+    print("")
+    throughput(key)
+    print("")
+    field_extraction()
+
+
+if __name__ == "__main__":
+    main()
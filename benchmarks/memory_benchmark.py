@@ -0,0 +1,80 @@
+"""
+Measures the memory and time taken to load a synthetic 100,000 item
+contents.js, compared with building an object for every row, and with
+loading the item table cached by a previous run.
+
+    python -m benchmarks.memory_benchmark
+"""
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from onepassword.keychain import Keychain, KeychainItem
+from onepassword.table_cache import ItemTableCache
+
+from benchmarks.vault import item_rows, write_keychain
+
+ITEMS = 100000
+TOMBSTONES = 10000
+
+
+def measure(function):
+    tracemalloc.start()
+    start = time.time()
+    result = function()
+    elapsed = time.time() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current, peak
+
+
+class UnslottedItem(object):
+    def __init__(self, identifier, name, path, type):
+        self.identifier = identifier
+        self.name = name
+        self.password = None
+        self._path = path
+        self._type = type
+
+
+def object_per_row(path, item_class):
+    with open(os.path.join(path, "data", "default", "contents.js")) as f:
+        rows = json.load(f)
+    return dict(
+        (row[2], item_class(row[0], row[2], path, row[1]))
+        for row in rows
+    )
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, "memory.agilekeychain")
+        rows = item_rows(ITEMS)
+        for row in item_rows(TOMBSTONES, seed=1):
+            row[1:4] = ["system.Tombstone", "", ""]
+            rows.append(row)
+        write_keychain(path, "badger", 1000, rows=rows)
+        del rows
+        table_cache = ItemTableCache(os.path.join(directory, "cache"))
+        Keychain(path, table_cache=table_cache)
+
+        print("%-16s %10s %12s %12s" % ("", "time", "retained", "peak"))
+        for label, function in (
+            ("unslotted items", lambda: object_per_row(path, UnslottedItem)),
+            ("slotted items", lambda: object_per_row(path, KeychainItem)),
+            ("Keychain", lambda: Keychain(path)),
+            ("cached Keychain", lambda: Keychain(path, table_cache=table_cache)),
+        ):
+            _, elapsed, current, peak = measure(function)
+            print("%-16s %9.3fs %10.1fMB %10.1fMB" % (
+                label, elapsed, current / 1e6, peak / 1e6))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
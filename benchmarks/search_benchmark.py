@@ -0,0 +1,88 @@
+"""
+Compares fuzzy matching by scoring every item name with matching through
+the trigram ``SearchIndex``, over a synthetic 50,000 item contents.js, and
+times finding items by URL through the ``DomainIndex``.
+
+    python -m benchmarks.search_benchmark
+"""
+import os
+import shutil
+import tempfile
+import timeit
+
+from fuzzywuzzy import process
+
+from onepassword.domains import DomainIndex
+from onepassword.keychain import Keychain
+
+from benchmarks.vault import item_rows, write_keychain
+
+ITEMS = 50000
+QUERIES = (
+    ("Google: personal 12345", 100),
+    ("gthub deploy 4242", 70),
+    ("stripe billing", 70),
+)
+URLS = (
+    "https://github.example.com/login",
+    "https://eu.api.stripe.example.com/",
+    "https://example.net/",
+)
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, "search.agilekeychain")
+        write_keychain(path, "badger", 1000, rows=item_rows(ITEMS))
+        keychain = Keychain(path)
+        run(keychain)
+        print("")
+        run_urls(keychain)
+    finally:
+        shutil.rmtree(directory)
+
+
+def run(keychain):
+    names = list(keychain._items.names)
+    build = timeit.Timer(lambda: keychain._load_item_list() or
+                         keychain._search_index)
+    print("index build (including load): %.3fs" %
+          min(build.repeat(repeat=3, number=1)))
+
+    print("%-24s %10s %10s  %s" % ("query", "scan", "index", "same match"))
+    for query, threshold in QUERIES:
+        scan_match = process.extractOne(query, names,
+                                        score_cutoff=threshold - 1)
+        index_match = keychain._search_index.best_match(
+            query, score_cutoff=threshold - 1)
+        scan = timeit.Timer(lambda: process.extractOne(
+            query, names, score_cutoff=threshold - 1))
+        index = timeit.Timer(lambda: keychain._search_index.best_match(
+            query, score_cutoff=threshold - 1))
+        print("%-24s %9.3fs %9.3fs  %s" % (
+            query,
+            min(scan.repeat(repeat=1, number=1)),
+            min(index.repeat(repeat=3, number=1)),
+            scan_match == index_match,
+        ))
+
+
+def run_urls(keychain):
+    domains = keychain._items.domains
+    build = timeit.Timer(lambda: DomainIndex(domains))
+    print("domain index build: %.3fs" % min(build.repeat(repeat=3, number=1)))
+
+    index = DomainIndex(domains)
+    print("%-36s %10s %8s" % ("url", "lookup", "matches"))
+    for url in URLS:
+        lookup = timeit.Timer(lambda: index.positions(url))
+        print("%-36s %8.1fus %8d" % (
+            url,
+            min(lookup.repeat(repeat=3, number=1000)) * 1000,
+            len(index.positions(url)),
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Measures how many lookups a second ``1pass serve`` answers over one kept
+alive connection, one item per request and in batches, against a synthetic
+keychain.
+
+    python -m benchmarks.server_benchmark
+"""
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import timeit
+# Python 2+3 compatibilty
+try:
+    from http.client import HTTPConnection
+except ImportError:
+    from httplib import HTTPConnection
+
+from onepassword.keychain import Keychain
+from onepassword.server import SecretServer
+
+from benchmarks.vault import item_rows, write_keychain
+
+ITEMS = 1000
+REQUESTS = 500
+BATCH_SIZE = 50
+
+
+class UnixHTTPConnection(HTTPConnection):
+    def __init__(self, socket_path):
+        HTTPConnection.__init__(self, "localhost")
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, "server.agilekeychain")
+        write_keychain(path, "badger", 1000, rows=item_rows(ITEMS))
+        keychain = Keychain(path)
+        keychain.unlock("badger")
+        run(keychain, os.path.join(directory, "server.sock"))
+    finally:
+        shutil.rmtree(directory)
+
+
+def run(keychain, socket_path):
+    # The synthetic items have no data files, so time the protocol and the
+    # name lookup rather than decryption.
+    keychain.item = lambda name, fuzzy_threshold=100: None
+    names = list(keychain._items.names)
+
+    server = SecretServer(keychain, socket_path=socket_path)
+    server.listen()
+    thread = threading.Thread(target=server.serve)
+    thread.start()
+    connection = UnixHTTPConnection(socket_path)
+    try:
+        def single():
+            for name in names[0:REQUESTS]:
+                connection.request("POST", "/item", json.dumps({"name": name}))
+                connection.getresponse().read()
+
+        def batched():
+            for start in range(0, REQUESTS, BATCH_SIZE):
+                connection.request("POST", "/batch", json.dumps({
+                    "names": names[start:start + BATCH_SIZE],
+                }))
+                connection.getresponse().read()
+
+        for label, function in (("single", single),
+                                ("batch of %d" % BATCH_SIZE, batched)):
+            seconds = min(timeit.Timer(function).repeat(repeat=3, number=1))
+            print("%-12s %8.0f lookups/s" % (label, REQUESTS / seconds))
+
+        connection.request("GET", "/stats")
+        stats = json.loads(connection.getresponse().read().decode("utf-8"))
+        print("server p50 %.3fms, p99 %.3fms" % (
+            stats["latency_ms"]["p50"], stats["latency_ms"]["p99"]))
+    finally:
+        connection.close()
+        server.shutdown()
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Measures how long bin/1pass takes to start, and which imports it spends
+that time on.
+
+    python -m benchmarks.startup_benchmark
+"""
+import os
+import subprocess
+import sys
+import timeit
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+SCRIPT = os.path.join(ROOT, "bin", "1pass")
+RUNS = 20
+
+
+def cold_start():
+    subprocess.check_call(
+        [sys.executable, SCRIPT, "--help"],
+        stdout=open(os.devnull, "w"),
+    )
+
+
+def slowest_imports(count=10):
+    output = subprocess.check_output(
+        [sys.executable, "-X", "importtime", "-c", "import onepassword.cli"],
+        cwd=ROOT,
+        stderr=subprocess.STDOUT,
+    ).decode("utf-8")
+    timings = []
+    for line in output.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, module = line.split("|")
+            if cumulative.strip().isdigit():
+                timings.append((int(cumulative), module.rstrip()))
+    return sorted(timings, reverse=True)[:count]
+
+
+def main():
+    timer = timeit.Timer(cold_start)
+    print("bin/1pass --help: %.1fms (best of %d)" % (
+        min(timer.repeat(repeat=RUNS, number=1)) * 1000, RUNS))
+    print("slowest imports of onepassword.cli (cumulative):")
+    for microseconds, module in slowest_imports():
+        print("%8.1fms %s" % (microseconds / 1000.0, module))
+
+
+if __name__ == "__main__":
+    main()
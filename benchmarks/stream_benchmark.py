@@ -0,0 +1,71 @@
+"""
+Compares finding one item by loading all of a 100,000 item contents.js with
+streaming it row by row until the item turns up, for items near the start,
+middle and end of the list and for a name that isn't there. Memory is the
+peak allocated while finding the item, as reported by tracemalloc.
+
+    python -m benchmarks.stream_benchmark
+"""
+import os
+import shutil
+import tempfile
+import timeit
+import tracemalloc
+
+from onepassword.keychain import Keychain
+
+from benchmarks.vault import item_rows, write_keychain
+
+ITEMS = 100000
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, "stream.agilekeychain")
+        rows = item_rows(ITEMS)
+        write_keychain(path, "badger", 1000, rows=rows)
+        run(path, rows)
+    finally:
+        shutil.rmtree(directory)
+
+
+def find(path, name, stream):
+    keychain = Keychain(path, stream_items=stream)
+    if stream:
+        return keychain._stream_row(name)
+    return keychain._items.position(name)
+
+
+def peak_memory(function):
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(path, rows):
+    lookups = (
+        ("first", rows[0][2]),
+        ("middle", rows[len(rows) // 2][2]),
+        ("last", rows[-1][2]),
+        ("missing", "not an item"),
+    )
+    print("%-10s %10s %10s %10s %10s" % (
+        "", "load", "stream", "load mem", "stream mem"))
+    for label, name in lookups:
+        timings = []
+        memory = []
+        for stream in (False, True):
+            timer = timeit.Timer(lambda: find(path, name, stream))
+            timings.append(min(timer.repeat(repeat=3, number=1)))
+            memory.append(peak_memory(lambda: find(path, name, stream)))
+        print("%-10s %9.1fms %9.1fms %8.1fMB %8.1fMB" % (
+            (label,) + tuple(t * 1000 for t in timings) +
+            tuple(m / 1e6 for m in memory)))
+
+
+if __name__ == "__main__":
+    main()
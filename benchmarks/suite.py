@@ -0,0 +1,165 @@
+"""
+Times the main keychain operations against synthetic keychains with
+encrypted items, and compares the results with the baseline in
+``benchmarks/baseline.json``:
+
+* ``load``: ``Keychain.__init__`` reading ``encryptionKeys.js`` and
+  ``contents.js``
+* ``unlock``: deriving every encryption key, for each iteration count
+* ``exact item`` and ``fuzzy item``: one ``Keychain.item`` lookup,
+  including decryption
+* ``decrypt all``: ``Keychain.iter_decrypted`` over every item
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --items 1000000 --iterations 1000
+    python -m benchmarks.suite --check
+
+``--save`` replaces the baseline with this run's results, and ``--check``
+exits with a non-zero status if anything is more than ``--tolerance``
+slower than it.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import timeit
+
+from onepassword.keychain import Keychain
+
+from benchmarks.vault import item_rows, write_keychain
+
+PASSWORD = "badger"
+ITEMS = (1000, 10000, 100000)
+ITERATIONS = (1000, 10000, 40000)
+LOOKUPS = 200
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def main(arguments=sys.argv[1:]):
+    arguments = argument_parser().parse_args(arguments)
+    directory = tempfile.mkdtemp()
+    try:
+        results = run(directory, arguments.items, arguments.iterations)
+    finally:
+        shutil.rmtree(directory)
+
+    baseline = load_baseline()
+    regressions = report(results, baseline, arguments.tolerance)
+    if arguments.save:
+        save_baseline(results)
+    if arguments.check and regressions:
+        sys.exit(1)
+
+
+def argument_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("--items", type=integers, default=ITEMS,
+                        help="Comma separated keychain sizes")
+    parser.add_argument("--iterations", type=integers, default=ITERATIONS,
+                        help="Comma separated PBKDF2 iteration counts")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Slowdown over the baseline to report (0.25)")
+    parser.add_argument("--save", action="store_true",
+                        help="Store the results as the new baseline")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit with status 1 if anything regressed")
+    return parser
+
+
+def integers(value):
+    return tuple(int(part) for part in value.split(","))
+
+
+def run(directory, item_counts, iteration_counts):
+    """
+    Returns a dictionary mapping each measurement's name to its best time in
+    seconds.
+    """
+    results = {}
+    for iterations in iteration_counts:
+        path = os.path.join(directory, "unlock-%d.agilekeychain" % iterations)
+        write_keychain(path, PASSWORD, iterations)
+        keychain = Keychain(path)
+        results["unlock %d iterations" % iterations] = best(
+            lambda: keychain.unlock(PASSWORD))
+
+    for count in item_counts:
+        path = os.path.join(directory, "items-%d.agilekeychain" % count)
+        write_keychain(path, PASSWORD, min(iteration_counts),
+                       rows=item_rows(count), items=True)
+        results.update(item_timings(path, count))
+    return results
+
+
+def item_timings(path, count):
+    results = {}
+    results["load %d items" % count] = best(lambda: Keychain(path))
+
+    keychain = Keychain(path)
+    keychain.unlock(PASSWORD)
+    names = keychain._items.names
+    step = max(len(names) // LOOKUPS, 1)
+    exact = names[::step][0:LOOKUPS]
+    # Dropping a character from the service name leaves a close match.
+    fuzzy = [name[1:] for name in exact[0:LOOKUPS // 10]]
+
+    results["exact item %d items" % count] = best(
+        lambda: [keychain.item(name) for name in exact]) / len(exact)
+    results["fuzzy item %d items" % count] = best(
+        lambda: [keychain.item(name, fuzzy_threshold=70) for name in fuzzy],
+        repeat=1) / len(fuzzy)
+    results["decrypt all %d items" % count] = best(
+        lambda: [None for _ in keychain.iter_decrypted()], repeat=1)
+    return results
+
+
+def best(function, repeat=3):
+    return min(timeit.Timer(function).repeat(repeat=repeat, number=1))
+
+
+def report(results, baseline, tolerance):
+    """
+    Prints each result next to its baseline, returning the names of the
+    measurements that are more than ``tolerance`` slower.
+    """
+    regressions = []
+    print("%-28s %12s %12s %8s" % ("", "seconds", "baseline", "ratio"))
+    for name in sorted(results):
+        expected = baseline.get(name)
+        if expected:
+            ratio = results[name] / expected
+            flag = ""
+            if ratio > 1 + tolerance:
+                regressions.append(name)
+                flag = "  slower"
+            print("%-28s %12.6f %12.6f %7.2fx%s" % (
+                name, results[name], expected, ratio, flag))
+        else:
+            print("%-28s %12.6f %12s %8s" % (name, results[name], "-", "-"))
+    return regressions
+
+
+def load_baseline():
+    try:
+        with open(BASELINE_PATH, "r") as f:
+            return json.load(f)["results"]
+    except (IOError, OSError, ValueError, KeyError):
+        return {}
+
+
+def save_baseline(results):
+    baseline = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(BASELINE_PATH, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Compares unlocking a keychain's encryption keys one after another with
+unlocking them concurrently, and loading and unlocking several keychains
+one after another with doing so through a ``FederatedKeychain``.
+
+    python -m benchmarks.unlock_benchmark
+"""
+import os
+import shutil
+import tempfile
+import timeit
+
+from onepassword.federation import FederatedKeychain
+from onepassword.keychain import Keychain
+
+from benchmarks.vault import write_keychain
+
+PASSWORD = "badger"
+ITERATIONS = (1000, 10000, 100000)
+LEVELS = ("SL3", "SL5")
+VAULTS = 3
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        run(directory)
+    finally:
+        shutil.rmtree(directory)
+
+
+def run(directory):
+    print("%10s %10s %10s" % ("iterations", "serial", "parallel"))
+    for iterations in ITERATIONS:
+        path = os.path.join(directory, "%d.agilekeychain" % iterations)
+        write_keychain(path, PASSWORD, iterations, levels=LEVELS)
+        keychain = Keychain(path)
+        timings = []
+        for workers in (1, len(LEVELS)):
+            timer = timeit.Timer(
+                lambda: keychain.unlock(PASSWORD, workers=workers))
+            timings.append(min(timer.repeat(repeat=3, number=1)))
+        print("%10d %9.3fs %9.3fs" % ((iterations,) + tuple(timings)))
+
+    print("")
+    print("%d keychains at %d iterations" % (VAULTS, ITERATIONS[-1]))
+    paths = []
+    for number in range(VAULTS):
+        path = os.path.join(directory, "vault-%d.agilekeychain" % number)
+        write_keychain(path, PASSWORD, ITERATIONS[-1], levels=LEVELS)
+        paths.append(path)
+
+    def serial():
+        for path in paths:
+            Keychain(path).unlock(PASSWORD)
+
+    def federated():
+        FederatedKeychain.load(paths).unlock(PASSWORD)
+
+    for label, function in (("serial", serial), ("federated", federated)):
+        timer = timeit.Timer(function)
+        print("%-10s %9.3fs" % (label, min(timer.repeat(repeat=3, number=1))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Helpers for building synthetic keychains to benchmark against. The
+encryption mirrors what ``EncryptionKey`` expects to decrypt.
+"""
+from base64 import b64encode
+from hashlib import md5, pbkdf2_hmac
+import json
+import os
+import random
+import uuid
+
+from Crypto.Cipher import AES
+
+SALTED_PREFIX = b"Salted__"
+
+SERVICES = (
+    "Google", "Amazon", "GitHub", "Dropbox", "Twitter", "Facebook", "Slack",
+    "Heroku", "Linode", "Netflix", "PayPal", "Stripe", "Mailchimp", "Trello",
+    "Jira", "Confluence", "Postgres", "Redis", "Jenkins", "Sentry",
+)
+QUALIFIERS = (
+    "personal", "work", "staging", "production", "admin", "backup", "test",
+    "billing", "support", "deploy",
+)
+
+
+def pad(data):
+    padding_size = 16 - len(data) % 16
+    return data + bytes(bytearray([padding_size] * padding_size))
+
+
+def aes_encrypt(key, iv, data):
+    return AES.new(key, AES.MODE_CBC, iv).encrypt(pad(data))
+
+
+def openssl_encrypt(key_material, data):
+    """
+    Encrypts ``data`` the way 1Password encrypts items and key validation
+    strings, using the 1024 bytes of ``key_material`` from an encryption key.
+    """
+    salt = os.urandom(8)
+    key_and_iv = b""
+    prev = b""
+    while len(key_and_iv) < 32:
+        prev = md5(prev + key_material + salt).digest()
+        key_and_iv += prev
+    encrypted = aes_encrypt(key_and_iv[0:16], key_and_iv[16:], data)
+    return b64encode(SALTED_PREFIX + salt + encrypted).decode("ascii")
+
+
+def encryption_key(password, iterations, level="SL5", identifier=None):
+    """
+    Returns a tuple of the key material and a definition, in the format of
+    an entry in ``encryptionKeys.js``, that unlocks with ``password``.
+    """
+    key_material = os.urandom(1024)
+    salt = os.urandom(8)
+    derived = pbkdf2_hmac("sha1", password.encode(), salt, iterations, 32)
+    encrypted = aes_encrypt(derived[0:16], derived[16:], key_material)
+    definition = {
+        "data": b64encode(SALTED_PREFIX + salt + encrypted).decode("ascii"),
+        "validation": openssl_encrypt(key_material, key_material),
+        "iterations": iterations,
+        "identifier": identifier or new_identifier(),
+        "level": level,
+    }
+    return key_material, definition
+
+
+def new_identifier():
+    return uuid.uuid4().hex.upper()
+
+
+def item_rows(count, seed=0):
+    """
+    Generates ``count`` rows for ``contents.js`` with plausible, unique names.
+    """
+    generator = random.Random(seed)
+    rows = []
+    for number in range(count):
+        name = "%s: %s %d" % (
+            generator.choice(SERVICES),
+            generator.choice(QUALIFIERS),
+            number,
+        )
+        domain = "%s.example.com" % name.split(":")[0].lower()
+        rows.append([new_identifier(), "webforms.WebForm", name, domain,
+                     1361021221 + number, "", 0, "N"])
+    return rows
+
+
+def item_payload(row, generator):
+    """
+    The decrypted JSON for a web form item.
+    """
+    payload = json.dumps({"fields": [
+        {"designation": "username", "name": "Username",
+         "value": "user%d@example.com" % generator.randint(0, 10 ** 6)},
+        {"designation": "password", "name": "Password",
+         "value": "%x" % generator.getrandbits(64)},
+    ]})
+    return payload.encode("utf-8")
+
+
+def write_keychain(path, password, iterations, levels=("SL3", "SL5"),
+                   rows=(), items=False, seed=0):
+    """
+    Writes an ``.agilekeychain`` at ``path`` with one encryption key for each
+    security level in ``levels``, listing ``rows`` in ``contents.js``. With
+    ``items`` set, an encrypted ``.1password`` file is written for each row,
+    using the security levels' keys in turn.
+    """
+    data_path = os.path.join(path, "data", "default")
+    if not os.path.isdir(data_path):
+        os.makedirs(data_path)
+
+    key_list = {"list": []}
+    materials = []
+    for level in levels:
+        material, definition = encryption_key(password, iterations, level=level)
+        materials.append((level, definition["identifier"], material))
+        key_list["list"].append(definition)
+        key_list[level] = definition["identifier"]
+    with open(os.path.join(data_path, "encryptionKeys.js"), "w") as f:
+        json.dump(key_list, f)
+    with open(os.path.join(data_path, "contents.js"), "w") as f:
+        json.dump(list(rows), f)
+
+    if items:
+        generator = random.Random(seed)
+        for number, row in enumerate(rows):
+            level, identifier, material = materials[number % len(materials)]
+            item = {
+                "uuid": row[0],
+                "typeName": row[1],
+                "title": row[2],
+                "location": row[3],
+                "updatedAt": row[4],
+                "keyID": identifier,
+                "securityLevel": level,
+                "encrypted": openssl_encrypt(material,
+                                             item_payload(row, generator)),
+            }
+            filename = os.path.join(data_path, "%s.1password" % row[0])
+            with open(filename, "w") as f:
+                json.dump(item, f)
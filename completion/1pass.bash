@@ -0,0 +1,43 @@
+# Bash completion for 1pass. Source this file from ~/.bashrc, or copy it to
+# ~/.local/share/bash-completion/completions/1pass.
+#
+# Item names come from `1pass --complete`, which reads a cached list of names
+# and never asks for the master password.
+
+_1pass() {
+    local current=${COMP_WORDS[COMP_CWORD]}
+    local previous=${COMP_WORDS[COMP_CWORD-1]}
+    local paths=() names=() name i
+
+    case "$previous" in
+        --path|--batch)
+            COMPREPLY=($(compgen -f -- "$current"))
+            return
+            ;;
+        --cache-ttl|--field|--complete)
+            return
+            ;;
+    esac
+
+    if [[ "$current" == -* ]]; then
+        COMPREPLY=($(compgen -W "--path --no-prompt --cache-ttl --fuzzy
+            --no-agent --forget --batch --json --url --stream --field
+            --timings --help" -- "$current"))
+        return
+    fi
+
+    for ((i = 1; i < COMP_CWORD - 1; i++)); do
+        if [[ "${COMP_WORDS[i]}" == --path ]]; then
+            paths+=(--path "${COMP_WORDS[i+1]}")
+        fi
+    done
+
+    local IFS=$'\n'
+    names=($(1pass "${paths[@]}" --complete "${current//\\/}" 2>/dev/null))
+    COMPREPLY=()
+    for name in "${names[@]}"; do
+        COMPREPLY+=("$(printf '%q' "$name")")
+    done
+}
+
+complete -F _1pass 1pass
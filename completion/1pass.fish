@@ -0,0 +1,30 @@
+# Fish completion for 1pass. Copy this file to
+# ~/.config/fish/completions/1pass.fish.
+#
+# Item names come from `1pass --complete`, which reads a cached list of names
+# and never asks for the master password.
+
+function __1pass_items
+    set -l words (commandline -opc)
+    set -l paths
+    for i in (seq 2 (math (count $words) - 1))
+        if test "$words[$i]" = --path
+            set paths $paths --path $words[(math $i + 1)]
+        end
+    end
+    1pass $paths --complete (commandline -ct) 2>/dev/null
+end
+
+complete -c 1pass -f -a '(__1pass_items)'
+complete -c 1pass -l path -r -F -d 'Path to your 1Password.agilekeychain'
+complete -c 1pass -l no-prompt -d 'Read the master password from STDIN'
+complete -c 1pass -l cache-ttl -x -d 'Cache derived encryption keys for this many seconds'
+complete -c 1pass -l fuzzy -d 'Perform fuzzy matching on the item'
+complete -c 1pass -l no-agent -d "Don't ask a running 1pass-agent for the item"
+complete -c 1pass -l forget -d 'Wipe any cached encryption keys and exit'
+complete -c 1pass -l batch -r -F -d 'Read item names from a file'
+complete -c 1pass -l json -d 'Write each item as a line of JSON'
+complete -c 1pass -l url -d 'Look items up by the URL of their site'
+complete -c 1pass -l stream -d 'Stop reading the item list at the first exact match'
+complete -c 1pass -l field -x -d "Write one of the item's fields instead of its password"
+complete -c 1pass -l timings -d 'Write the time spent in each phase to STDERR'
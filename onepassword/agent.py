@@ -0,0 +1,290 @@
+import json
+import os
+import socket
+import struct
+import tempfile
+
+DEFAULT_TIMEOUT = 15 * 60
+# How long a connection may sit without sending a request. The agent answers
+# one connection at a time, so this is how long a stuck client holds up
+# everyone else.
+CONNECTION_TIMEOUT = 1
+
+
+class AgentError(Exception):
+    """
+    Raised by the ``AgentClient`` when the agent can't answer a request,
+    either because it isn't running or because it holds a different keychain.
+    """
+
+
+def default_socket_path():
+    """
+    The socket used to talk to ``1pass-agent``: the one named by the
+    ``ONEPASSWORD_AGENT_SOCKET`` environment variable (which ``1pass-agent``
+    prints), or else ``1pass-agent.sock`` in the user's private
+    ``XDG_RUNTIME_DIR``, or else ``None``.
+    """
+    path = os.environ.get("ONEPASSWORD_AGENT_SOCKET")
+    if path:
+        return path
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "1pass-agent.sock")
+    return None
+
+
+def check_owner(path):
+    """
+    Raises an ``AgentError`` unless the socket at ``path`` belongs to the
+    current user, so that nobody else can pose as the agent.
+    """
+    if os.stat(path).st_uid != os.getuid():
+        raise AgentError("%s belongs to another user" % path)
+
+
+def peer_uid(connection):
+    """
+    The user ID of the process at the other end of the Unix domain socket
+    ``connection``, or ``None`` where the platform can't tell.
+    """
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    credentials = connection.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED,
+                                        struct.calcsize("3i"))
+    return struct.unpack("3i", credentials)[1]
+
+
+def remove_stale_socket(path):
+    """
+    Removes the socket at ``path`` if nothing is listening on it. Raises an
+    ``AgentError`` if something is, or if it belongs to another user.
+    """
+    if not os.path.exists(path):
+        return
+    check_owner(path)
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(path)
+    except socket.error:
+        os.unlink(path)
+    else:
+        raise AgentError("Something is already listening on %s" % path)
+    finally:
+        connection.close()
+
+
+def normalise_path(path):
+    return os.path.realpath(os.path.expanduser(path))
+
+
+def normalise_paths(paths):
+    """
+    Normalises a keychain path, or a list of them, into a list.
+    """
+    if isinstance(paths, (list, tuple)):
+        return [normalise_path(path) for path in paths]
+    return [normalise_path(paths)]
+
+
+class Agent(object):
+    """
+    Serves lookups from an unlocked ``Keychain`` (or ``FederatedKeychain``
+    of the keychains at a list of paths) over a Unix domain socket, one
+    JSON object per line. The agent exits once it has been idle for
+    ``timeout`` seconds; a timeout of ``0`` keeps it running forever.
+    """
+
+    def __init__(self, keychain, path, socket_path=None,
+                 timeout=DEFAULT_TIMEOUT):
+        self.keychain = keychain
+        self.path = normalise_paths(path)
+        self._directory = None
+        socket_path = socket_path or default_socket_path()
+        if socket_path is None:
+            # Like ssh-agent, use a new directory only this user can enter.
+            self._directory = tempfile.mkdtemp(prefix="1pass-")
+            socket_path = os.path.join(self._directory, "agent.sock")
+        self.socket_path = socket_path
+        self.timeout = timeout or None
+        self.connection_timeout = CONNECTION_TIMEOUT
+        self._socket = None
+
+    def listen(self):
+        remove_stale_socket(self.socket_path)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            self._socket.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        self._socket.listen(5)
+        self._socket.settimeout(self.timeout)
+
+    def serve(self):
+        """
+        Handles connections until the agent has been idle for too long.
+        """
+        if self._socket is None:
+            self.listen()
+        try:
+            while True:
+                try:
+                    connection, _ = self._socket.accept()
+                except socket.timeout:
+                    return
+                if peer_uid(connection) not in (None, os.getuid()):
+                    connection.close()
+                    continue
+                try:
+                    self._handle(connection)
+                finally:
+                    connection.close()
+        finally:
+            self.close()
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            if self._directory is not None:
+                os.rmdir(self._directory)
+                self._directory = None
+
+    def respond(self, request):
+        if normalise_paths(request.get("path", "")) != self.path:
+            return {"error": "Agent holds a different keychain"}
+
+        command = request.get("command")
+        if command == "item":
+            item = self.keychain.item(
+                request["name"],
+                fuzzy_threshold=request.get("fuzzy_threshold", 100),
+            )
+        elif command == "item_for_url":
+            item = self.keychain.item_for_url(request["url"])
+        else:
+            return {"error": "Unknown command '%s'" % command}
+
+        if item is None:
+            return {"item": None}
+        response = {"name": item.name, "password": item.password}
+        if request.get("field"):
+            response["field"] = item.field(request["field"])
+        return {"item": response}
+
+    def _handle(self, connection):
+        connection.settimeout(self.connection_timeout)
+        reader = connection.makefile("rb")
+        try:
+            for line in reader:
+                try:
+                    response = self.respond(json.loads(line.decode("utf-8")))
+                except (ValueError, KeyError) as e:
+                    response = {"error": "Bad request: %s" % e}
+                except Exception as e:
+                    # Keep serving: one bad item mustn't take the agent down.
+                    response = {"error": "%s" % e}
+                connection.sendall(json.dumps(response).encode("utf-8") + b"\n")
+        except socket.timeout:
+            pass
+        finally:
+            reader.close()
+
+
+class AgentClient(object):
+    """
+    Looks up items through a running ``1pass-agent``.
+    """
+
+    def __init__(self, socket_path=None, timeout=5):
+        self.socket_path = socket_path or default_socket_path()
+        self.timeout = timeout
+
+    def item(self, path, name, fuzzy_threshold=100):
+        """
+        Returns a dictionary with the ``name`` and ``password`` of the
+        matching item, or ``None`` if the agent couldn't find it. Raises an
+        ``AgentError`` if the agent can't be used.
+        """
+        return self.items(path, [name], fuzzy_threshold=fuzzy_threshold)[0]
+
+    def items(self, path, names, fuzzy_threshold=100, field=None):
+        """
+        Looks up several items over a single connection, returning a list
+        in the same order as ``names``. With ``field``, each item also has
+        the value of that field, or ``None``, as its ``field``.
+        """
+        responses = self.requests([
+            {
+                "command": "item",
+                "path": normalise_paths(path),
+                "name": name,
+                "fuzzy_threshold": fuzzy_threshold,
+                "field": field,
+            }
+            for name in names
+        ])
+        return [response["item"] for response in responses]
+
+    def items_for_urls(self, path, urls, field=None):
+        """
+        Looks up the items for several sites over a single connection,
+        returning a list in the same order as ``urls``.
+        """
+        responses = self.requests([
+            {"command": "item_for_url", "path": normalise_paths(path),
+             "url": url, "field": field}
+            for url in urls
+        ])
+        return [response["item"] for response in responses]
+
+    def request(self, request):
+        return self.requests([request])[0]
+
+    def requests(self, requests):
+        connection = self._connect()
+        lines = []
+        try:
+            reader = connection.makefile("rb")
+            try:
+                for request in requests:
+                    connection.sendall(
+                        json.dumps(request).encode("utf-8") + b"\n")
+                    lines.append(reader.readline())
+            finally:
+                reader.close()
+        except (socket.error, socket.timeout) as e:
+            raise AgentError("Agent request failed: %s" % e)
+        finally:
+            connection.close()
+
+        return [self._parse_response(line) for line in lines]
+
+    def _parse_response(self, line):
+        try:
+            response = json.loads(line.decode("utf-8"))
+        except ValueError:
+            raise AgentError("Agent sent an invalid response")
+        if "error" in response:
+            raise AgentError(response["error"])
+        return response
+
+    def _connect(self):
+        if self.socket_path is None or not os.path.exists(self.socket_path):
+            raise AgentError("No agent listening on %s" % self.socket_path)
+        check_owner(self.socket_path)
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.settimeout(self.timeout)
+        try:
+            connection.connect(self.socket_path)
+        except socket.error as e:
+            connection.close()
+            raise AgentError("Could not connect to agent: %s" % e)
+        if peer_uid(connection) not in (None, os.getuid()):
+            connection.close()
+            raise AgentError("The agent on %s belongs to another user" %
+                             self.socket_path)
+        return connection
@@ -0,0 +1,67 @@
+import asyncio
+import functools
+
+from onepassword.keychain import Keychain
+
+
+class AsyncKeychain(object):
+    """
+    Wraps a ``Keychain`` for use from ``asyncio`` code. Key derivation, file
+    reads and decryption run on ``executor`` (the event loop's default
+    executor if it's ``None``), so they don't block the event loop.
+    Lookups of different items run at the same time, on the executor's
+    threads.
+
+    Concurrent lookups of the same item share a single decryption: a second
+    ``item`` call made while the first is still running waits for the first
+    one's result.
+    """
+
+    def __init__(self, keychain, executor=None):
+        self.keychain = keychain
+        self._executor = executor
+        self._pending = {}
+
+    @classmethod
+    async def open(cls, path, executor=None, **options):
+        """
+        Loads the keychain at ``path`` without blocking the event loop.
+        ``options`` are passed on to ``Keychain``.
+        """
+        self = cls(None, executor=executor)
+        self.keychain = await self._run(Keychain, path, **options)
+        return self
+
+    async def unlock(self, password, lazy=False, workers=1):
+        return await self._run(self.keychain.unlock, password,
+                               lazy=lazy, workers=workers)
+
+    def lock(self):
+        self.keychain.lock()
+
+    @property
+    def locked(self):
+        return self.keychain.locked
+
+    async def item(self, name, fuzzy_threshold=100):
+        """
+        Looks an item up like ``Keychain.item``. Callers waiting on the same
+        lookup are given the same ``KeychainItem``.
+        """
+        request = (name, fuzzy_threshold)
+        future = self._pending.get(request)
+        if future is None:
+            future = self._run(self.keychain.item, name, fuzzy_threshold)
+            self._pending[request] = future
+            future.add_done_callback(
+                lambda _: self._pending.pop(request, None))
+        # Shielded so that one caller being cancelled doesn't cancel the
+        # lookup for everyone else waiting on it.
+        return await asyncio.shield(future)
+
+    def _run(self, function, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(
+            self._executor,
+            functools.partial(function, *args, **kwargs),
+        )
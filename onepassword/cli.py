@@ -1,11 +1,20 @@
 import argparse
+import binascii
 import getpass
+import json
 import os
 import sys
 
 from onepassword import Keychain
+from onepassword.agent import Agent, AgentClient, AgentError, DEFAULT_TIMEOUT
+from onepassword.federation import FederatedKeychain
+from onepassword.key_cache import DerivedKeyCache
+from onepassword.name_cache import NameCache
+from onepassword.table_cache import ItemTableCache
+from onepassword.tracing import summarise, traced
 
 DEFAULT_KEYCHAIN_PATH = "~/Dropbox/1Password.agilekeychain"
+UNLOCK_WORKERS = 4
 
 class CLI(object):
     """
@@ -18,72 +27,494 @@ class CLI(object):
         self.stdout = stdout
         self.stderr = stderr
         self.getpass = getpass
-        self.arguments = self.argument_parser().parse_args(arguments)
-        self.keychain = Keychain(self.arguments.path)
+        self.arguments = self._parse_arguments(arguments)
+        self._keychain = None
+        self._stdin_passwords = None
+        self.spans = None
+        if getattr(self.arguments, "timings", False):
+            self.spans = []
+            self._find_items_with_agent = traced(
+                self.spans.append, "agent", self._find_items_with_agent)
+
+    @property
+    def keychain(self):
+        if self._keychain is None:
+            tracer = None
+            if self.spans is not None:
+                tracer = self.spans.append
+            options = {
+                "key_cache_ttl": self.arguments.cache_ttl,
+                "table_cache": ItemTableCache(),
+                "tracer": tracer,
+                "stream_items": getattr(self.arguments, "stream", False),
+            }
+            if len(self.paths) > 1:
+                self._keychain = FederatedKeychain.load(self.paths, **options)
+            else:
+                self._keychain = Keychain(self.paths[0], **options)
+        return self._keychain
+
+    @property
+    def paths(self):
+        """
+        The keychains to use: each ``--path``, or else the paths in the
+        ``ONEPASSWORD_KEYCHAIN`` environment variable, separated by
+        ``os.pathsep``, or else the default. Earlier keychains win ties
+        between matches.
+        """
+        if self.arguments.path:
+            return self.arguments.path
+        paths = os.environ.get("ONEPASSWORD_KEYCHAIN", "").split(os.pathsep)
+        return [path for path in paths if path] or [DEFAULT_KEYCHAIN_PATH]
 
     def run(self):
         """
         The main entry point, performs the appropriate action for the given
         arguments.
         """
-        self._unlock_keychain()
+        try:
+            self._run()
+        finally:
+            if self.spans is not None:
+                self._write_timings()
 
-        item = self.keychain.item(
-            self.arguments.item,
-            fuzzy_threshold=self._fuzzy_threshold(),
-        )
+    def _run(self):
+        if self.arguments.command == "export":
+            self._export()
+            return
+        if self.arguments.command == "serve":
+            self._serve()
+            return
 
-        if item is not None:
-            self.stdout.write("%s\n" % item.password)
-        else:
-            self.stderr.write("1pass: Could not find an item named '%s'\n" % (
-                self.arguments.item,
-            ))
+        if self.arguments.forget:
+            DerivedKeyCache.purge()
+            return
+        if self.arguments.complete is not None:
+            self._complete()
+            return
+
+        names = self._item_names()
+        try:
+            items = self._find_items_with_agent(names)
+        except AgentError:
+            items = self._find_items_with_keychain(names)
+
+        missing = False
+        for name, item in zip(names, items):
+            if item is not None and self.arguments.field and \
+                    item.get("field") is None:
+                self.stderr.write("1pass: Item '%s' has no field '%s'\n" %
+                                  (item["name"], self.arguments.field))
+                missing = True
+            elif item is not None:
+                self._write_item(name, item, batch=len(names) > 1 or
+                                 self.arguments.batch is not None)
+            elif self.arguments.url:
+                self.stderr.write("1pass: Could not find an item for "
+                                  "'%s'\n" % name)
+                missing = True
+            else:
+                self.stderr.write("1pass: Could not find an item named "
+                                  "'%s'\n" % name)
+                missing = True
+
+        if missing:
             sys.exit(os.EX_DATAERR)
 
     def argument_parser(self):
         parser = argparse.ArgumentParser()
-        parser.add_argument("item", help="The name of the password to decrypt")
         parser.add_argument(
-            "--path",
-            default=os.environ.get('ONEPASSWORD_KEYCHAIN', DEFAULT_KEYCHAIN_PATH),
-            help="Path to your 1Password.agilekeychain file",
+            "items",
+            nargs="*",
+            metavar="item",
+            help="The name of the password to decrypt (or its URL, with --url)",
         )
+        self._add_keychain_arguments(parser)
         parser.add_argument(
             "--fuzzy",
             action="store_true",
             help="Perform fuzzy matching on the item",
         )
+        parser.add_argument(
+            "--no-agent",
+            action="store_true",
+            help="Don't ask a running 1pass-agent for the item",
+        )
+        parser.add_argument(
+            "--forget",
+            action="store_true",
+            help="Wipe any cached encryption keys and exit",
+        )
+        parser.add_argument(
+            "--batch",
+            metavar="FILE",
+            help="Read item names from FILE, one per line (- for STDIN)",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Write each item as a line of JSON",
+        )
+        parser.add_argument(
+            "--url",
+            action="store_true",
+            help="Look items up by the URL of their site instead of by name",
+        )
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            help="Stop reading the item list at the first exact match "
+                 "(the first of several items with the same name, rather "
+                 "than the last)",
+        )
+        parser.add_argument(
+            "--field",
+            metavar="NAME",
+            help="Write the item's NAME field (e.g. username) instead of "
+                 "its password",
+        )
+        parser.add_argument(
+            "--complete",
+            metavar="PREFIX",
+            help="List the names of items starting with PREFIX, for shell "
+                 "completion, without unlocking the keychain",
+        )
+        self._add_timings_argument(parser)
+        return parser
+
+    def export_argument_parser(self):
+        parser = argparse.ArgumentParser(
+            prog="1pass export",
+            description="Decrypt every item in the keychain",
+        )
+        self._add_keychain_arguments(parser)
+        parser.add_argument(
+            "--format",
+            choices=["jsonl"],
+            default="jsonl",
+            help="Write each item as a line of JSON",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Decrypt this many items at a time",
+        )
+        self._add_timings_argument(parser)
+        return parser
+
+    def serve_argument_parser(self):
+        parser = argparse.ArgumentParser(
+            prog="1pass serve",
+            description="Serve lookups over HTTP until interrupted",
+        )
+        self._add_keychain_arguments(parser)
+        listen = parser.add_mutually_exclusive_group(required=True)
+        listen.add_argument(
+            "--socket",
+            help="Path of the Unix domain socket to listen on",
+        )
+        listen.add_argument(
+            "--port",
+            type=int,
+            help="Listen on this port on 127.0.0.1 (0 picks a free port)",
+        )
+        parser.add_argument(
+            "--token",
+            default=os.environ.get("ONEPASSWORD_SERVER_TOKEN"),
+            help="Token clients must send with --port (generated if unset)",
+        )
+        return parser
+
+    def _parse_arguments(self, arguments):
+        arguments = list(arguments)
+        if arguments[:1] == ["export"]:
+            arguments = self.export_argument_parser().parse_args(arguments[1:])
+            arguments.command = "export"
+            return arguments
+        if arguments[:1] == ["serve"]:
+            arguments = self.serve_argument_parser().parse_args(arguments[1:])
+            arguments.command = "serve"
+            return arguments
+
+        parser = self.argument_parser()
+        arguments = parser.parse_args(arguments)
+        if not (arguments.items or arguments.batch or arguments.forget or
+                arguments.complete is not None):
+            parser.error("an item name is required")
+        arguments.command = "lookup"
+        return arguments
+
+    def _add_keychain_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            action="append",
+            help="Path to your 1Password.agilekeychain file (repeat it to "
+                 "search several keychains)",
+        )
         parser.add_argument(
             "--no-prompt",
             action="store_true",
             help="Don't prompt for a password, read from STDIN instead",
         )
-        return parser
+        parser.add_argument(
+            "--cache-ttl",
+            type=int,
+            # argparse applies type to a string default, so a bad value in
+            # the environment is reported like a bad --cache-ttl.
+            default=os.environ.get("ONEPASSWORD_KEY_CACHE_TTL", "0"),
+            help="Cache derived encryption keys on disk for this many seconds",
+        )
+
+    def _add_timings_argument(self, parser):
+        parser.add_argument(
+            "--timings",
+            action="store_true",
+            help="Write the time spent in each phase to STDERR",
+        )
+
+    def _write_timings(self):
+        self.stderr.write("1pass: timings\n")
+        for name, count, duration in summarise(self.spans):
+            self.stderr.write("  %-10s %5d %10.3fms\n" %
+                              (name, count, duration * 1000))
+
+    def _item_names(self):
+        names = list(self.arguments.items)
+        if self.arguments.batch == "-":
+            lines = self.stdin.read().splitlines()
+            if self.arguments.no_prompt and lines:
+                self._stdin_passwords = [lines.pop(0).strip()]
+            names.extend(lines)
+        elif self.arguments.batch is not None:
+            with open(self.arguments.batch, "r") as f:
+                names.extend(f.read().splitlines())
+        return [name.strip() for name in names if name.strip()]
+
+    def _write_item(self, name, item, batch):
+        field = self.arguments.field
+        value = item["field"] if field else item["password"]
+        if self.arguments.json and field:
+            self.stdout.write("%s\n" % json.dumps({
+                "query": name,
+                "name": item["name"],
+                "field": field,
+                "value": value,
+            }))
+        elif self.arguments.json:
+            self.stdout.write("%s\n" % json.dumps({
+                "query": name,
+                "name": item["name"],
+                "password": value,
+            }))
+        elif batch:
+            self.stdout.write("%s\t%s\n" % (name, value))
+        else:
+            self.stdout.write("%s\n" % value)
+
+    def _complete(self):
+        cache = NameCache()
+        names = set()
+        for path in self.paths:
+            try:
+                names.update(cache.complete(path, self.arguments.complete))
+            except (IOError, OSError, ValueError):
+                # Completion shouldn't complain about a missing keychain.
+                pass
+        for name in sorted(names, key=lambda name: (name.lower(), name)):
+            self.stdout.write("%s\n" % name)
+
+    def _export(self):
+        self._unlock_keychain(workers=UNLOCK_WORKERS)
+        for item, contents in self.keychain.iter_decrypted(
+                workers=self.arguments.workers):
+            self.stdout.write("%s\n" % json.dumps({
+                "uuid": item.identifier,
+                "type": item.type,
+                "name": item.name,
+                "contents": contents,
+            }))
 
-    def _unlock_keychain(self):
+    def _serve(self):
+        # http.server takes a while to import, and lookups don't need it.
+        from onepassword.server import SecretServer
+
+        # Watched before unlocking, so that the keychain keeps the password
+        # and can derive encryption keys that change while it's serving.
+        self.keychain.watch()
+        self._unlock_keychain(workers=UNLOCK_WORKERS)
+        token = self.arguments.token
+        if self.arguments.port is not None and not token:
+            token = binascii.hexlify(os.urandom(16)).decode("ascii")
+        server = SecretServer(
+            self.keychain,
+            socket_path=self.arguments.socket,
+            port=self.arguments.port,
+            token=token,
+        )
+        server.listen()
+        self.stdout.write("ONEPASSWORD_SERVER=%s; export ONEPASSWORD_SERVER;\n"
+                          % server.address)
+        if self.arguments.port is not None:
+            self.stdout.write("ONEPASSWORD_SERVER_TOKEN=%s; "
+                              "export ONEPASSWORD_SERVER_TOKEN;\n" % token)
+        self.stdout.flush()
+        try:
+            server.serve()
+        except KeyboardInterrupt:
+            pass
+
+    def _find_items_with_agent(self, names):
+        if self.arguments.no_agent:
+            raise AgentError("Agent disabled")
+        if self.arguments.url:
+            return AgentClient().items_for_urls(self.paths, names,
+                                                field=self.arguments.field)
+        return AgentClient().items(
+            self.paths,
+            names,
+            fuzzy_threshold=self._fuzzy_threshold(),
+            field=self.arguments.field,
+        )
+
+    def _find_items_with_keychain(self, names):
+        self._unlock_keychain(lazy=True)
+        if len(names) > 1 and not self.arguments.url:
+            self.keychain.prefetch_metadata(names)
+        for name in names:
+            if self.arguments.url:
+                item = self.keychain.item_for_url(name)
+            else:
+                item = self.keychain.item(
+                    name,
+                    fuzzy_threshold=self._fuzzy_threshold(),
+                )
+            if item is None:
+                yield None
+            elif self.arguments.field:
+                yield {"name": item.name, "password": item.password,
+                       "field": item.field(self.arguments.field)}
+            else:
+                yield {"name": item.name, "password": item.password}
+
+    def _unlock_keychain(self, **options):
         if self.arguments.no_prompt:
-            self._unlock_keychain_stdin()
+            self._unlock_keychain_stdin(options)
+        else:
+            self._unlock_keychain_prompt(options)
+
+    def _unlock_keychain_stdin(self, options):
+        passwords = self._stdin_passwords
+        if passwords is None:
+            passwords = self.stdin.read().strip().splitlines()
+        vaults = self._vaults()
+        if len(vaults) > 1 and len(passwords) == len(vaults):
+            # One password per --path, in the same order.
+            for (_, keychain), password in zip(vaults, passwords):
+                keychain.unlock(password.strip(), **options)
         else:
-            self._unlock_keychain_prompt()
+            self.keychain.unlock("\n".join(passwords), **options)
 
-    def _unlock_keychain_stdin(self):
-        password = self.stdin.read().strip()
-        self.keychain.unlock(password)
-        if self.keychain.locked:
+        locked = [path for path, keychain in vaults if keychain.locked]
+        if not locked:
+            return
+        if len(vaults) == 1:
             self.stderr.write("1pass: Incorrect master password\n")
-            sys.exit(os.EX_DATAERR)
+        else:
+            for path in locked:
+                self.stderr.write("1pass: Incorrect master password for %s\n"
+                                  % path)
+        sys.exit(os.EX_DATAERR)
 
-    def _unlock_keychain_prompt(self):
-        while self.keychain.locked:
-            try:
-                self.keychain.unlock(self.getpass("Master password: "))
-            except KeyboardInterrupt:
-                self.stdout.write("\n")
-                sys.exit(0)
+    def _unlock_keychain_prompt(self, options):
+        vaults = self._vaults()
+        try:
+            if len(vaults) == 1:
+                while self.keychain.locked:
+                    self.keychain.unlock(self.getpass("Master password: "),
+                                         **options)
+                return
+
+            # Try one password for every keychain first, as they usually
+            # share it, and then ask for each keychain it didn't unlock.
+            if self.keychain.locked:
+                self.keychain.unlock(self.getpass("Master password: "),
+                                     **options)
+            for path, keychain in vaults:
+                while keychain.locked:
+                    keychain.unlock(
+                        self.getpass("Master password for %s: " % path),
+                        **options)
+        except KeyboardInterrupt:
+            self.stdout.write("\n")
+            sys.exit(0)
+
+    def _vaults(self):
+        """
+        A ``(path, keychain)`` pair for each keychain being used.
+        """
+        keychains = getattr(self.keychain, "keychains", [self.keychain])
+        return list(zip(self.paths, keychains))
 
     def _fuzzy_threshold(self):
         if self.arguments.fuzzy:
             return 70
         else:
             return 100
+
+
+class AgentCLI(CLI):
+    """
+    The 1pass-agent command line interface. Unlocks the keychain once and
+    then serves lookups to 1pass until the agent has been idle for a while.
+    """
+
+    def run(self):
+        self._unlock_keychain(workers=UNLOCK_WORKERS)
+        agent = Agent(
+            self.keychain,
+            self.paths,
+            socket_path=self.arguments.socket,
+            timeout=self.arguments.timeout,
+        )
+        agent.listen()
+        self.stdout.write("ONEPASSWORD_AGENT_SOCKET=%s; "
+                          "export ONEPASSWORD_AGENT_SOCKET;\n" %
+                          agent.socket_path)
+        self.stdout.flush()
+        if self.arguments.foreground:
+            agent.serve()
+        elif os.fork() == 0:
+            self._detach()
+            agent.serve()
+
+    def _parse_arguments(self, arguments):
+        return self.argument_parser().parse_args(arguments)
+
+    def _detach(self):
+        os.setsid()
+        null = os.open(os.devnull, os.O_RDWR)
+        for descriptor in (0, 1, 2):
+            os.dup2(null, descriptor)
+        os.close(null)
+
+    def argument_parser(self):
+        parser = argparse.ArgumentParser()
+        self._add_keychain_arguments(parser)
+        parser.add_argument(
+            "--socket",
+            default=None,
+            help="Path of the socket to listen on",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=int,
+            default=DEFAULT_TIMEOUT,
+            help="Exit after this many idle seconds (0 to never exit)",
+        )
+        parser.add_argument(
+            "--foreground",
+            action="store_true",
+            help="Don't fork into the background",
+        )
+        return parser
@@ -0,0 +1,67 @@
+# Python 2+3 compatibilty
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
+
+def hostname(url):
+    """
+    The lower case host name in ``url``, which may also be a bare domain
+    (``example.com``) or host and path (``example.com/login``).
+    """
+    url = url.strip().lower()
+    if "//" not in url:
+        url = "//" + url
+    try:
+        host = urlsplit(url).hostname
+    except ValueError:
+        return ""
+    return (host or "").rstrip(".")
+
+
+def labels(host):
+    """
+    The labels of ``host`` from the top level domain down. An IP address is
+    a single label, so it can only match exactly.
+    """
+    if host.replace(".", "").isdigit() or ":" in host:
+        return [host]
+    return [label for label in reversed(host.split(".")) if label]
+
+
+class DomainIndex(object):
+    """
+    Finds the items for a URL's site using a trie of their domains' labels,
+    read from the top level domain down, so a lookup takes as many steps as
+    the URL's host has labels. An item for ``example.com`` matches
+    ``https://app.example.com/login``, but one for ``app.example.com``
+    doesn't match ``https://example.com``.
+    """
+
+    def __init__(self, domains):
+        self._root = {}
+        for position, domain in enumerate(domains):
+            if not domain:
+                continue
+            host = hostname(domain)
+            if not host:
+                continue
+            node = self._root
+            for label in labels(host):
+                node = node.setdefault(label, {})
+            node.setdefault(None, []).append(position)
+
+    def positions(self, url):
+        """
+        The positions of the items whose domain matches ``url`` most
+        closely, or an empty list.
+        """
+        node = self._root
+        best = []
+        for label in labels(hostname(url)):
+            node = node.get(label)
+            if node is None:
+                break
+            best = node.get(None, best)
+        return best
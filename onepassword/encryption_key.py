@@ -1,9 +1,8 @@
-from base64 import b64decode
+from binascii import a2b_base64
+from collections import OrderedDict
 from hashlib import md5, pbkdf2_hmac
 
-from Crypto.Cipher import AES
-
-from .utils import is_python_3
+from onepassword.tracing import traced
 
 
 class SaltyString(object):
@@ -11,63 +10,150 @@ class SaltyString(object):
     ZERO_INIT_VECTOR = b"\x00" * 16
 
     def __init__(self, base64_encoded_string):
-        decoded_data = b64decode(base64_encoded_string)
+        # The encrypted data is a view of the decoded string, rather than a
+        # copy of most of it.
+        decoded_data = a2b_base64(base64_encoded_string)
 
         if decoded_data.startswith(self.SALTED_PREFIX):
             self.salt = decoded_data[8:16]
-            self.data = decoded_data[16:]
+            self.data = memoryview(decoded_data)[16:]
         else:
             self.salt = self.ZERO_INIT_VECTOR
-            self.data = decoded_data
+            self.data = memoryview(decoded_data)
 
 
 class EncryptionKey(object):
     MINIMUM_ITERATIONS = 1000
+    OPENSSL_CACHE_SIZE = 256
 
     def __init__(self, data, iterations=0, validation="", identifier=None,
-                 level=None):
+                 level=None, cache=None, tracer=None):
+        """
+        A ``tracer`` is called with a ``Span`` for each ``unlock`` ("unlock
+        key") of this key, and each item it decrypts ("decrypt").
+        """
         self.identifier = identifier
         self.level = level
+        self.cache = cache
 
         self._encrypted_key = SaltyString(data)
         self._decrypted_key = None
+        self._openssl_keys = OrderedDict()
         self._set_iterations(iterations)
         self._validation = validation
 
+        if tracer is not None:
+            self.unlock = traced(tracer, "unlock key", self.unlock,
+                                 identifier=identifier, level=level,
+                                 iterations=self.iterations)
+            self.decrypt = traced(tracer, "decrypt", self.decrypt,
+                                  identifier=identifier)
+            self._decrypt_into = traced(tracer, "decrypt",
+                                        self._decrypt_into,
+                                        identifier=identifier)
+
     def unlock(self, password):
-        key, iv = self._derive_pbkdf2(password)
+        self._openssl_keys.clear()
+        cached = self._cached_pbkdf2(password)
+        key, iv = cached or self._derive_pbkdf2(password)
 
         self._decrypted_key = self._aes_decrypt(
             key=key,
             iv=iv,
             encrypted_data=self._encrypted_key.data,
+            whole_block=False,
         )
-        return self._validate_decrypted_key()
+        if not self._validate_decrypted_key():
+            self._decrypted_key = None
+        elif cached is None and self.cache is not None:
+            self.cache.store(password, self._encrypted_key.salt,
+                             self.iterations, key + iv)
+        return self.unlocked
+
+    @property
+    def unlocked(self):
+        return self._decrypted_key is not None
+
+    def lock(self):
+        self._decrypted_key = None
+        self._openssl_keys.clear()
 
     def decrypt(self, b64_data):
+        """
+        Decrypts base64 encoded item data. All of its padding is removed,
+        including a whole block of it.
+        """
+        return self._decrypt(b64_data)
+
+    def _decrypt(self, b64_data, whole_block=True):
+        # Not traced, so validating the key while unlocking it isn't
+        # reported as decrypting an item.
+        encrypted = SaltyString(b64_data)
+        key, iv = self._derive_openssl(self._decrypted_key, encrypted.salt)
+        return self._aes_decrypt(key=key, iv=iv, encrypted_data=encrypted.data,
+                                 whole_block=whole_block)
+
+    def decrypt_many(self, b64_items):
+        """
+        Decrypts each base64 encoded string in ``b64_items``, yielding the
+        decrypted data as it goes. Every item is decrypted into the same
+        buffer, which grows to fit the largest and is wiped at the end, and
+        unpadded through a ``memoryview``, so the only copies made of an
+        item's data are its decoded ciphertext and the plaintext yielded.
+        """
+        buffer = bytearray()
+        try:
+            for b64_data in b64_items:
+                yield self._decrypt_into(b64_data, buffer)
+        finally:
+            buffer[:] = b"\x00" * len(buffer)
+
+    def _decrypt_into(self, b64_data, buffer):
+        from Crypto.Cipher import AES
+
         encrypted = SaltyString(b64_data)
+        size = len(encrypted.data)
+        if len(buffer) < size:
+            buffer.extend(b"\x00" * (size - len(buffer)))
+
         key, iv = self._derive_openssl(self._decrypted_key, encrypted.salt)
-        return self._aes_decrypt(key=key, iv=iv, encrypted_data=encrypted.data)
+        aes = AES.new(key, AES.MODE_CBC, iv)
+        decrypted = memoryview(buffer)[0:size]
+        try:
+            aes.decrypt(encrypted.data, output=decrypted)
+        except TypeError:
+            # pycrypto can't decrypt into an existing buffer.
+            decrypted[:] = aes.decrypt(encrypted.data)
+        return decrypted[0:self._unpadded_length(decrypted)].tobytes()
 
     def _set_iterations(self, iterations):
         self.iterations = max(int(iterations), self.MINIMUM_ITERATIONS)
 
     def _validate_decrypted_key(self):
-        return self.decrypt(self._validation) == self._decrypted_key
+        validation = self._decrypt(self._validation, whole_block=False)
+        return validation == self._decrypted_key
 
-    def _aes_decrypt(self, key, iv, encrypted_data):
-        aes = AES.new(key, AES.MODE_CBC, iv)
-        return self._strip_padding(aes.decrypt(encrypted_data))
-
-    def _strip_padding(self, decrypted):
-        if is_python_3():
-            return decrypted.rstrip()
+    def _aes_decrypt(self, key, iv, encrypted_data, whole_block=True):
+        # Imported here to keep pycrypto out of the CLI's start up time when
+        # a 1pass-agent answers the lookup.
+        from Crypto.Cipher import AES
 
-        padding_size = ord(decrypted[-1])
-        if padding_size >= 16:
-            return decrypted
+        aes = AES.new(key, AES.MODE_CBC, iv)
+        return self._strip_padding(aes.decrypt(encrypted_data), whole_block)
+
+    def _strip_padding(self, decrypted, whole_block=True):
+        return decrypted[0:self._unpadded_length(decrypted, whole_block)]
+
+    def _unpadded_length(self, decrypted, whole_block=True):
+        # Without whole_block a whole block of padding is left alone:
+        # decrypted keys (and their validation) keep theirs, and
+        # _derive_openssl relies on it being there.
+        padding_size = bytearray(decrypted[-1:] or b"\x00")[0]
+        limit = 16 if whole_block else 15
+        if 0 < padding_size <= limit:
+            return len(decrypted) - padding_size
         else:
-            return decrypted[:-padding_size]
+            return len(decrypted)
 
     def _derive_pbkdf2(self, password):
         # Use hashlib.pbkdf2_hmac, which is significantly faster
@@ -84,14 +170,46 @@ class EncryptionKey(object):
             key_and_iv[16:],
         )
 
-    def _derive_openssl(self, key, salt):
-        key = key[0:-16]
-        key_and_iv = b""
-        prev = b""
-        while len(key_and_iv) < 32:
-            prev = md5(prev + key + salt).digest()
-            key_and_iv += prev
+    def _cached_pbkdf2(self, password):
+        if self.cache is None:
+            return None
+        key_and_iv = self.cache.get(password, self._encrypted_key.salt,
+                                    self.iterations)
+        if key_and_iv is None:
+            return None
         return (
             key_and_iv[0:16],
             key_and_iv[16:],
         )
+
+    def _derive_openssl(self, key, salt):
+        # Every item decrypted with this key repeats the derivation for its
+        # salt, so remember the most recent results.
+        cache_key = (key, salt)
+        try:
+            return self._openssl_keys[cache_key]
+        except KeyError:
+            pass
+
+        if len(self._openssl_keys) >= self.OPENSSL_CACHE_SIZE:
+            self._openssl_keys.popitem(last=False)
+        key_and_iv = self._openssl_keys[cache_key] = \
+            self._derive_openssl_uncached(key, salt)
+        return key_and_iv
+
+    def _derive_openssl_uncached(self, key, salt):
+        # EVP_BytesToKey with MD5 and a single round: a 16 byte key and
+        # 16 byte IV take exactly two digests.
+        key = memoryview(key)[0:-16]
+
+        digest = md5(key)
+        digest.update(salt)
+        aes_key = digest.digest()
+
+        digest = md5(aes_key)
+        digest.update(key)
+        digest.update(salt)
+        return (
+            aes_key,
+            digest.digest(),
+        )
@@ -0,0 +1,111 @@
+import functools
+import itertools
+
+from onepassword.keychain import Keychain
+
+
+class FederatedKeychain(object):
+    """
+    Several keychains searched as one. Keychains are loaded, unlocked and
+    searched concurrently, and when more than one has a match the order of
+    ``keychains`` decides between equally good matches, so results don't
+    depend on which keychain answered first.
+    """
+
+    def __init__(self, keychains):
+        self.keychains = list(keychains)
+
+    @classmethod
+    def load(cls, paths, **options):
+        """
+        Loads a ``Keychain`` for each of ``paths`` concurrently; ``options``
+        are passed on to each of them.
+        """
+        return cls(_map(functools.partial(Keychain, **options), paths))
+
+    def unlock(self, password, lazy=False, workers=1):
+        """
+        Unlocks each keychain that is still locked with the master
+        ``password``, returning ``True`` only if they're all unlocked.
+        Keychains that are already unlocked are left alone, so keychains
+        with different master passwords can be unlocked one at a time.
+        """
+        _map(
+            lambda keychain: keychain.unlock(password, lazy=lazy,
+                                             workers=workers),
+            [keychain for keychain in self.keychains if keychain.locked],
+        )
+        return not self.locked
+
+    def lock(self):
+        """
+        Locks every keychain, which also closes their watchers.
+        """
+        for keychain in self.keychains:
+            keychain.lock()
+
+    def close(self):
+        for keychain in self.keychains:
+            keychain.close()
+
+    @property
+    def locked(self):
+        return any(keychain.locked for keychain in self.keychains)
+
+    def item(self, name, fuzzy_threshold=100):
+        """
+        Looks ``name`` up in every keychain at once, returning the best
+        match. Exact matches beat matches that differ in case or
+        whitespace, which beat fuzzy matches; ties go to the earliest
+        keychain.
+        """
+        def find(keychain):
+            if keychain._watcher is not None:
+                keychain.refresh()
+            return keychain._find_name(name, fuzzy_threshold)
+
+        best = None
+        for keychain, match in zip(self.keychains, _map(find, self.keychains)):
+            if match is not None and (best is None or match[1] > best[1][1]):
+                best = keychain, match
+        if best is None:
+            return None
+        keychain, match = best
+        return keychain._item_named(match[0])
+
+    def item_for_url(self, url):
+        """
+        Returns the item for ``url`` from the first keychain that has one.
+        """
+        for keychain in self.keychains:
+            item = keychain.item_for_url(url)
+            if item is not None:
+                return item
+        return None
+
+    def iter_decrypted(self, workers=1):
+        return itertools.chain.from_iterable(
+            keychain.iter_decrypted(workers=workers)
+            for keychain in self.keychains
+        )
+
+    def prefetch_metadata(self, names=None, workers=8):
+        _map(lambda keychain: keychain.prefetch_metadata(names, workers),
+             self.keychains)
+
+    def watch(self, interval=1):
+        for keychain in self.keychains:
+            keychain.watch(interval=interval)
+
+    def refresh(self):
+        return any([keychain.refresh() for keychain in self.keychains])
+
+
+def _map(function, values):
+    values = list(values)
+    if len(values) < 2:
+        return [function(value) for value in values]
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=len(values)) as executor:
+        return list(executor.map(function, values))
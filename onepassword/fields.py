@@ -0,0 +1,141 @@
+from collections import OrderedDict
+import json
+import re
+
+STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+_decoder = json.JSONDecoder()
+
+
+def find_field(decrypted_json, name):
+    """
+    Returns the value of the field called ``name`` (ignoring case) in an
+    item's decrypted JSON, or ``None``. Any of these can match, and
+    whichever comes first in the JSON wins:
+
+    * a web form field whose ``designation`` or ``name`` is ``name``
+    * a string value with the key ``name`` at the top level, such as a
+      password item's ``password``
+    * a field titled ``name`` in one of the item's sections, such as a
+      one-time password
+
+    The JSON is scanned rather than parsed into one dictionary: only the
+    members up to the field are read, and nothing after it, so large notes
+    or attachments after the fields cost nothing.
+    """
+    name = name.lower()
+    try:
+        return _find(_scanned_members(decrypted_json), name)
+    except (ValueError, AttributeError, IndexError):
+        # Not the JSON we expected; decode all of it to be sure.
+        data = json.loads(decrypted_json, object_pairs_hook=OrderedDict)
+        if not isinstance(data, dict):
+            return None
+        return _find(_decoded_members(data), name)
+
+
+def _find(members, name):
+    for key, load, elements in members:
+        if key == "fields":
+            for field in elements():
+                if _field_name_matches(field, name, ("designation", "name")):
+                    return field.get("value")
+        elif key == "sections":
+            for section in elements():
+                for field in _section_fields(section):
+                    if _field_name_matches(field, name, ("t", "n")):
+                        return field.get("v")
+        elif key.lower() == name:
+            value = load()
+            if isinstance(value, (type(u""), str)):
+                return value
+    return None
+
+
+def _field_name_matches(field, name, keys):
+    if not isinstance(field, dict):
+        return False
+    for key in keys:
+        value = field.get(key)
+        if isinstance(value, (type(u""), str)) and value.lower() == name:
+            return True
+    return False
+
+
+def _section_fields(section):
+    if isinstance(section, dict) and isinstance(section.get("fields"), list):
+        return section["fields"]
+    return ()
+
+
+def _decoded_members(data):
+    for key, value in data.items():
+        yield (key, lambda value=value: value,
+               lambda value=value: value if isinstance(value, list) else ())
+
+
+def _scanned_members(text):
+    """
+    Yields a ``(key, load, elements)`` tuple for each member of the JSON
+    object in ``text``: ``load`` decodes the member's value, and
+    ``elements`` decodes the elements of an array value one at a time.
+    Values that aren't used are passed over with ``json``'s own scanner,
+    which is quicker than matching them with a regular expression.
+    """
+    position = _expect(text, _skip(text, 0), "{")
+    if text[_skip(text, position)] == "}":
+        return
+
+    while True:
+        position = _skip(text, position)
+        end = STRING.match(text, position).end()
+        key = json.loads(text[position:end])
+        start = _skip(text, _expect(text, _skip(text, end), ":"))
+        consumed = []
+
+        def load(start=start):
+            value, end = _decoder.raw_decode(text, start)
+            consumed.append(end)
+            return value
+
+        def elements(start=start):
+            return _elements(text, start, consumed)
+
+        yield key, load, elements
+
+        if consumed:
+            position = consumed[-1]
+        else:
+            position = _decoder.raw_decode(text, start)[1]
+        position = _skip(text, position)
+        if text[position] == "}":
+            return
+        position = _expect(text, position, ",")
+
+
+def _elements(text, position, consumed):
+    if text[position] != "[":
+        return
+    position = _skip(text, position + 1)
+    if text[position] == "]":
+        consumed.append(position + 1)
+        return
+    while True:
+        value, position = _decoder.raw_decode(text, position)
+        yield value
+        position = _skip(text, position)
+        if text[position] == "]":
+            consumed.append(position + 1)
+            return
+        position = _skip(text, _expect(text, position, ","))
+
+
+def _skip(text, position):
+    return WHITESPACE.match(text, position).end()
+
+
+def _expect(text, position, character):
+    if text[position] != character:
+        raise ValueError("Expected '%s' at %d" % (character, position))
+    return position + 1
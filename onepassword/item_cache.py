@@ -0,0 +1,76 @@
+from collections import OrderedDict
+import threading
+import time
+
+DEFAULT_MAX_BYTES = 1024 * 1024
+DEFAULT_TTL = 5 * 60
+
+
+class DecryptedItemCache(object):
+    """
+    A least recently used cache of decrypted item data, for processes that
+    look the same items up again and again. It holds at most ``max_bytes``
+    of data, each entry for at most ``ttl`` seconds, and overwrites each
+    entry's buffer with zeros when it is evicted.
+
+    Only the cache's own buffers are wiped: the strings parsed from them
+    live until Python frees them.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL,
+                 clock=time.time):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, identifier):
+        """
+        Returns a copy of the cached data for the item with ``identifier``
+        as a ``bytearray``, or ``None``. The copy is made while holding the
+        lock, so another thread evicting the entry can't wipe it; it's the
+        caller's to wipe once it has been parsed.
+        """
+        with self._lock:
+            entry = self._entries.get(identifier)
+            if entry is None:
+                return None
+            expires, data = entry
+            if expires < self._clock():
+                self._evict(identifier)
+                return None
+            self._entries.pop(identifier)
+            self._entries[identifier] = entry
+            return bytearray(data)
+
+    def put(self, identifier, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if identifier in self._entries:
+                self._evict(identifier)
+            self._entries[identifier] = (self._clock() + self.ttl,
+                                         bytearray(data))
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                self._evict(next(iter(self._entries)))
+
+    def discard(self, identifier):
+        with self._lock:
+            if identifier in self._entries:
+                self._evict(identifier)
+
+    def clear(self):
+        with self._lock:
+            while self._entries:
+                self._evict(next(iter(self._entries)))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self, identifier):
+        _, data = self._entries.pop(identifier)
+        self._size -= len(data)
+        data[:] = b"\x00" * len(data)
@@ -0,0 +1,174 @@
+from array import array
+import json
+
+TOMBSTONE_TYPE = "system.Tombstone"
+CHUNK_SIZE = 64 * 1024
+
+
+class ItemTable(object):
+    """
+    The rows of ``contents.js``, kept column by column rather than as an
+    object per row. Repeated types and domains share a single string, and
+    tombstones (deleted items) only have their identifiers kept.
+    """
+
+    def __init__(self, rows=()):
+        self.identifiers = []
+        self.types = []
+        self.names = []
+        self.domains = []
+        self.timestamps = array("d")
+        self.tombstones = []
+        self._positions = {}
+        self._strings = {}
+        for row in rows:
+            self.append(row)
+
+    @classmethod
+    def from_columns(cls, columns):
+        """
+        Rebuilds a table from the output of ``columns``. Raises a
+        ``ValueError`` if they aren't the columns of a table.
+        """
+        if not isinstance(columns, tuple) or len(columns) != 7:
+            raise ValueError("Expected 7 columns")
+        table = cls()
+        (table.identifiers, table.types, table.names, table.domains,
+            timestamps, table.tombstones, table._positions) = columns
+        lists = (table.identifiers, table.types, table.names, table.domains,
+                 table.tombstones)
+        if not all(isinstance(column, list) for column in lists) or \
+                not isinstance(table._positions, dict) or \
+                not isinstance(timestamps, bytes):
+            raise ValueError("Unexpected column types")
+        table.timestamps.frombytes(timestamps)
+        rows = len(table.names)
+        if any(len(column) != rows for column in (
+                table.identifiers, table.types, table.domains,
+                table.timestamps)):
+            raise ValueError("Columns have different lengths")
+        return table
+
+    def columns(self):
+        """
+        The table's contents as a tuple of built in types, suitable for
+        ``marshal``.
+        """
+        return (self.identifiers, self.types, self.names, self.domains,
+                self.timestamps.tobytes(), self.tombstones, self._positions)
+
+    def append(self, row):
+        """
+        Adds a row of ``contents.js``. Rows missing a domain or timestamp
+        get ``None`` and 0, and rows without even a name are skipped.
+        """
+        if len(row) < 3:
+            return
+        identifier, type, name, domain, timestamp = \
+            (list(row[0:5]) + [None, None])[0:5]
+        if type == TOMBSTONE_TYPE:
+            self.tombstones.append(identifier)
+            return
+
+        self._positions[name] = len(self.names)
+        self.identifiers.append(identifier)
+        self.types.append(self._shared(type))
+        self.names.append(name)
+        self.domains.append(self._shared(domain))
+        self.timestamps.append(timestamp or 0)
+
+    def position(self, name):
+        """
+        The position of the row called ``name``, or ``None``. When several
+        rows share a name the last one wins.
+        """
+        return self._positions.get(name)
+
+    def row(self, position):
+        return (
+            self.identifiers[position],
+            self.types[position],
+            self.names[position],
+            self.domains[position],
+            int(self.timestamps[position]),
+        )
+
+    def changed_identifiers(self, other):
+        """
+        The identifiers of the items that were added, removed (including by
+        becoming tombstones) or changed between this table and ``other``.
+        """
+        old = self._rows_by_identifier()
+        new = other._rows_by_identifier()
+        return set(
+            identifier for identifier in set(old) | set(new)
+            if old.get(identifier) != new.get(identifier)
+        )
+
+    def __contains__(self, name):
+        return name in self._positions
+
+    def __len__(self):
+        return len(self.names)
+
+    def _rows_by_identifier(self):
+        return dict(
+            (identifier, self.row(position))
+            for position, identifier in enumerate(self.identifiers)
+        )
+
+    def _shared(self, string):
+        return self._strings.setdefault(string, string)
+
+
+def iter_rows(f, chunk_size=CHUNK_SIZE):
+    """
+    Yields the rows of the ``contents.js`` file ``f`` one at a time, reading
+    it ``chunk_size`` characters at a time rather than all at once.
+    """
+    decoder = json.JSONDecoder()
+    buffer = f.read(chunk_size)
+    while buffer and not buffer.strip():
+        buffer = f.read(chunk_size)
+    position = _skip(buffer, 0, " \t\r\n")
+    if buffer[position:position + 1] != "[":
+        raise ValueError("contents.js isn't a JSON array")
+    position += 1
+
+    while True:
+        position = _skip(buffer, position, " \t\r\n,")
+        if buffer[position:position + 1] == "]":
+            return
+        try:
+            if position == len(buffer):
+                raise ValueError("need more data")
+            row, position = decoder.raw_decode(buffer, position)
+        except ValueError:
+            # The row continues past the end of the buffer.
+            more = f.read(chunk_size)
+            if not more:
+                raise ValueError("contents.js ends part way through a row")
+            buffer = buffer[position:] + more
+            position = 0
+            continue
+        yield row
+        if position >= chunk_size:
+            buffer = buffer[position:]
+            position = 0
+
+
+def find_row(f, name):
+    """
+    Returns the first row of ``contents.js`` (other than tombstones) called
+    ``name``, reading no further than it, or ``None``.
+    """
+    for row in iter_rows(f):
+        if len(row) > 2 and row[2] == name and row[1] != TOMBSTONE_TYPE:
+            return row
+    return None
+
+
+def _skip(buffer, position, characters):
+    while position < len(buffer) and buffer[position] in characters:
+        position += 1
+    return position
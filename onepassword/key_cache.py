@@ -0,0 +1,118 @@
+from base64 import b64decode, b64encode
+from hashlib import sha1, sha256
+import hmac
+import json
+import os
+import time
+
+from .utils import private_directory, user_cache_dir, wipe_file, \
+    write_private_file
+
+DEFAULT_TTL = 5 * 60
+
+
+def default_directory():
+    return os.path.join(user_cache_dir(), "keys")
+
+
+class DerivedKeyCache(object):
+    """
+    Keeps the result of each encryption key's PBKDF2 derivation in a private
+    file for ``ttl`` seconds, so processes started in quick succession can
+    skip the expensive key derivation.
+
+    Entries are keyed on the salt and iteration count, and only returned for
+    the master password they were stored with, until they expire or the
+    ``source`` file (``encryptionKeys.js``) changes.
+
+    Nothing runs in the background to wipe expired entries. Instead they're
+    wiped whenever a cache is opened or stored to (or a ``Keychain`` using
+    one is locked), so an entry can outlive its expiry on disk until 1pass
+    next runs; it's never returned after it.
+    """
+
+    def __init__(self, source, directory=None, ttl=DEFAULT_TTL):
+        self.directory = directory or default_directory()
+        self.ttl = ttl
+        self._fingerprint = self._fingerprint_of(source)
+        self.wipe_expired_entries()
+
+    def get(self, password, salt, iterations):
+        """
+        Returns the cached derivation for the key, or ``None``.
+        """
+        path = self._entry_path(salt, iterations)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+
+        if entry["expires"] < time.time() or \
+           entry["source"] != self._fingerprint:
+            wipe_file(path)
+            return None
+
+        derived = b64decode(entry["key"])
+        if not hmac.compare_digest(entry["check"],
+                                   self._check(derived, password)):
+            return None
+        return derived
+
+    def store(self, password, salt, iterations, derived):
+        entry = {
+            "expires": time.time() + self.ttl,
+            "source": self._fingerprint,
+            "check": self._check(derived, password),
+            "key": b64encode(derived).decode("ascii"),
+        }
+        private_directory(self.directory)
+        write_private_file(
+            self._entry_path(salt, iterations),
+            json.dumps(entry).encode("utf-8"),
+        )
+        self.wipe_expired_entries()
+
+    @classmethod
+    def purge(cls, directory=None):
+        """
+        Wipes every cached derivation.
+        """
+        directory = directory or default_directory()
+        for path in cls._entry_paths(directory):
+            wipe_file(path)
+
+    def wipe_expired_entries(self):
+        """
+        Wipes every entry that has expired, or can't be read.
+        """
+        now = time.time()
+        for path in self._entry_paths(self.directory):
+            try:
+                with open(path, "r") as f:
+                    expired = json.load(f)["expires"] < now
+            except (IOError, OSError, ValueError, KeyError):
+                expired = True
+            if expired:
+                wipe_file(path)
+
+    @staticmethod
+    def _entry_paths(directory):
+        if not os.path.isdir(directory):
+            return []
+        return [
+            os.path.join(directory, filename)
+            for filename in os.listdir(directory)
+            if filename.endswith(".key")
+        ]
+
+    def _entry_path(self, salt, iterations):
+        name = sha256(salt + str(iterations).encode()).hexdigest()
+        return os.path.join(self.directory, "%s.key" % name)
+
+    def _check(self, derived, password):
+        return hmac.new(derived, password.encode(), sha256).hexdigest()
+
+    def _fingerprint_of(self, source):
+        with open(source, "rb") as f:
+            return sha1(f.read()).hexdigest()
@@ -1,46 +1,301 @@
+import collections
 import json
 import os
+import re
 import functools
-from fuzzywuzzy import process
+import threading
 
+from onepassword.domains import DomainIndex
 from onepassword.encryption_key import EncryptionKey
+from onepassword.fields import find_field
+from onepassword.item_table import ItemTable, find_row
+from onepassword.key_cache import DerivedKeyCache
+from onepassword.search import SearchIndex, normalise
+from onepassword.tracing import traced
+from onepassword.watcher import WATCHED_FILES
+
+# Scores for names found without fuzzy matching, which scores up to 100.
+EXACT_SCORE = 102
+NORMALISED_SCORE = 101
+
+
+class KeychainLockedError(Exception):
+    """
+    Raised when an item is decrypted while the keychain is locked, for
+    example because ``refresh`` found changed encryption keys that can't be
+    derived without the master password.
+    """
 
 
 class Keychain(object):
-    def __init__(self, path):
+    def __init__(self, path, key_cache_ttl=0, table_cache=None,
+                 item_cache=None, tracer=None, stream_items=False):
+        """
+        Loads the keychain at ``path``. A positive ``key_cache_ttl`` caches
+        each encryption key's derivation on disk for that many seconds (see
+        ``DerivedKeyCache``), and an ``ItemTableCache`` given as
+        ``table_cache`` saves parsing ``contents.js`` when it hasn't changed.
+        A ``DecryptedItemCache`` given as ``item_cache`` keeps recently
+        looked up items decrypted until the keychain is locked again.
+
+        With ``stream_items`` set, ``contents.js`` isn't loaded up front.
+        Instead ``item`` reads it row by row until it finds an item with
+        exactly the name asked for, and the whole list is only loaded when
+        that fails or something else needs it. This suits processes that
+        look up a single item. When several items share a name, streaming
+        returns the first of them, while a loaded list (as without
+        ``stream_items``) returns the last, as always.
+
+        A ``tracer`` is called with a ``Span`` (see ``onepassword.tracing``)
+        as each phase of work finishes: "load keys", "load items", "unlock
+        key", "stream items", "match", "read item" and "decrypt".
+        """
         self._path = os.path.expanduser(path)
+        self._key_cache_ttl = key_cache_ttl
+        self._table_cache = table_cache
+        self._item_cache = item_cache
+        self._tracer = tracer
+        # Guards loading and reloading, so lookups can run on several
+        # threads (as AsyncKeychain and SecretServer do).
+        self._lock = threading.RLock()
+        if tracer is not None:
+            self._trace_phases(tracer)
         self._load_encryption_keys()
-        self._load_item_list()
+        self._item_table = None
+        if stream_items:
+            self._items_version = self._file_version(
+                self._data_path("contents.js"))
+            self._normalised_names = None
+            self._index = None
+            self._domains = None
+        else:
+            self._load_item_list()
         self._locked = True
+        self._password = None
+        self._metadata = {}
+        self._prefetched = {}
+        self._watcher = None
+
+    def unlock(self, password, lazy=False, workers=1):
+        """
+        Unlocks the keychain using the master ``password``. Normally every
+        encryption key is derived straight away; when ``lazy`` is set only
+        the first key is derived (to check the password) and the others are
+        derived the first time ``key`` returns them.
 
-    def unlock(self, password):
+        With more than one ``workers`` the keys are derived concurrently on a
+        thread pool, so unlocking takes about as long as the slowest key.
+        """
         def unlocker(key):
             return key.unlock(password)
 
-        unlock_results = map(unlocker, self._encryption_keys.values())
+        keys = list(self._encryption_keys.values())
+        if lazy:
+            keys = keys[:1]
+
+        if workers > 1 and len(keys) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                unlock_results = list(executor.map(unlocker, keys))
+        else:
+            unlock_results = map(unlocker, keys)
         result = functools.reduce(lambda x, y: x and y, unlock_results)
         self._locked = not result
+        keep_password = lazy or self._watcher is not None
+        self._password = password if keep_password and result else None
         return result
 
+    def lock(self):
+        """
+        Forgets the decrypted encryption keys and any cached items, wipes
+        expired cached key derivations, and stops watching the keychain (see
+        ``close``).
+        """
+        self.close()
+        for key in self._encryption_keys.values():
+            key.lock()
+        if self._item_cache is not None:
+            self._item_cache.clear()
+        if self._key_cache is not None:
+            self._key_cache.wipe_expired_entries()
+        self._locked = True
+        self._password = None
+
     def item(self, name, fuzzy_threshold=100):
         """
         Extract a password from an unlocked Keychain using fuzzy
         matching. ``fuzzy_threshold`` can be an integer between 0 and
         100, where 100 is an exact match.
+
+        Names that match exactly, or that differ only in case and
+        whitespace, are found without any fuzzy matching.
         """
-        match = process.extractOne(
-            name,
-            self._items.keys(),
-            score_cutoff=(fuzzy_threshold-1),
-        )
-        if match:
-            exact_name = match[0]
-            item = self._items[exact_name]
-            item.decrypt_with(self)
-            return item
+        if self._watcher is not None:
+            self.refresh()
+
+        if self._item_table is None:
+            row = self._stream_row(name)
+            if row is not None:
+                item = self._build_item_from_row(row)
+                self._decrypt_item(item)
+                return item
+
+        match = self._find_name(name, fuzzy_threshold)
+        if match is not None:
+            return self._item_named(match[0])
         else:
             return None
 
+    def item_for_url(self, url):
+        """
+        Returns the item for the site at ``url`` from an unlocked Keychain,
+        or ``None``. Items whose domain is the URL's host, or the closest
+        parent domain of it, match; if several do, the most recently
+        updated one is returned.
+        """
+        if self._watcher is not None:
+            self.refresh()
+
+        positions = self._domain_index.positions(url)
+        if not positions:
+            return None
+        position = max(positions, key=lambda p: self._items.timestamps[p])
+        item = self._build_item(position)
+        self._decrypt_item(item)
+        return item
+
+    def iter_decrypted(self, workers=1):
+        """
+        Yields an ``(item, contents)`` tuple for every item in an unlocked
+        Keychain, in ``contents.js`` order, where ``contents`` is the item's
+        decrypted data. Nothing is kept once it has been yielded, so memory
+        use doesn't grow with the size of the keychain.
+
+        With one worker items are decrypted with each key's
+        ``decrypt_many``, reusing its buffer from one item to the next. With
+        more than one ``workers`` items are read and decrypted on a thread
+        pool, a few items ahead of the one being yielded.
+        """
+        self._check_unlocked()
+
+        def decrypt(item):
+            return item, item.decrypt(self)
+
+        items = (
+            self._build_item(position)
+            for position in range(len(self._items))
+        )
+
+        if workers <= 1:
+            decrypter = _BulkDecrypter()
+            try:
+                for item in items:
+                    yield item, item.decrypt(self, decrypter)
+            finally:
+                decrypter.close()
+            return
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = collections.deque()
+            for item in items:
+                pending.append(executor.submit(decrypt, item))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def prefetch_metadata(self, names=None, workers=8):
+        """
+        Reads the key identifier and security level of the named items (or
+        of every item) ``workers`` files at a time, and remembers them for
+        later lookups.
+
+        Named items are about to be looked up, so their encrypted data is
+        read at the same time and kept until they are, rather than reading
+        each file twice. Otherwise encrypted data is only read when an item
+        is decrypted.
+        """
+        if names is None:
+            positions = range(len(self._items))
+        else:
+            positions = [self._items.position(name) for name in names
+                         if name in self._items]
+        items = [
+            item for item in (self._build_item(p) for p in positions)
+            if item.identifier not in self._metadata and
+            item.identifier not in self._prefetched
+        ]
+        if names is not None and self._item_cache is not None:
+            items = [item for item in items
+                     if self._item_cache.get(item.identifier) is None]
+        read = KeychainItem.read_metadata if names is None else _prefetch_item
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for item, metadata in zip(items, executor.map(read, items)):
+                if metadata is None:
+                    continue
+                self._metadata[item.identifier] = metadata
+                if names is not None:
+                    self._prefetched[item.identifier] = item
+
+    def watch(self, interval=1):
+        """
+        Keeps the keychain up to date with changes made by other programs,
+        such as a sync client: from now on ``item`` calls ``refresh``
+        first. Changes are noticed with inotify if the ``inotify_simple``
+        package is installed, and otherwise by checking ``contents.js`` and
+        ``encryptionKeys.js`` at most every ``interval`` seconds.
+
+        Call it before ``unlock``: a watched keychain keeps the master
+        password, so that encryption keys changed by a sync can be derived.
+        Otherwise a change to them locks the keychain again.
+        """
+        if self._watcher is None:
+            from onepassword.watcher import watcher_for
+            self._watcher = watcher_for(self._data_path(), interval=interval)
+
+    def close(self):
+        """
+        Stops watching the keychain for changes, releasing the watcher's
+        inotify file descriptor. Call ``watch`` again to start again.
+        """
+        with self._lock:
+            if self._watcher is not None:
+                self._watcher.close()
+                self._watcher = None
+
+    def refresh(self):
+        """
+        Applies changes to ``contents.js``, ``encryptionKeys.js`` and the item
+        files, returning ``True`` if there were any. Only what changed is
+        forgotten: other items' cached data, unchanged encryption keys and,
+        unless item names changed, the search index are kept.
+        """
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self):
+        if self._watcher is None:
+            changed_files = WATCHED_FILES
+        else:
+            changed_files = self._watcher.changes()
+
+        keys_changed = False
+        if "encryptionKeys.js" in changed_files:
+            keys_changed = self._reload_encryption_keys()
+
+        identifiers = set(
+            filename[:-len(".1password")] for filename in changed_files
+            if filename.endswith(".1password")
+        )
+        if "contents.js" in changed_files:
+            identifiers.update(self._reload_item_list())
+        for identifier in identifiers:
+            self._forget_item(identifier)
+        return keys_changed or bool(identifiers)
+
     def key(self, identifier=None, security_level=None):
         """
         Tries to find an encryption key, first using the ``identifier`` and
@@ -49,81 +304,409 @@ class Keychain(object):
         """
         if identifier:
             try:
-                return self._encryption_keys[identifier]
+                return self._unlocked(self._encryption_keys[identifier])
             except KeyError:
                 pass
         if security_level:
             for key in self._encryption_keys.values():
                 if key.level == security_level:
-                    return key
+                    return self._unlocked(key)
 
     @property
     def locked(self):
         return self._locked
 
+    @property
+    def _items(self):
+        table = self._item_table
+        if table is None:
+            with self._lock:
+                if self._item_table is None:
+                    self._load_item_list()
+                table = self._item_table
+        return table
+
+    @property
+    def _domain_index(self):
+        return self._derived("_domains",
+                             lambda items: DomainIndex(items.domains))
+
+    @property
+    def _search_index(self):
+        return self._derived("_index", lambda items: SearchIndex(items.names))
+
+    def _derived(self, attribute, build):
+        """
+        Returns the index of the item table kept in ``attribute``, building
+        it with ``build`` first if need be. It's built completely before
+        anyone else can see it, and isn't kept if the table was reloaded
+        while it was being built.
+        """
+        value = getattr(self, attribute)
+        if value is None:
+            items = self._items
+            value = build(items)
+            with self._lock:
+                if self._item_table is items:
+                    setattr(self, attribute, value)
+        return value
+
+    def _find_name(self, name, fuzzy_threshold):
+        """
+        Returns the name of the best matching item and its score, or
+        ``None``. Exact and normalised matches score above any fuzzy match.
+        """
+        if name in self._items:
+            return name, EXACT_SCORE
+
+        normalised_names = self._derived("_normalised_names",
+                                         _normalised_names)
+        normalised_name = normalised_names.get(normalise(name))
+        if normalised_name is not None:
+            return normalised_name, NORMALISED_SCORE
+
+        match = self._search_index.best_match(
+            name,
+            score_cutoff=(fuzzy_threshold-1),
+        )
+        if match:
+            return match[0], match[1]
+
+    def _item_named(self, name):
+        item = self._build_item(self._items.position(name))
+        self._decrypt_item(item)
+        return item
+
+    def _decrypt_item(self, item):
+        self._check_unlocked()
+        if self._item_cache is None:
+            self._read_item(item)
+            item.decrypt_with(self)
+            return
+
+        decrypted_json = self._item_cache.get(item.identifier)
+        if decrypted_json is not None:
+            item.load_decrypted(decrypted_json)
+            decrypted_json[:] = b"\x00" * len(decrypted_json)
+        else:
+            self._read_item(item)
+            self._item_cache.put(item.identifier, item.decrypt_with(self))
+
+    def _check_unlocked(self):
+        if self._locked:
+            raise KeychainLockedError("The keychain is locked")
+
+    def _read_item(self, item):
+        item._lazily_load("_encrypted_json")
+
+    def _trace_phases(self, tracer):
+        self._load_encryption_keys = traced(
+            tracer, "load keys", self._load_encryption_keys)
+        self._read_item_table = traced(
+            tracer, "load items", self._read_item_table)
+        self._stream_row = traced(tracer, "stream items", self._stream_row)
+        self._find_name = traced(tracer, "match", self._find_name)
+        self._read_item = traced(tracer, "read item", self._read_item)
+
+    def _build_item(self, position):
+        return self._build_item_from_row(self._items.row(position))
+
+    def _build_item_from_row(self, row):
+        prefetched = self._prefetched.pop(row[0], None)
+        if prefetched is not None:
+            return prefetched
+        item = KeychainItem.build(row, self._path)
+        metadata = self._metadata.get(item.identifier)
+        if metadata is not None:
+            item.key_identifier, item.security_level = metadata
+        return item
+
+    def _unlocked(self, key):
+        if self._password is None or key.unlocked:
+            return key
+        with self._lock:
+            if self._password is not None and not key.unlocked and \
+                    not key.unlock(self._password):
+                # The master password has changed since it was kept.
+                self._locked = True
+                self._password = None
+                raise KeychainLockedError("The keychain is locked")
+        return key
+
+    def _forget_item(self, identifier):
+        self._metadata.pop(identifier, None)
+        self._prefetched.pop(identifier, None)
+        if self._item_cache is not None:
+            self._item_cache.discard(identifier)
+
     def _load_encryption_keys(self):
-        path = os.path.join(self._path, "data", "default", "encryptionKeys.js")
+        path = self._data_path("encryptionKeys.js")
+        self._keys_version = self._file_version(path)
         with open(path, "r") as f:
             key_data = json.load(f)
 
+        cache = None
+        if self._key_cache_ttl > 0:
+            cache = DerivedKeyCache(path, ttl=self._key_cache_ttl)
+        self._key_cache = cache
+
         self._encryption_keys = {}
+        self._key_definitions = {}
         for key_definition in key_data["list"]:
-            key = EncryptionKey(**key_definition)
+            key = EncryptionKey(cache=cache, tracer=self._tracer,
+                                **key_definition)
             self._encryption_keys[key.identifier] = key
+            self._key_definitions[key.identifier] = key_definition
+
+    def _reload_encryption_keys(self):
+        if self._file_version(self._data_path("encryptionKeys.js")) == \
+                self._keys_version:
+            return False
+
+        old_keys = self._encryption_keys
+        old_definitions = self._key_definitions
+        self._load_encryption_keys()
+        changed = False
+        for identifier, definition in self._key_definitions.items():
+            if old_definitions.get(identifier) == definition:
+                self._encryption_keys[identifier] = old_keys[identifier]
+                continue
+            changed = True
+            if self._password is None:
+                # Without the password the new key can't be derived, so the
+                # keychain needs unlocking again.
+                self._locked = True
+        return changed or set(old_definitions) != set(self._key_definitions)
 
     def _load_item_list(self):
-        path = os.path.join(self._path, "data", "default", "contents.js")
+        path = self._data_path("contents.js")
+        self._items_version = self._file_version(path)
+        self._item_table = self._read_item_table(path)
+        self._normalised_names = None
+        self._index = None
+        self._domains = None
+
+    def _stream_row(self, name):
+        with open(self._data_path("contents.js"), "r") as f:
+            return find_row(f, name)
+
+    def _reload_item_list(self):
+        """
+        Reloads ``contents.js`` if it has changed, returning the identifiers
+        of the items that changed with it.
+        """
+        path = self._data_path("contents.js")
+        if self._file_version(path) == self._items_version:
+            return set()
+
+        old_items = self._item_table
+        normalised_names, index = self._normalised_names, self._index
+        domains = self._domains
+        self._load_item_list()
+        if old_items is None:
+            # Items found by streaming could be any of them.
+            return set(self._item_table.identifiers)
+        if self._item_table.names == old_items.names:
+            self._normalised_names = normalised_names
+            self._index = index
+        if self._item_table.domains == old_items.domains:
+            self._domains = domains
+        return old_items.changed_identifiers(self._item_table)
+
+    def _data_path(self, filename=""):
+        return os.path.join(self._path, "data", "default", filename)
+
+    def _file_version(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, getattr(stat, "st_mtime_ns", stat.st_mtime)
+
+    def _read_item_table(self, path):
+        cache = self._table_cache
+        if cache is None:
+            return self._parse_item_table(path)
+
+        table = cache.load(path)
+        if table is None:
+            fingerprint = cache.fingerprint(path)
+            table = self._parse_item_table(path)
+            cache.store(path, table, fingerprint)
+        return table
+
+    def _parse_item_table(self, path):
         with open(path, "r") as f:
             item_list = json.load(f)
+        return ItemTable(item_list)
+
+
+def _normalised_names(items):
+    normalised_names = {}
+    for name in items.names:
+        normalised_names.setdefault(normalise(name), name)
+    return normalised_names
+
+
+def _prefetch_item(item):
+    """
+    Reads all of ``item``'s data file, returning its key identifier and
+    security level, or ``None`` if it can't be read.
+    """
+    try:
+        item._read_data_file()
+    except (IOError, OSError, ValueError, KeyError):
+        return None
+    return item.key_identifier, item.security_level
+
+
+class _BulkDecrypter(object):
+    """
+    Decrypts data with a given key through one ``decrypt_many`` generator
+    per key, feeding each generator one item at a time.
+    """
+
+    def __init__(self):
+        self._generators = {}
 
-        self._items = {}
-        for item_definition in item_list:
-            item = KeychainItem.build(item_definition, self._path)
-            self._items[item.name] = item
+    def __call__(self, key, b64_data):
+        try:
+            pending, generator = self._generators[key]
+        except KeyError:
+            pending = collections.deque()
+            generator = key.decrypt_many(iter(pending.popleft, None))
+            self._generators[key] = pending, generator
+        pending.append(b64_data)
+        return next(generator)
+
+    def close(self):
+        """
+        Finishes each key's generator, wiping its buffer.
+        """
+        for _, generator in self._generators.values():
+            generator.close()
+        self._generators.clear()
 
 
 class KeychainItem(object):
+    ENCRYPTED_PAYLOAD = re.compile(r'"encrypted"\s*:\s*"[^"]*"')
+
+    __slots__ = (
+        "identifier", "name", "domain", "password", "_path", "_type",
+        "_key_identifier", "_security_level", "_encrypted_json",
+        "_decrypted_json",
+    )
+
     @classmethod
     def build(cls, row, path):
         identifier = row[0]
         type = row[1]
         name = row[2]
+        domain = row[3] if len(row) > 3 else None
         if type == "webforms.WebForm":
-            return WebFormKeychainItem(identifier, name, path, type)
+            return WebFormKeychainItem(identifier, name, path, type, domain)
         elif type == "passwords.Password" or type == "wallet.onlineservices.GenericAccount":
-            return PasswordKeychainItem(identifier, name, path, type)
+            return PasswordKeychainItem(identifier, name, path, type, domain)
         else:
-            return KeychainItem(identifier, name, path, type)
+            return KeychainItem(identifier, name, path, type, domain)
 
-    def __init__(self, identifier, name, path, type):
+    def __init__(self, identifier, name, path, type, domain=None):
         self.identifier = identifier
         self.name = name
+        self.domain = domain
         self.password = None
         self._path = path
         self._type = type
 
+    @property
+    def type(self):
+        return self._type
+
     @property
     def key_identifier(self):
         return self._lazily_load("_key_identifier")
 
+    @key_identifier.setter
+    def key_identifier(self, value):
+        self._key_identifier = value
+
     @property
     def security_level(self):
         return self._lazily_load("_security_level")
 
+    @security_level.setter
+    def security_level(self, value):
+        self._security_level = value
+
+    def read_metadata(self):
+        """
+        Returns the item's key identifier and security level, without
+        decoding its encrypted data, or ``None`` if its file can't be read.
+        """
+        try:
+            with open(self._data_file_path(), "r") as f:
+                contents = f.read()
+        except (IOError, OSError):
+            return None
+
+        try:
+            item_data = json.loads(
+                self.ENCRYPTED_PAYLOAD.sub('"encrypted":null', contents, 1))
+        except ValueError:
+            item_data = json.loads(contents)
+        return item_data.get("keyID"), item_data.get("securityLevel")
+
     def decrypt_with(self, keychain):
         key = keychain.key(
             identifier=self.key_identifier,
             security_level=self.security_level,
         )
         encrypted_json = self._lazily_load("_encrypted_json")
-        decrypted_json = key.decrypt(self._encrypted_json)
+        decrypted_json = key.decrypt(encrypted_json)
+        self.load_decrypted(decrypted_json)
+        return decrypted_json
 
-        if isinstance(decrypted_json, bytes):
-            decrypted_json = decrypted_json.decode('utf-8')
-
-        self._data = json.loads(decrypted_json)
+    def load_decrypted(self, decrypted_json):
+        """
+        Sets the item's data and password from its decrypted JSON.
+        """
+        self._decrypted_json = self._decode(decrypted_json)
         self.password = self._find_password()
 
+    def field(self, name):
+        """
+        Returns the value of the decrypted item's field called ``name``, such
+        as "username", or ``None``. Only as much of the item's data as it
+        takes to find the field is decoded; see ``find_field``.
+        """
+        return find_field(self._decrypted_json, name)
+
+    def decrypt(self, keychain, decrypt=None):
+        """
+        Returns the item's decrypted data without keeping it, or the
+        encrypted data it was read from, on the item. If given, ``decrypt``
+        is called with the item's key and encrypted data instead of the
+        key's own ``decrypt``.
+        """
+        item_data = self._load_data_file()
+        key = keychain.key(
+            identifier=item_data.get("keyID"),
+            security_level=item_data.get("securityLevel"),
+        )
+        if decrypt is None:
+            decrypted_json = key.decrypt(item_data["encrypted"])
+        else:
+            decrypted_json = decrypt(key, item_data["encrypted"])
+        return self._parse_json(decrypted_json)
+
+    def _parse_json(self, decrypted_json):
+        return json.loads(self._decode(decrypted_json))
+
+    def _decode(self, decrypted_json):
+        if isinstance(decrypted_json, (bytes, bytearray)):
+            decrypted_json = decrypted_json.decode('utf-8')
+        return decrypted_json
+
     def _find_password(self):
         raise Exception("Cannot extract a password from this type of"
                         " keychain item (%s)" % self._type)
@@ -134,24 +717,29 @@ class KeychainItem(object):
         return getattr(self, attr)
 
     def _read_data_file(self):
-        filename = "%s.1password" % self.identifier
-        path = os.path.join(self._path, "data", "default", filename)
-        with open(path, "r") as f:
-            item_data = json.load(f)
-
+        item_data = self._load_data_file()
         self._key_identifier = item_data.get("keyID")
         self._security_level = item_data.get("securityLevel")
         self._encrypted_json = item_data["encrypted"]
 
+    def _load_data_file(self):
+        with open(self._data_file_path(), "r") as f:
+            return json.load(f)
+
+    def _data_file_path(self):
+        filename = "%s.1password" % self.identifier
+        return os.path.join(self._path, "data", "default", filename)
+
 
 class WebFormKeychainItem(KeychainItem):
+    __slots__ = ()
+
     def _find_password(self):
-        for field in self._data["fields"]:
-            if field.get("designation") == "password" or \
-               field.get("name") == "Password":
-                return field["value"]
+        return self.field("password")
 
 
 class PasswordKeychainItem(KeychainItem):
+    __slots__ = ()
+
     def _find_password(self):
-        return self._data["password"]
+        return self.field("password")
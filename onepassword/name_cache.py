@@ -0,0 +1,90 @@
+from bisect import bisect_left
+from hashlib import sha1
+import json
+import marshal
+import os
+import sys
+
+from .item_table import TOMBSTONE_TYPE
+from .utils import private_directory, user_cache_dir, write_private_file
+
+FORMAT_VERSION = 1
+
+
+def default_directory():
+    return os.path.join(user_cache_dir(), "names")
+
+
+def contents_path(keychain_path):
+    return os.path.join(os.path.expanduser(keychain_path),
+                        "data", "default", "contents.js")
+
+
+class NameCache(object):
+    """
+    Keeps the item names of each keychain sorted (ignoring case) in a small
+    marshalled file, so names can be completed without unlocking, or even
+    loading, the keychain. Like ``ItemTableCache``, a copy is only used
+    while ``contents.js`` has the same size and modification time as when
+    it was made; otherwise it's rebuilt from ``contents.js``.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or default_directory()
+
+    def complete(self, keychain_path, prefix):
+        """
+        The names of the items in the keychain at ``keychain_path`` that
+        start with ``prefix``, ignoring case, in sorted order.
+        """
+        keys, names = self.load(contents_path(keychain_path))
+        prefix = prefix.lower()
+        matches = []
+        for position in range(bisect_left(keys, prefix), len(keys)):
+            if not keys[position].startswith(prefix):
+                break
+            matches.append(names[position])
+        return matches
+
+    def load(self, contents_path):
+        """
+        Returns the lower cased names and the names of the items in
+        ``contents_path``, both sorted by the lower cased names, rebuilding
+        the cached copy if it's out of date.
+        """
+        fingerprint = self.fingerprint(contents_path)
+        try:
+            with open(self._cache_path(contents_path), "rb") as f:
+                cached = marshal.loads(f.read())
+        except (IOError, OSError, EOFError, ValueError, TypeError):
+            cached = None
+
+        if isinstance(cached, tuple) and cached[0] == fingerprint:
+            return cached[1], cached[2]
+
+        keys, names = self._sorted_names(contents_path)
+        try:
+            private_directory(self.directory)
+            write_private_file(self._cache_path(contents_path),
+                               marshal.dumps((fingerprint, keys, names)))
+        except (IOError, OSError):
+            pass
+        return keys, names
+
+    def fingerprint(self, contents_path):
+        stat = os.stat(contents_path)
+        return [FORMAT_VERSION, sys.version_info[0:2], stat.st_size,
+                getattr(stat, "st_mtime_ns", stat.st_mtime)]
+
+    def _sorted_names(self, contents_path):
+        with open(contents_path, "r") as f:
+            rows = json.load(f)
+        pairs = sorted(set(
+            (row[2].lower(), row[2]) for row in rows
+            if len(row) > 2 and row[1] != TOMBSTONE_TYPE
+        ))
+        return [key for key, _ in pairs], [name for _, name in pairs]
+
+    def _cache_path(self, contents_path):
+        key = sha1(os.path.realpath(contents_path).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, "%s.names" % key)
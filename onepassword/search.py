@@ -0,0 +1,137 @@
+from collections import Counter
+import heapq
+from itertools import islice
+
+# fuzzywuzzy is slow to import and only needed for fuzzy lookups, so it's
+# imported where it's used.
+
+
+def normalise(name):
+    """
+    Case folds ``name`` and collapses its whitespace, for lookups that
+    shouldn't care about either.
+    """
+    name = " ".join(name.split())
+    try:
+        return name.casefold()
+    except AttributeError:
+        return name.lower()
+
+
+def trigrams(processed_name):
+    """
+    The set of three character sequences in each word of a name that has
+    been through ``fuzzywuzzy.utils.full_process``.
+    """
+    result = set()
+    for word in processed_name.split():
+        padded = " %s " % word
+        for start in range(len(padded) - 2):
+            result.add(padded[start:start + 3])
+    return result
+
+
+class SearchIndex(object):
+    """
+    Finds the best fuzzy match for a name without scoring every name in the
+    keychain. Only candidates that fuzzywuzzy's ``WRatio`` is likely to
+    score highly are scored: the best ``candidate_limit`` names by the
+    fraction of the query's trigrams they share, by the fraction of their
+    own trigrams they share (short names), and by the number of trigrams
+    from inside the query's words they share (names with the query inside
+    a longer word), with ties going to the names earliest in the keychain.
+    Also scored are the first ``candidate_limit`` names containing each of
+    the query's words that ``WRatio`` scores by their best partial match,
+    since a shared word then scores highly whatever the order. A query with
+    no trigrams in common with any name falls back to scoring every name.
+    """
+
+    CANDIDATE_LIMIT = 200
+
+    def __init__(self, names, candidate_limit=CANDIDATE_LIMIT):
+        from fuzzywuzzy.utils import full_process
+
+        self.candidate_limit = candidate_limit
+        self._names = list(names)
+        self._sizes = []
+        self._lengths = []
+        self._postings = {}
+        self._word_postings = {}
+        for position, name in enumerate(self._names):
+            processed_name = full_process(name)
+            name_trigrams = trigrams(processed_name)
+            self._sizes.append(len(name_trigrams))
+            self._lengths.append(len(processed_name))
+            for trigram in name_trigrams:
+                self._postings.setdefault(trigram, []).append(position)
+            for word in set(processed_name.split()):
+                self._word_postings.setdefault(word, []).append(position)
+
+    def best_match(self, query, score_cutoff=0):
+        """
+        Returns a ``(name, score)`` tuple for the best match scoring at least
+        ``score_cutoff``, or ``None``.
+        """
+        from fuzzywuzzy import process
+
+        return process.extractOne(
+            query,
+            self._candidates(query),
+            score_cutoff=score_cutoff,
+        )
+
+    def _candidates(self, query):
+        from fuzzywuzzy.utils import full_process
+
+        processed_query = full_process(query)
+        query_trigrams = trigrams(processed_query)
+        shared_trigrams = Counter()
+        shared_inner_trigrams = Counter()
+        for trigram in query_trigrams:
+            positions = self._postings.get(trigram, ())
+            shared_trigrams.update(positions)
+            if " " not in trigram:
+                shared_inner_trigrams.update(positions)
+
+        if not shared_trigrams:
+            return self._names
+
+        candidates = self._best(dict(
+            (position, float(shared) / len(query_trigrams))
+            for position, shared in shared_trigrams.items()
+        ))
+        candidates.update(self._best(dict(
+            (position, float(shared) / self._sizes[position])
+            for position, shared in shared_trigrams.items()
+        )))
+        candidates.update(self._best(shared_inner_trigrams))
+        length = len(processed_query)
+        for word in set(processed_query.split()):
+            positions = self._word_postings.get(word, ())
+            candidates.update(islice(
+                (position for position in positions
+                 if self._partially_scored(self._lengths[position], length)),
+                self.candidate_limit,
+            ))
+        # Candidates are scored in keychain order, so the result doesn't
+        # depend on the order of the trigram sets and ties are broken the
+        # same way as they would be by scoring every name.
+        return [self._names[position] for position in sorted(candidates)]
+
+    def _partially_scored(self, name_length, query_length):
+        # WRatio's test for using partial_ratio.
+        shorter, longer = sorted((name_length, query_length))
+        return longer >= 1.5 * shorter
+
+    def _best(self, ranks):
+        """
+        The ``candidate_limit`` positions with the highest ranks, breaking
+        ties by position.
+        """
+        if len(ranks) <= self.candidate_limit:
+            return set(ranks)
+        return set(heapq.nsmallest(
+            self.candidate_limit,
+            ranks,
+            key=lambda position: (-ranks[position], position),
+        ))
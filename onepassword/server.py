@@ -0,0 +1,295 @@
+import collections
+import hmac
+import json
+import os
+import threading
+import time
+# Python 2+3 compatibilty
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn, UnixStreamServer
+    from urllib.parse import parse_qs, urlsplit
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn, UnixStreamServer
+    from urlparse import parse_qs, urlsplit
+
+from onepassword.agent import remove_stale_socket
+from onepassword.keychain import KeychainLockedError
+
+REFRESH_INTERVAL = 1
+LATENCY_SAMPLES = 1024
+MAX_REQUEST_BYTES = 1024 * 1024
+
+
+class ServerStats(object):
+    """
+    Counts the requests a ``SecretServer`` has handled, and keeps the
+    latencies of the most recent ones.
+    """
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._latencies = collections.deque(maxlen=LATENCY_SAMPLES)
+        self.started = clock()
+        self.requests = 0
+        self.items = 0
+        self.errors = 0
+
+    def record(self, latency, items=0, error=False):
+        with self._lock:
+            self.requests += 1
+            self.items += items
+            self.errors += int(error)
+            self._latencies.append(latency)
+
+    def snapshot(self):
+        with self._lock:
+            uptime = max(self._clock() - self.started, 1e-6)
+            latencies = sorted(self._latencies)
+            snapshot = {
+                "uptime": uptime,
+                "requests": self.requests,
+                "items": self.items,
+                "errors": self.errors,
+                "requests_per_second": self.requests / uptime,
+                "items_per_second": self.items / uptime,
+            }
+
+        snapshot["latency_ms"] = {
+            "mean": _milliseconds(sum(latencies) / max(len(latencies), 1)),
+            "p50": _milliseconds(_percentile(latencies, 50)),
+            "p99": _milliseconds(_percentile(latencies, 99)),
+            "max": _milliseconds(_percentile(latencies, 100)),
+        }
+        return snapshot
+
+
+class SecretServer(object):
+    """
+    Serves lookups from an unlocked ``Keychain`` as JSON over HTTP/1.1, so
+    clients can make many requests over one kept alive connection. It
+    listens either on the Unix domain socket ``socket_path`` or on
+    ``port`` on the loopback interface; over TCP every request must carry
+    ``token`` in an ``Authorization: Bearer`` header.
+
+    ``contents.js`` is checked for changes at most once every
+    ``refresh_interval`` seconds, and reloaded when it has changed.
+
+    Requests:
+
+    * ``GET /item?name=NAME[&fuzzy_threshold=N]`` or ``POST /item`` with
+      ``{"name": NAME, "fuzzy_threshold": N}`` returns ``{"item": {"name":
+      ..., "password": ...}}``, or a 404 with ``{"item": null}``.
+    * ``POST /batch`` with ``{"names": [...], "fuzzy_threshold": N}``
+      returns ``{"items": [...]}`` in the same order, ``null`` for misses.
+    * ``GET /stats`` returns request counts, throughput and latencies.
+
+    Lookups get a 503 if the keychain has been locked, for example because
+    its encryption keys changed while it wasn't keeping the password (see
+    ``Keychain.watch``).
+    """
+
+    def __init__(self, keychain, socket_path=None, port=None, token=None,
+                 refresh_interval=REFRESH_INTERVAL):
+        if socket_path is None and port is None:
+            raise ValueError("A socket path or port is required")
+        if socket_path is None and not token:
+            raise ValueError("A token is required to listen on a TCP port")
+        self.keychain = keychain
+        self.socket_path = socket_path
+        self.port = port
+        self.token = token
+        self.refresh_interval = refresh_interval
+        self.stats = ServerStats()
+        self._lock = threading.Lock()
+        self._last_refresh = time.time()
+        self._server = None
+
+    @property
+    def address(self):
+        if self.socket_path is not None:
+            return self.socket_path
+        return "http://127.0.0.1:%d" % self.port
+
+    def listen(self):
+        if self.socket_path is not None:
+            remove_stale_socket(self.socket_path)
+            old_umask = os.umask(0o177)
+            try:
+                self._server = _UnixHTTPServer(self.socket_path, _RequestHandler)
+            finally:
+                os.umask(old_umask)
+        else:
+            self._server = _TCPHTTPServer(("127.0.0.1", self.port),
+                                          _RequestHandler)
+            self.port = self._server.server_address[1]
+        self._server.secrets = self
+
+    def serve(self):
+        """
+        Handles requests until ``shutdown`` is called from another thread.
+        """
+        if self._server is None:
+            self.listen()
+        try:
+            self._server.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+
+    def close(self):
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+            if self.socket_path is not None and \
+                    os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def lookup(self, names, fuzzy_threshold=100):
+        """
+        Returns a list with a ``{"name": ..., "password": ...}`` dictionary
+        for each of ``names``, or ``None`` if it couldn't be found.
+        """
+        results = []
+        with self._lock:
+            self._refresh()
+            for name in names:
+                item = self.keychain.item(name, fuzzy_threshold=fuzzy_threshold)
+                if item is None:
+                    results.append(None)
+                else:
+                    results.append({"name": item.name,
+                                    "password": item.password})
+        return results
+
+    def authorised(self, header):
+        if self.socket_path is not None:
+            return True
+        expected = "Bearer %s" % self.token
+        return hmac.compare_digest(
+            (header or "").encode("utf-8"), expected.encode("utf-8"))
+
+    def _refresh(self):
+        now = time.time()
+        if now - self._last_refresh >= self.refresh_interval:
+            self._last_refresh = now
+            self.keychain.refresh()
+
+
+class _TCPHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/stats":
+            self._handle(lambda: (200, self.server.secrets.stats.snapshot(), 0))
+        elif url.path == "/item":
+            self._handle(lambda: self._item(
+                query["name"][0],
+                query.get("fuzzy_threshold", [100])[0],
+            ))
+        else:
+            self._handle(None)
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        if path == "/item":
+            self._handle(lambda: self._item(**self._json_body(
+                ("name", "fuzzy_threshold"))))
+        elif path == "/batch":
+            self._handle(lambda: self._batch(**self._json_body(
+                ("names", "fuzzy_threshold"))))
+        else:
+            self._handle(None)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _item(self, name, fuzzy_threshold=100):
+        item, = self.server.secrets.lookup([name], int(fuzzy_threshold))
+        return (200 if item else 404), {"item": item}, int(bool(item))
+
+    def _batch(self, names, fuzzy_threshold=100):
+        if not isinstance(names, list):
+            raise ValueError("names must be a list")
+        items = self.server.secrets.lookup(names, int(fuzzy_threshold))
+        return 200, {"items": items}, len([item for item in items if item])
+
+    def _handle(self, handler):
+        started = time.time()
+        status, items = 500, 0
+        try:
+            # The body is read before anything else, so that the next request
+            # on the connection starts in the right place.
+            self._body = self._read_body()
+            if not self.server.secrets.authorised(
+                    self.headers.get("Authorization")):
+                status, body = 401, {"error": "Unauthorised"}
+            elif handler is None:
+                status, body = 404, {"error": "Not found"}
+            else:
+                status, body, items = handler()
+        except KeychainLockedError as e:
+            status, body = 503, {"error": "%s" % e}
+        except (ValueError, KeyError, TypeError) as e:
+            status, body = 400, {"error": "Bad request: %s" % e}
+        except Exception as e:
+            body = {"error": "%s" % e}
+        self._send_json(status, body)
+        self.server.secrets.stats.record(time.time() - started, items=items,
+                                         error=status >= 400 and status != 404)
+
+    def _read_body(self):
+        # Without a valid length there's no telling where the next request
+        # starts, so the connection is closed after the response.
+        length = self.headers.get("Content-Length") or "0"
+        if not length.isdigit():
+            self.close_connection = True
+            raise ValueError("invalid Content-Length: %s" % length)
+        length = int(length)
+        if length > MAX_REQUEST_BYTES:
+            self.close_connection = True
+            raise ValueError("request body is too large")
+        return self.rfile.read(length)
+
+    def _json_body(self, allowed):
+        body = json.loads(self._body.decode("utf-8"))
+        if not isinstance(body, dict):
+            raise ValueError("expected a JSON object")
+        return dict((key, value) for key, value in body.items()
+                    if key in allowed)
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0
+    index = int(round((len(values) - 1) * percent / 100.0))
+    return values[index]
+
+
+def _milliseconds(seconds):
+    return round(seconds * 1000, 3)
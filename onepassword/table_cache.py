@@ -0,0 +1,65 @@
+from hashlib import sha1
+import marshal
+import os
+import sys
+
+from .item_table import ItemTable
+from .utils import private_directory, user_cache_dir, write_private_file
+
+FORMAT_VERSION = 1
+
+
+def default_directory():
+    return os.path.join(user_cache_dir(), "items")
+
+
+class ItemTableCache(object):
+    """
+    Keeps a marshalled copy of each keychain's ``ItemTable``, so it can be
+    loaded without parsing ``contents.js`` again. A copy is only used while
+    ``contents.js`` has the same size and modification time as when the
+    copy was made.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or default_directory()
+
+    def fingerprint(self, contents_path):
+        """
+        Identifies the current version of ``contents.js``; take it before
+        reading the file, and pass it to ``store``.
+        """
+        stat = os.stat(contents_path)
+        return [FORMAT_VERSION, sys.version_info[0:2], stat.st_size,
+                getattr(stat, "st_mtime_ns", stat.st_mtime)]
+
+    def load(self, contents_path):
+        """
+        Returns the cached ``ItemTable`` for ``contents_path``, or ``None`` if
+        there isn't an up to date one.
+        """
+        try:
+            fingerprint = self.fingerprint(contents_path)
+            with open(self._cache_path(contents_path), "rb") as f:
+                cached = marshal.loads(f.read())
+        except (IOError, OSError, EOFError, ValueError, TypeError):
+            return None
+
+        if not isinstance(cached, tuple) or len(cached) != 2 or \
+                cached[0] != fingerprint:
+            return None
+        try:
+            return ItemTable.from_columns(cached[1])
+        except (ValueError, TypeError):
+            return None
+
+    def store(self, contents_path, table, fingerprint):
+        private_directory(self.directory)
+        write_private_file(
+            self._cache_path(contents_path),
+            marshal.dumps((fingerprint, table.columns())),
+        )
+
+    def _cache_path(self, contents_path):
+        key = sha1(os.path.realpath(contents_path).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, "%s.table" % key)
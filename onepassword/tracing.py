@@ -0,0 +1,48 @@
+from collections import namedtuple
+import time
+
+
+class Span(namedtuple("Span", ["name", "start", "end", "attributes"])):
+    """
+    One timed phase of work, such as unlocking a key or decrypting an item,
+    with ``start`` and ``end`` as ``time.time()`` timestamps.
+    """
+
+    __slots__ = ()
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+
+def traced(tracer, name, function, **attributes):
+    """
+    Wraps ``function`` so that each call to it is passed to ``tracer`` as a
+    ``Span`` called ``name``, once it has finished.
+
+    Objects that accept a tracer only wrap their methods when they're given
+    one, so nothing is timed when tracing is off.
+    """
+    def traced_function(*args, **kwargs):
+        start = time.time()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            tracer(Span(name, start, time.time(), attributes))
+    return traced_function
+
+
+def summarise(spans):
+    """
+    Returns a ``(name, count, total duration)`` tuple for each span name, in
+    the order the names first appear.
+    """
+    totals = {}
+    names = []
+    for span in spans:
+        if span.name not in totals:
+            totals[span.name] = [0, 0.0]
+            names.append(span.name)
+        totals[span.name][0] += 1
+        totals[span.name][1] += span.duration
+    return [(name,) + tuple(totals[name]) for name in names]
@@ -1,5 +1,61 @@
+import errno
+import os
 import sys
 
 
 def is_python_3():
     return sys.version.split(" ")[0].split(".")[0] =="3"
+
+
+def user_cache_dir():
+    """
+    The directory 1pass keeps its caches in, respecting ``XDG_CACHE_HOME``.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "1pass")
+
+
+def private_directory(path):
+    """
+    Creates ``path`` (readable only by the current user) if it doesn't exist
+    and returns it. Another thread or process creating it at the same time
+    is fine.
+    """
+    try:
+        os.makedirs(path, 0o700)
+    except OSError as e:
+        if e.errno != errno.EEXIST or not os.path.isdir(path):
+            raise
+    return path
+
+
+def write_private_file(path, data):
+    """
+    Atomically replaces ``path`` with a file containing ``data`` that only
+    the current user can read.
+    """
+    temporary_path = "%s.%d.tmp" % (path, os.getpid())
+    descriptor = os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                         0o600)
+    try:
+        os.write(descriptor, data)
+    finally:
+        os.close(descriptor)
+    os.rename(temporary_path, path)
+
+
+def wipe_file(path):
+    """
+    Overwrites ``path`` with zeros before deleting it.
+    """
+    try:
+        size = os.path.getsize(path)
+        descriptor = os.open(path, os.O_WRONLY)
+    except OSError:
+        return
+    try:
+        os.write(descriptor, b"\x00" * size)
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+    os.unlink(path)
@@ -0,0 +1,64 @@
+import time
+
+WATCHED_FILES = frozenset(["contents.js", "encryptionKeys.js"])
+
+
+def watcher_for(directory, interval=1):
+    """
+    Watches ``directory`` (a keychain's ``data/default``) with inotify if the
+    optional ``inotify_simple`` package is installed and works here, and by
+    polling every ``interval`` seconds otherwise.
+    """
+    try:
+        return InotifyWatcher(directory)
+    except (ImportError, OSError):
+        return PollingWatcher(directory, interval=interval)
+
+
+class InotifyWatcher(object):
+    """
+    Reports the names of the files in ``directory`` that have been written,
+    replaced or deleted since it was last asked.
+    """
+
+    def __init__(self, directory):
+        from inotify_simple import INotify, flags
+
+        self.directory = directory
+        self._inotify = INotify()
+        self._inotify.add_watch(
+            directory,
+            flags.CLOSE_WRITE | flags.MOVED_TO | flags.MOVED_FROM |
+            flags.DELETE,
+        )
+
+    def changes(self):
+        return set(event.name for event in self._inotify.read(timeout=0))
+
+    def close(self):
+        self._inotify.close()
+
+
+class PollingWatcher(object):
+    """
+    Reports ``contents.js`` and ``encryptionKeys.js`` as possibly changed at
+    most once every ``interval`` seconds, for the keychain to compare with
+    what it has loaded. Changes to individual items are found through
+    ``contents.js``, whose timestamps change with them.
+    """
+
+    def __init__(self, directory, interval=1, clock=time.time):
+        self.directory = directory
+        self.interval = interval
+        self._clock = clock
+        self._checked = clock()
+
+    def changes(self):
+        now = self._clock()
+        if now - self._checked < self.interval:
+            return set()
+        self._checked = now
+        return set(WATCHED_FILES)
+
+    def close(self):
+        pass
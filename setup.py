@@ -24,7 +24,7 @@ setup(
     url="http://github.com/georgebrock/1pass",
     classifiers=[],
     packages=["onepassword"],
-    scripts=["bin/1pass"],
+    scripts=["bin/1pass", "bin/1pass-agent"],
 
     tests_require=["nose", "mock"],
     test_suite="nose.collector",
@@ -0,0 +1,169 @@
+import os
+import shutil
+import tempfile
+import threading
+from unittest import TestCase
+from mock import patch
+# Python 2+3 compatibilty
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from onepassword import Keychain
+from onepassword.agent import (Agent, AgentClient, AgentError,
+                               default_socket_path)
+from onepassword.cli import CLI
+
+
+class AgentTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.directory, "agent.sock")
+        keychain = Keychain(self.keychain_path)
+        keychain.unlock("badger")
+        self.agent = Agent(keychain, self.keychain_path,
+                           socket_path=self.socket_path, timeout=0.5)
+        self.agent.listen()
+        self.thread = threading.Thread(target=self.agent.serve)
+        self.thread.start()
+        self.client = AgentClient(self.socket_path)
+
+    def tearDown(self):
+        self.thread.join()
+        shutil.rmtree(self.directory)
+
+    def test_item_lookup(self):
+        item = self.client.item(self.keychain_path, "onetosix")
+        self.assertEqual({"name": "onetosix", "password": "123456"}, item)
+
+    def test_fuzzy_item_lookup(self):
+        item = self.client.item(self.keychain_path, "foobr", fuzzy_threshold=70)
+        self.assertEqual("foobar", item["password"])
+
+    def test_multiple_item_lookup(self):
+        items = self.client.items(self.keychain_path, ["foobar", "onetos"])
+        self.assertEqual([{"name": "foobar", "password": "foobar"}, None],
+                         items)
+
+    def test_item_for_url_lookup(self):
+        items = self.client.items_for_urls(
+            self.keychain_path, ["https://example.com/login", "example.org"])
+        self.assertEqual([{"name": "atof", "password": "abcdef"}, None], items)
+
+    def test_field_lookup(self):
+        items = self.client.items(self.keychain_path, ["onetosix", "foobar"],
+                                  field="username")
+        self.assertEqual([
+            {"name": "onetosix", "password": "123456", "field": "user"},
+            {"name": "foobar", "password": "foobar", "field": None},
+        ], items)
+
+    def test_unsupported_item_type(self):
+        path = os.path.join(self.directory, "copy.agilekeychain")
+        shutil.copytree(self.keychain_path, path)
+        contents_path = os.path.join(path, "data", "default", "contents.js")
+        with open(contents_path, "r") as f:
+            contents = f.read()
+        with open(contents_path, "w") as f:
+            f.write(contents.replace("webforms.WebForm", "securenotes.SecureNote", 1))
+        keychain = Keychain(path)
+        keychain.unlock("badger")
+        self.agent.keychain = keychain
+
+        with self.assertRaises(AgentError):
+            self.client.item(self.keychain_path, "atof")
+        item = self.client.item(self.keychain_path, "onetosix")
+        self.assertEqual({"name": "onetosix", "password": "123456"}, item)
+
+    def test_idle_connection_does_not_block_lookups(self):
+        # A long idle timeout must not keep a silent connection open.
+        self.agent.timeout = 10
+        self.agent.connection_timeout = 0.1
+        idle = AgentClient(self.socket_path)._connect()
+        try:
+            item = AgentClient(self.socket_path, timeout=2).item(
+                self.keychain_path, "onetosix")
+        finally:
+            idle.close()
+        self.assertEqual("123456", item["password"])
+
+    def test_missing_item(self):
+        self.assertIsNone(self.client.item(self.keychain_path, "onetos"))
+
+    def test_different_keychain(self):
+        with self.assertRaises(AgentError):
+            self.client.item(self.directory, "onetosix")
+
+    def test_socket_is_private(self):
+        self.assertEqual(0o600, os.stat(self.socket_path).st_mode & 0o777)
+
+    def test_socket_owned_by_another_user(self):
+        with patch("onepassword.agent.os.getuid",
+                   return_value=os.getuid() + 1):
+            with self.assertRaises(AgentError):
+                self.client.item(self.keychain_path, "onetosix")
+            with self.assertRaises(AgentError):
+                Agent(None, self.keychain_path,
+                      socket_path=self.socket_path).listen()
+
+    def test_agent_run_by_another_user(self):
+        with patch("onepassword.agent.peer_uid", return_value=os.getuid() + 1):
+            with self.assertRaises(AgentError):
+                self.client.item(self.keychain_path, "onetosix")
+
+    def test_already_listening(self):
+        with self.assertRaises(AgentError):
+            Agent(None, self.keychain_path,
+                  socket_path=self.socket_path).listen()
+
+    def test_no_agent_running(self):
+        client = AgentClient(os.path.join(self.directory, "missing.sock"))
+        with self.assertRaises(AgentError):
+            client.item(self.keychain_path, "onetosix")
+
+    def test_cli_uses_agent(self):
+        def flunker(prompt):
+            self.fail("Password prompt was invoked")
+        output = StringIO()
+        environment = {"ONEPASSWORD_AGENT_SOCKET": self.socket_path}
+        with patch.dict(os.environ, environment):
+            cli = CLI(
+                stdout=output,
+                getpass=flunker,
+                arguments=("--path", self.keychain_path, "onetosix"),
+            )
+            cli.run()
+        self.assertEqual("123456\n", output.getvalue())
+
+    @property
+    def keychain_path(self):
+        return os.path.join(os.path.dirname(__file__), "data", "1Password.agilekeychain")
+
+
+class DefaultSocketPathTest(TestCase):
+    def test_environment(self):
+        with patch.dict(os.environ, {"ONEPASSWORD_AGENT_SOCKET": "/a.sock",
+                                     "XDG_RUNTIME_DIR": "/run/user/1"}):
+            self.assertEqual("/a.sock", default_socket_path())
+
+    def test_runtime_directory(self):
+        with patch.dict(os.environ, {"XDG_RUNTIME_DIR": "/run/user/1"}):
+            os.environ.pop("ONEPASSWORD_AGENT_SOCKET", None)
+            self.assertEqual("/run/user/1/1pass-agent.sock",
+                             default_socket_path())
+
+    def test_private_directory(self):
+        with patch.dict(os.environ, {}):
+            os.environ.pop("ONEPASSWORD_AGENT_SOCKET", None)
+            os.environ.pop("XDG_RUNTIME_DIR", None)
+            self.assertIsNone(default_socket_path())
+            with self.assertRaises(AgentError):
+                AgentClient().item("keychain", "onetosix")
+
+            agent = Agent(None, "keychain")
+        directory = os.path.dirname(agent.socket_path)
+        self.assertEqual(0o700, os.stat(directory).st_mode & 0o777)
+        agent.listen()
+        agent.close()
+        self.assertFalse(os.path.exists(directory))
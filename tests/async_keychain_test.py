@@ -0,0 +1,89 @@
+import asyncio
+import os
+import threading
+from unittest import TestCase
+
+from onepassword.async_keychain import AsyncKeychain
+from onepassword.keychain import Keychain
+
+
+class AsyncKeychainTest(TestCase):
+    def test_unlock_and_item(self):
+        async def lookup():
+            keychain = await AsyncKeychain.open(self.data_path)
+            self.assertFalse(await keychain.unlock("not right"))
+            self.assertTrue(keychain.locked)
+            self.assertTrue(await keychain.unlock("badger"))
+            item = await keychain.item("onetosix")
+            missing = await keychain.item("does-not-exist")
+            keychain.lock()
+            return keychain, item, missing
+
+        keychain, item, missing = asyncio.run(lookup())
+        self.assertEqual("123456", item.password)
+        self.assertIsNone(missing)
+        self.assertTrue(keychain.locked)
+
+    def test_concurrent_lookups_share_a_decryption(self):
+        keychain = Keychain(self.data_path)
+        keychain.unlock("badger")
+        calls = []
+        release = threading.Event()
+        original_item = keychain.item
+
+        def slow_item(name, fuzzy_threshold=100):
+            calls.append(name)
+            release.wait(5)
+            return original_item(name, fuzzy_threshold)
+
+        keychain.item = slow_item
+
+        async def lookup():
+            async_keychain = AsyncKeychain(keychain)
+            lookups = [asyncio.ensure_future(async_keychain.item("foobar"))
+                       for _ in range(100)]
+            other = asyncio.ensure_future(async_keychain.item("atof"))
+            await asyncio.sleep(0.05)
+            release.set()
+            items = await asyncio.gather(*lookups)
+            return async_keychain, items, await other
+
+        async_keychain, items, other = asyncio.run(lookup())
+        self.assertEqual(["atof", "foobar"], sorted(calls))
+        self.assertTrue(all(item is items[0] for item in items))
+        self.assertEqual("foobar", items[0].password)
+        self.assertEqual("abcdef", other.password)
+        self.assertEqual({}, async_keychain._pending)
+
+    def test_concurrent_lookups_of_a_streamed_keychain(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        keychain = Keychain(self.data_path, stream_items=True)
+        keychain.unlock("badger")
+        names = ["onetosix", "ONETOSIX", "Foobar", " atof", "generic account"]
+
+        async def lookup(executor):
+            async_keychain = AsyncKeychain(keychain, executor=executor)
+            return await asyncio.gather(*[
+                async_keychain.item(name) for name in names * 10])
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            items = asyncio.run(lookup(executor))
+        self.assertEqual(["123456", "123456", "foobar", "abcdef", "flibble"] * 10,
+                         [item.password for item in items])
+
+    def test_cancelled_caller_does_not_cancel_lookup(self):
+        async def lookup():
+            keychain = await AsyncKeychain.open(self.data_path)
+            await keychain.unlock("badger")
+            first = asyncio.ensure_future(keychain.item("foobar"))
+            second = asyncio.ensure_future(keychain.item("foobar"))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        self.assertEqual("foobar", asyncio.run(lookup()).password)
+
+    @property
+    def data_path(self):
+        return os.path.join(os.path.dirname(__file__), "data", "1Password.agilekeychain")
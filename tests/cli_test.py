@@ -1,4 +1,8 @@
+import json
 import os
+import shutil
+import tempfile
+from mock import patch
 from unittest import TestCase
 # Python 2+3 compatibilty
 try:
@@ -14,6 +18,11 @@ class CLITest(TestCase):
         self.output = StringIO()
         self.error = StringIO()
         self.input = StringIO()
+        self.cache_home = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_home)
+        environment = patch.dict(os.environ, {"XDG_CACHE_HOME": self.cache_home})
+        environment.start()
+        self.addCleanup(environment.stop)
 
     def test_cli_reading_web_form_password_with_multiple_password_attempts(self):
         password_attempts = (i for i in ("incorrect", "badger"))
@@ -87,6 +96,260 @@ class CLITest(TestCase):
         self.assert_no_output()
         self.assert_error_output("1pass: Incorrect master password\n")
 
+    def test_cli_with_multiple_items(self):
+        cli = self.build_cli(
+            getpass=lambda prompt: "badger",
+            arguments=("--path", self.keychain_path, "onetosix", "foobar",),
+        )
+        cli.run()
+
+        self.assert_output("onetosix\t123456\nfoobar\tfoobar\n")
+        self.assert_no_error_output()
+
+    def test_cli_with_multiple_items_and_a_bad_name(self):
+        cli = self.build_cli(
+            getpass=lambda prompt: "badger",
+            arguments=("--path", self.keychain_path, "onetos", "foobar",),
+        )
+
+        self.assert_exit_status(os.EX_DATAERR, cli.run)
+        self.assert_output("foobar\tfoobar\n")
+        self.assert_error_output("1pass: Could not find an item named 'onetos'\n")
+
+    def test_cli_with_batch_from_stdin(self):
+        self.input.write("badger\nonetosix\n\nGeneric Account\n")
+        self.input.seek(0)
+        cli = self.build_cli(
+            arguments=("--no-prompt", "--batch", "-", "--path",
+                       self.keychain_path,),
+        )
+        cli.run()
+
+        self.assert_output("onetosix\t123456\nGeneric Account\tflibble\n")
+        self.assert_no_error_output()
+
+    def test_cli_with_batch_file_and_json_output(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        batch_path = os.path.join(directory, "names")
+        with open(batch_path, "w") as f:
+            f.write("foobr\n")
+        cli = self.build_cli(
+            getpass=lambda prompt: "badger",
+            arguments=("--fuzzy", "--json", "--batch", batch_path, "--path",
+                       self.keychain_path,),
+        )
+        cli.run()
+
+        self.assert_output('{"query": "foobr", "name": "foobar", '
+                           '"password": "foobar"}\n')
+        self.assert_no_error_output()
+
+    def test_cli_export(self):
+        self.input.write("badger\n")
+        self.input.seek(0)
+        cli = self.build_cli(
+            arguments=("export", "--no-prompt", "--path", self.keychain_path,),
+        )
+        cli.run()
+
+        lines = self.output.getvalue().splitlines()
+        self.assertEqual(4, len(lines))
+        self.assertEqual({
+            "uuid": "8DEA6242DA654AD4879C0269E00846B9",
+            "type": "passwords.Password",
+            "name": "foobar",
+            "contents": {"password": "foobar"},
+        }, json.loads(lines[0]))
+        self.assert_no_error_output()
+
+    def test_cli_with_key_cache(self):
+        self.build_cli(
+            getpass=lambda prompt: "badger",
+            arguments=("--cache-ttl", "60", "--path", self.keychain_path,
+                       "onetosix",),
+        ).run()
+        keys_path = os.path.join(self.cache_home, "1pass", "keys")
+        self.assertEqual(1, len(os.listdir(keys_path)))
+
+        self.build_cli(arguments=("--forget",)).run()
+        self.assertEqual([], os.listdir(keys_path))
+
+        self.assert_output("123456\n")
+        self.assert_no_error_output()
+
+    def test_cli_with_bad_cache_ttl_in_environment(self):
+        with patch.dict(os.environ, {"ONEPASSWORD_KEY_CACHE_TTL": "5m"}):
+            with patch("sys.stderr", self.error):
+                self.assert_exit_status(2, lambda: self.build_cli(
+                    arguments=("--path", self.keychain_path, "onetosix")))
+        self.assertIn("argument --cache-ttl: invalid int value: '5m'",
+                      self.error.getvalue())
+
+    def test_cli_with_urls(self):
+        cli = self.build_cli(
+            getpass=lambda prompt: "badger",
+            arguments=("--url", "--no-agent", "--path", self.keychain_path,
+                       "https://app.example.com/", "https://example.org/"),
+        )
+
+        self.assert_exit_status(os.EX_DATAERR, cli.run)
+        self.assert_output("https://app.example.com/\tabcdef\n")
+        self.assert_error_output(
+            "1pass: Could not find an item for 'https://example.org/'\n")
+
+    def test_cli_with_field(self):
+        cli = self.build_cli(
+            getpass=lambda prompt: "badger",
+            arguments=("--field", "username", "--json", "--no-agent",
+                       "--path", self.keychain_path, "onetosix", "foobar"),
+        )
+
+        self.assert_exit_status(os.EX_DATAERR, cli.run)
+        self.assertEqual(
+            {"query": "onetosix", "name": "onetosix", "field": "username",
+             "value": "user"},
+            json.loads(self.output.getvalue()),
+        )
+        self.assert_error_output(
+            "1pass: Item 'foobar' has no field 'username'\n")
+
+    def test_cli_complete(self):
+        def flunker(prompt):
+            self.fail("Password prompt was invoked")
+        cli = self.build_cli(
+            getpass=flunker,
+            arguments=("--path", self.keychain_path, "--complete", "o"),
+        )
+        cli.run()
+        self.assert_output("onetosix\n")
+        self.assert_no_error_output()
+
+    def test_cli_complete_with_a_missing_keychain(self):
+        cli = self.build_cli(
+            arguments=("--path", os.path.join(self.cache_home, "missing"),
+                       "--path", self.keychain_path, "--complete", ""),
+        )
+        cli.run()
+        self.assert_output("atof\nfoobar\nGeneric Account\nonetosix\n")
+        self.assert_no_error_output()
+
+    def test_cli_with_several_keychains(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        other_path = os.path.join(directory, "other.agilekeychain")
+        shutil.copytree(self.keychain_path, other_path)
+
+        cli = self.build_cli(
+            getpass=lambda prompt: "badger",
+            arguments=("--no-agent", "--path", other_path,
+                       "--path", self.keychain_path, "onetosix",),
+        )
+        cli.run()
+        self.assert_output("123456\n")
+        self.assertEqual([other_path, self.keychain_path], cli.paths)
+
+        with patch.dict(os.environ, {"ONEPASSWORD_KEYCHAIN": os.pathsep.join(
+                [self.keychain_path, other_path, ""])}):
+            cli = self.build_cli(arguments=("onetosix",))
+            self.assertEqual([self.keychain_path, other_path], cli.paths)
+
+    def test_cli_with_keychains_with_different_passwords(self):
+        prompts = []
+        password_attempts = iter(["badger", "wrong", "otter"])
+
+        def getpass(prompt):
+            prompts.append(prompt)
+            return next(password_attempts)
+
+        cli = self.build_cli(
+            getpass=getpass,
+            arguments=("--no-agent", "--path", self.keychain_path,
+                       "--path", self.other_keychain_path, "otter"),
+        )
+        cli.run()
+        self.assert_output("c2094cac629f6fbe\n")
+        self.assertEqual(
+            ["Master password: ",
+             "Master password for %s: " % self.other_keychain_path,
+             "Master password for %s: " % self.other_keychain_path],
+            prompts,
+        )
+        self.assertFalse(cli.keychain.locked)
+
+    def test_passwords_for_several_keychains_from_stdin(self):
+        self.input.write("badger\notter\n")
+        self.input.seek(0)
+        cli = self.build_cli(
+            arguments=("--no-prompt", "--no-agent",
+                       "--path", self.keychain_path,
+                       "--path", self.other_keychain_path, "otter"),
+        )
+        cli.run()
+        self.assert_output("c2094cac629f6fbe\n")
+        self.assert_no_error_output()
+
+    def test_incorrect_password_for_one_keychain_from_stdin(self):
+        self.input.write("badger\n")
+        self.input.seek(0)
+        cli = self.build_cli(
+            arguments=("--no-prompt", "--no-agent",
+                       "--path", self.keychain_path,
+                       "--path", self.other_keychain_path, "otter"),
+        )
+        self.assert_exit_status(os.EX_DATAERR, cli.run)
+        self.assert_no_output()
+        self.assert_error_output("1pass: Incorrect master password for %s\n"
+                                 % self.other_keychain_path)
+
+    def test_cli_stream(self):
+        cli = self.build_cli(
+            getpass=lambda prompt: "badger",
+            arguments=("--stream", "--no-agent", "--path", self.keychain_path,
+                       "onetosix",),
+        )
+        cli.run()
+
+        self.assert_output("123456\n")
+        self.assert_no_error_output()
+        self.assertIsNone(cli.keychain._item_table)
+
+    def test_cli_timings(self):
+        cli = self.build_cli(
+            getpass=lambda prompt: "badger",
+            arguments=("--timings", "--no-agent", "--path", self.keychain_path,
+                       "onetosix",),
+        )
+        cli.run()
+
+        self.assert_output("123456\n")
+        lines = self.error.getvalue().splitlines()
+        self.assertEqual("1pass: timings", lines[0])
+        phases = [line.split()[0] for line in lines[1:]]
+        for phase in ("load", "unlock", "match", "read", "decrypt"):
+            self.assertIn(phase, phases)
+
+    def test_cli_serve_on_a_port(self):
+        self.input.write("badger\n")
+        self.input.seek(0)
+        cli = self.build_cli(
+            arguments=("serve", "--port", "0", "--no-prompt",
+                       "--path", self.keychain_path,),
+        )
+        with patch("onepassword.server.SecretServer.serve") as serve:
+            cli.run()
+        self.assertTrue(serve.called)
+
+        lines = self.output.getvalue().splitlines()
+        self.assertRegex(lines[0], r"^ONEPASSWORD_SERVER=http://127.0.0.1:\d+;")
+        self.assertRegex(lines[1], r"^ONEPASSWORD_SERVER_TOKEN=[0-9a-f]{32};")
+        self.assert_no_error_output()
+
+    def test_cli_serve_needs_somewhere_to_listen(self):
+        with patch("sys.stderr", StringIO()):
+            self.assert_exit_status(2, lambda: self.build_cli(
+                arguments=("serve", "--path", self.keychain_path,)))
+
     def build_cli(self, **kwargs):
         cli_kwargs = {
             "stdin": self.input,
@@ -119,3 +382,9 @@ class CLITest(TestCase):
     @property
     def keychain_path(self):
         return os.path.join(os.path.dirname(__file__), "data", "1Password.agilekeychain")
+
+    @property
+    def other_keychain_path(self):
+        # Its master password is "otter".
+        return os.path.join(os.path.dirname(__file__), "data",
+                            "Otter.agilekeychain")
@@ -0,0 +1 @@
+[["0A7D8E2C5B9F4E1A8C3D6F2B7E4A9C1D", "passwords.Password", "otter", "otter.example.com", 1361021221, "", 0, "N"]]
\ No newline at end of file
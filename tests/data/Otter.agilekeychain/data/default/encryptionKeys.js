@@ -0,0 +1 @@
+{"list": [{"data": "U2FsdGVkX1/WRt0nXVHAgNVBIhUo12F3HkEVqstL+R/hsCzGhRr5Qv2FKiFBlw4Ds1jSsd8oA+L+YdZuOxwuF26Gaw9zaPMe5wq7U+Y9p0gryWLJuvfE0/CiUM6id14hzn2EpnqAfDqxL/GIqgHI+2LHXVsD0JaO4+oX9WF9Wq776pvzdwj73e3LUKtRHgPQ4UoBpcmnR7efFmeRsqTX87J9Pu1iABhGhQcH/dQMtN6sv0Xbkp6bvEjxBWD0fweKBEUvbguA2xVfwnG0qXpMHX/+/c31mQJhlzBvpj5YE4bhUoYimUYmvxkVJ5sYnmqs29V2csxu/LVKPnn6EZK8oOdTggxEimVvPQvafUbMG4uaYqu2dxs/5PngbrmsRmav/uGHJFYnjWovSmpBNs9/Hnm20GaWw4eDxsmtATd1alT7F76OinUzOYLS0vWeVnnx/OLf1FUOMTfSvp2tKP1Zdnc3xwpL7L8gS7hXc2K9G4rIFIRoa3q15WQngj67sTdCtMrDe71+ImVBbp/1o3qIgKRR1eta0keOKkhQxioXffVQtSINjJJJHJdEr5oIGYitnRvqW89Vkdx34JOU09MEhAFrO9nrPY4R50bNQk6z5Opkw+UrjFdUVhJszzK6wFhf18SbFuphLnX7/bqRRXjaKoxksYEeFV38wInQyxqHE+zDV4Wj7FCY5RN4dZ5ltUWHF99OVxLPpVIao8tATPgfOr6GOwBrP+IwzBzu6KZDCXJGhSwSVbAXWaO/4zdDpJmiRUwENvmopRIHEIbe1cj9NAaQP/nW0nL+K2THWX+Po5dN6dU5zpmlEpLFOFOPa96H69ayeznRulqkuH2W0+Po0e5VXPmcb5ZaeKlng9Dz6pXJVGKBKKAPoZOQO+JnqjxkhpMMNZR86RZa6ov6xvV5xaK6/jDDWmv1EAXd5zsmxii6VSAjomarBsK1sEOiP1K+PebOXtu8woDoK3Kxa5RXO3TEhuincU9dK6JaJHXdsF9ZTAzh4pV3M/KRKsVPR7KqsQKIA+n3CqL6mXv/VLJrYkax7YL/gvC942tFR0G/+2FaKI9c43y7uRMMvpdYUWu/NRWVlo9NOfw91mJr4ZPNBw1vowhvyXMcTrwBOWb3BKFDA6+h9sJ3XGV3//jzIiPJkhimGcBasPyLfQ6t7KPb0175cLksKk/yfHngff9qn+ukS85JMTYngQI2q3xht2wqXCrS75w0R8euFPYY9IsLfDphWpVYtdqqw6OwjXcZcB9FzsW48Imqlv5SBGcx8fLGBpgPpqwi9m5t+OSD3MjMB0MYz9LMkmUa57CyGVjpC2clbuwqgoYlULhC40cdHdMBvD/cVJmZGe/SqTtPVUGlnN3fwIMS4XQ7Yqg6Sz5NdpjNp17T7u8gz2T4Shx4ZEu5", "validation": "U2FsdGVkX18ykyXXmnTUrOu4UmBL8SgyhYuU9GkoqwL0EnB01BtBcYbfrKW+kGccUBhvAXxXe0kNubxl62dguI8OCqlwZxDciA+CuhHZnlgjssM1XuEmzPraIekPND+D4662Fza3EsYuuws/0AoqRcrM8d7ZB4w0q67gY3gUi4HvsqdRytHYOSMHKW7Dye0PsiQyzU7RS2eCOf6iBZ9vzcTfwNSVFm9uXPUyhuO63ayGAif7yj0kh9Ur6IfvvIwOSARlfM0ok5MUfyNgZ0xfu7PV00f8T+z+EVduItMruWdc6drqQVLzHmLJcrrxn4/egxXaq6a9oee7+jTFh1ypOFCY3np+dm5oe2IYFqEI9YTUeRVj8JM0A3YT6AqmuEBGEhbFKV/09QKzias659tuCD8/RuhfX857fJisd15bcvLr+H5WTadhOC6zqLzdBgLlAhKHBRqYqJORfw3LqssCs3TSafJmi8Fku2nnGcSek9T2Ku7Xl8QT3tkMj5G0juiXaLiCGG3RHV3H+VKHvP9AiI1cEjh5sjk7UYxmUsruUmvheTO6M3+jyLxARmUOMMIZoM0J25O0ZgyrY6Pty6J9QZkJHIA/6lFxhjYwnjByB+nw8WZvPnRsUvwvG+ZCDiIZlRgFwCLh49+k6dQ382yCT2AXQU2AWhR4jxp9aV1QGHbUwxipGIIB9jnA42RAujvnxnX/zPH6vw9hQ6q1HEuerjig992bNZRX/+LOrTtO9TLElQxIdYbjJo9SSlGF2LInism8Zt/StoUWXyjznikDW/9Q6Zi9M+GccnuVmiY1JUmTiT+uBSEXNOffPeO7/aSCyBP2jTQ0rxQbdqvkuIDPKuZyZzrhR1NmGmTXHG57GSDM9+MUwkMF/nBbz/SflZkYy+jpuRsdpj7O+pt/YRPedFzBKo4No0UjCNIYfL56lR0dcejjNTJzfcXzkkFjPih8JUB1FhsywSrtcBmSr77GD7cnMR8jjc0WCwF/uHOTp32jrhFuoi16fZFNmDCxjU3cVWVMbrMnd+/Qqn2u1kOicTz6IOVsPe5xV9eghTKhB0iuJ4YnCNBl2MV0iVk8pg/kPn2NKWST1H9/uILjrqP30VJKPlIuSVcm+SbVpuv13/NMjZ6qrBrHISJrH7/t8PF9FAWDtZewM76/ssSrjAKKb9hbVsmaI7ODeSBt5akMvvCowSCdvLzm+qSXsP9pcZKYl3WUARe2V/rnIwnCCvC9hwH7++9Y4KF5x/VA9mXaXfHlbmX//BtmxU3GXDKWk1BQ6iRZfIaDDeZR+spJAUI7zFafIzkIAuTwYwE5fbMAfX7PtHRKIFuJ0GAg5zl5usis+sQgjYlk5ulzgLAkKzju7VmNCOZIGLOsgXU++H/vaFUVRbPLBX/rNHOBjQkoR/Iy", "iterations": 1000, "identifier": "7D92090B79984563AF7264C4C2B2B555", "level": "SL5"}], "SL5": "7D92090B79984563AF7264C4C2B2B555"}
\ No newline at end of file
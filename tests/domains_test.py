@@ -0,0 +1,44 @@
+from unittest import TestCase
+
+from onepassword.domains import DomainIndex, hostname, labels
+
+
+class HostnameTest(TestCase):
+    def test_urls(self):
+        self.assertEqual("app.example.com",
+                         hostname("https://App.Example.com:8443/login?x=1"))
+        self.assertEqual("example.com", hostname("example.com/login"))
+        self.assertEqual("example.com", hostname(" example.com. "))
+        self.assertEqual("", hostname(""))
+
+    def test_labels(self):
+        self.assertEqual(["com", "example", "app"], labels("app.example.com"))
+        self.assertEqual(["10.0.0.1"], labels("10.0.0.1"))
+
+
+class DomainIndexTest(TestCase):
+    def setUp(self):
+        self.index = DomainIndex([
+            "example.com",
+            "https://app.example.com",
+            "",
+            "example.org",
+            "www.example.com",
+            "10.0.0.1",
+        ])
+
+    def test_exact_domain(self):
+        self.assertEqual([0], self.index.positions("http://example.com/"))
+        self.assertEqual([5], self.index.positions("http://10.0.0.1/admin"))
+
+    def test_closest_parent_domain(self):
+        self.assertEqual([1], self.index.positions(
+            "https://app.example.com/login"))
+        self.assertEqual([1], self.index.positions("eu.app.example.com"))
+        self.assertEqual([0], self.index.positions("api.example.com"))
+
+    def test_no_match(self):
+        self.assertEqual([], self.index.positions("https://example.net"))
+        self.assertEqual([], self.index.positions("com"))
+        self.assertEqual([], self.index.positions("0.0.1"))
+        self.assertEqual([], self.index.positions(""))
@@ -1,4 +1,5 @@
 from base64 import b64encode
+from mock import Mock, patch
 from unittest import TestCase
 
 from onepassword.encryption_key import SaltyString, EncryptionKey
@@ -47,11 +48,127 @@ class EncryptionKeyTest(TestCase):
 
         self.assertTrue(unlock_result)
 
+    def test_unlocked_flag(self):
+        key = EncryptionKey(**self.example_data)
+        self.assertFalse(key.unlocked)
+        key.unlock(password="badger")
+        self.assertTrue(key.unlocked)
+
+    def test_lock(self):
+        key = EncryptionKey(**self.example_data)
+        key.unlock(password="badger")
+        key.lock()
+        self.assertFalse(key.unlocked)
+
+    def test_openssl_key_derivation(self):
+        key = EncryptionKey(data="")
+        self.assertEqual(
+            (b"xw\xe6\x15\x90\xa9\xa9\x01\x0e\xfc\x14\x9b\x01\x87\xc6\x86",
+             b"SQ\x98:s:a;\xc4I\xc9\xa0{\x11U\x9b"),
+            key._derive_openssl(b"K" * 32, b"SALTSALT"),
+        )
+
+    def test_openssl_key_derivation_is_memoized(self):
+        key = EncryptionKey(data="")
+        key.OPENSSL_CACHE_SIZE = 2
+        with patch.object(key, "_derive_openssl_uncached",
+                          side_effect=key._derive_openssl_uncached) as derive:
+            first = key._derive_openssl(b"K" * 32, b"SALT0000")
+            self.assertEqual(first, key._derive_openssl(b"K" * 32, b"SALT0000"))
+            self.assertEqual(1, derive.call_count)
+
+            key._derive_openssl(b"K" * 32, b"SALT0001")
+            key._derive_openssl(b"K" * 32, b"SALT0002")
+            key._derive_openssl(b"K" * 32, b"SALT0000")
+            self.assertEqual(4, derive.call_count)
+        self.assertEqual(2, len(key._openssl_keys))
+
+    def test_strip_padding(self):
+        key = EncryptionKey(data="")
+        self.assertEqual(b"{}", key._strip_padding(b"{}" + b"\x0e" * 14))
+        self.assertEqual(b"{}   ", key._strip_padding(b"{}   " + b"\x0b" * 11))
+        self.assertEqual(b"k" * 16, key._strip_padding(b"k" * 16 + b"\x10" * 16))
+        self.assertEqual(b"k" * 16 + b"\x10" * 16,
+                         key._strip_padding(b"k" * 16 + b"\x10" * 16,
+                                            whole_block=False))
+
+    def test_decrypt_block_aligned_item(self):
+        key = EncryptionKey(**self.example_data)
+        key.unlock(password="badger")
+        # '{"password":"x"}' is exactly one block, followed by a whole block
+        # of padding.
+        encrypted = ("U2FsdGVkX18JrRQfekzDIbzhiHHvKvd9qzrKOJd92YYJ4/F0ecJLmS5QW5"
+                     "Gs1DGw")
+        self.assertEqual(b'{"password":"x"}', key.decrypt(encrypted))
+        self.assertEqual([b'{"password":"x"}'],
+                         list(key.decrypt_many([encrypted])))
+
+    def test_decrypt_many(self):
+        key = EncryptionKey(**self.example_data)
+        key.unlock(password="badger")
+        encrypted = [
+            self.example_data["validation"],
+            u'U2FsdGVkX18nNep/JNwDvtwY4GT6hMsqV6cWMWJVhko=\x00',
+            self.example_data["validation"],
+        ]
+        self.assertEqual(
+            [key.decrypt(b64_data) for b64_data in encrypted],
+            list(key.decrypt_many(encrypted)),
+        )
+        self.assertEqual(b"{}", key.decrypt(encrypted[1]))
+
+    def test_decrypt_many_wipes_its_buffer(self):
+        key = EncryptionKey(**self.example_data)
+        key.unlock(password="badger")
+        buffers = []
+        decrypt_into = key._decrypt_into
+
+        def record_buffer(b64_data, buffer):
+            buffers.append(buffer)
+            return decrypt_into(b64_data, buffer)
+
+        key._decrypt_into = record_buffer
+        list(key.decrypt_many([self.example_data["validation"]] * 2))
+        self.assertIs(buffers[0], buffers[1])
+        self.assertEqual(bytearray(len(buffers[0])), buffers[0])
+
     def test_unlocking_with_incorrect_password(self):
         key = EncryptionKey(**self.example_data)
         unlock_result = key.unlock(password="not right")
 
         self.assertFalse(unlock_result)
+        self.assertFalse(key.unlocked)
+
+    def test_unlocking_stores_derivation_in_cache(self):
+        cache = Mock()
+        cache.get.return_value = None
+        key = EncryptionKey(cache=cache, **self.example_data)
+
+        self.assertTrue(key.unlock(password="badger"))
+        self.assertEqual(1, cache.store.call_count)
+        password, salt, iterations, derived = cache.store.call_args[0]
+        self.assertEqual(("badger", 40000, 32),
+                         (password, iterations, len(derived)))
+
+    def test_unlocking_with_cached_derivation(self):
+        cache = Mock()
+        cache.get.return_value = None
+        EncryptionKey(cache=cache, **self.example_data).unlock("badger")
+        cache.get.return_value = cache.store.call_args[0][3]
+
+        key = EncryptionKey(cache=cache, **self.example_data)
+        with patch.object(key, "_derive_pbkdf2") as derive:
+            self.assertTrue(key.unlock(password="badger"))
+            self.assertFalse(derive.called)
+        self.assertEqual(1, cache.store.call_count)
+
+    def test_incorrect_password_is_not_cached(self):
+        cache = Mock()
+        cache.get.return_value = None
+        key = EncryptionKey(cache=cache, **self.example_data)
+
+        self.assertFalse(key.unlock(password="not right"))
+        self.assertFalse(cache.store.called)
 
     @property
     def example_data(self):
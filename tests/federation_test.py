@@ -0,0 +1,98 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from onepassword.federation import FederatedKeychain
+
+
+class FederatedKeychainTest(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.first_path = os.path.join(directory, "first.agilekeychain")
+        self.second_path = os.path.join(directory, "second.agilekeychain")
+        shutil.copytree(self.keychain_path, self.first_path)
+        shutil.copytree(self.keychain_path, self.second_path)
+
+        # The second keychain calls atof "atofx" and has no "foobar".
+        contents_path = os.path.join(self.second_path, "data", "default",
+                                     "contents.js")
+        with open(contents_path, "r") as f:
+            rows = json.load(f)
+        rows = [row for row in rows if row[2] != "foobar"]
+        for row in rows:
+            if row[2] == "atof":
+                row[2] = "atofx"
+        with open(contents_path, "w") as f:
+            json.dump(rows, f)
+
+    def test_earlier_keychains_win_ties(self):
+        keychain = self.unlocked(self.first_path, self.second_path)
+        self.assertEqual(self.first_path, keychain.item("onetosix")._path)
+
+        keychain = self.unlocked(self.second_path, self.first_path)
+        self.assertEqual(self.second_path, keychain.item("onetosix")._path)
+
+    def test_items_from_any_keychain(self):
+        keychain = self.unlocked(self.second_path, self.first_path)
+        self.assertEqual("foobar", keychain.item("foobar").password)
+        self.assertIsNone(keychain.item("nothing like it"))
+
+    def test_exact_match_beats_earlier_fuzzy_match(self):
+        keychain = self.unlocked(self.first_path, self.second_path)
+        item = keychain.item("atofx", fuzzy_threshold=70)
+        self.assertEqual(self.second_path, item._path)
+        self.assertEqual("abcdef", item.password)
+
+    def test_item_for_url(self):
+        keychain = self.unlocked(self.second_path, self.first_path)
+        self.assertEqual(self.second_path,
+                         keychain.item_for_url("example.com")._path)
+
+    def test_unlock(self):
+        keychain = FederatedKeychain.load([self.first_path, self.second_path])
+        self.assertTrue(keychain.locked)
+        self.assertFalse(keychain.unlock("not right"))
+        self.assertTrue(keychain.locked)
+        self.assertTrue(keychain.unlock("badger", lazy=True))
+        self.assertFalse(keychain.locked)
+        keychain.lock()
+        self.assertTrue(keychain.locked)
+
+    def test_unlock_keychains_with_different_passwords(self):
+        other_path = os.path.join(os.path.dirname(__file__), "data",
+                                  "Otter.agilekeychain")
+        keychain = FederatedKeychain.load([self.first_path, other_path])
+        self.assertFalse(keychain.unlock("badger"))
+        self.assertEqual([False, True],
+                         [member.locked for member in keychain.keychains])
+        self.assertTrue(keychain.unlock("otter"))
+        self.assertFalse(keychain.locked)
+        # Keychains that are already unlocked aren't relocked.
+        self.assertTrue(keychain.unlock("wrong"))
+        self.assertFalse(keychain.locked)
+
+    def test_lock_closes_watchers(self):
+        keychain = FederatedKeychain.load([self.first_path, self.second_path])
+        keychain.watch()
+        keychain.unlock("badger")
+        keychain.lock()
+        self.assertEqual([None, None],
+                         [member._watcher for member in keychain.keychains])
+
+    def test_iter_decrypted(self):
+        keychain = self.unlocked(self.first_path, self.second_path)
+        names = [item.name for item, _ in keychain.iter_decrypted(workers=2)]
+        self.assertEqual(["foobar", "atof", "onetosix", "Generic Account",
+                          "atofx", "onetosix", "Generic Account"], names)
+
+    def unlocked(self, *paths):
+        keychain = FederatedKeychain.load(paths)
+        keychain.unlock("badger")
+        return keychain
+
+    @property
+    def keychain_path(self):
+        return os.path.join(os.path.dirname(__file__), "data", "1Password.agilekeychain")
@@ -0,0 +1,62 @@
+import json
+from unittest import TestCase
+
+from onepassword.fields import find_field
+
+
+class FindFieldTest(TestCase):
+    WEB_FORM = json.dumps({
+        "notesPlain": "a \"quoted\" note, with {braces} and [brackets]",
+        "fields": [
+            {"designation": "username", "name": "Email", "value": "me@example.com"},
+            {"designation": "password", "name": "Password", "value": "s3cret"},
+            {"name": "PIN", "type": "T", "value": "1234"},
+        ],
+        "sections": [
+            {"title": "", "fields": [
+                {"t": "one-time password", "n": "TOTP_1", "v": "otpauth://x"},
+            ]},
+        ],
+        "htmlMethod": "post",
+    }, indent=1)
+
+    def test_web_form_fields(self):
+        self.assertEqual("s3cret", find_field(self.WEB_FORM, "password"))
+        self.assertEqual("me@example.com", find_field(self.WEB_FORM, "username"))
+        self.assertEqual("me@example.com", find_field(self.WEB_FORM, "email"))
+        self.assertEqual("1234", find_field(self.WEB_FORM, "pin"))
+
+    def test_section_fields(self):
+        self.assertEqual("otpauth://x",
+                         find_field(self.WEB_FORM, "One-time password"))
+        self.assertEqual("otpauth://x", find_field(self.WEB_FORM, "totp_1"))
+
+    def test_top_level_values(self):
+        self.assertEqual("foobar", find_field('{"password":"foobar"}',
+                                              "Password"))
+        self.assertEqual("post", find_field(self.WEB_FORM, "htmlMethod"))
+        self.assertIsNone(find_field('{"password":["not", "a string"]}',
+                                     "password"))
+
+    def test_first_match_in_the_json_wins(self):
+        decrypted = ('{"password": "top level", "fields": '
+                     '[{"designation": "password", "value": "web form"}]}')
+        self.assertEqual("top level", find_field(decrypted, "password"))
+        decrypted = ('{"fields": [{"designation": "password", '
+                     '"value": "web form"}], "password": "top level"}')
+        self.assertEqual("web form", find_field(decrypted, "password"))
+
+    def test_missing_field(self):
+        self.assertIsNone(find_field(self.WEB_FORM, "nothing"))
+        self.assertIsNone(find_field("{}", "password"))
+        self.assertIsNone(find_field('{"fields": []}', "password"))
+
+    def test_stops_at_the_field(self):
+        decrypted = ('{"fields":[{"designation":"password","value":"x"}],'
+                     ' "notesPlain": "never read')
+        self.assertEqual("x", find_field(decrypted, "password"))
+
+    def test_unexpected_json(self):
+        self.assertIsNone(find_field("[1, 2]", "password"))
+        with self.assertRaises(ValueError):
+            find_field('{"notesPlain": "never finished', "password")
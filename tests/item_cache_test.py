@@ -0,0 +1,88 @@
+import threading
+import time
+from unittest import TestCase
+
+from onepassword.item_cache import DecryptedItemCache
+
+
+class DecryptedItemCacheTest(TestCase):
+    def setUp(self):
+        self.now = 1000
+        self.cache = DecryptedItemCache(max_bytes=10, ttl=60,
+                                        clock=lambda: self.now)
+
+    def test_get(self):
+        self.cache.put("A", b"abc")
+        self.assertEqual(bytearray(b"abc"), self.cache.get("A"))
+        self.assertIsNone(self.cache.get("B"))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        self.cache.put("A", b"aaaa")
+        self.cache.put("B", b"bbbb")
+        self.cache.get("A")
+        self.cache.put("C", b"cccc")
+        self.assertIsNone(self.cache.get("B"))
+        self.assertEqual(bytearray(b"aaaa"), self.cache.get("A"))
+        self.assertEqual(bytearray(b"cccc"), self.cache.get("C"))
+
+    def test_oversized_entries_are_not_cached(self):
+        self.cache.put("A", b"a" * 11)
+        self.assertIsNone(self.cache.get("A"))
+
+    def test_expired_entries_are_evicted(self):
+        self.cache.put("A", b"abc")
+        self.now += 61
+        self.assertIsNone(self.cache.get("A"))
+        self.assertEqual(0, len(self.cache))
+
+    def test_evicted_buffers_are_wiped(self):
+        self.cache.put("A", b"abc")
+        _, data = self.cache._entries["A"]
+        self.cache.discard("A")
+        self.assertEqual(bytearray(b"\x00\x00\x00"), data)
+
+    def test_clear(self):
+        self.cache.put("A", b"abc")
+        _, data = self.cache._entries["A"]
+        self.cache.clear()
+        self.assertEqual(0, len(self.cache))
+        self.assertEqual(bytearray(b"\x00\x00\x00"), data)
+
+    def test_get_returns_a_copy(self):
+        self.cache.put("A", b"abc")
+        data = self.cache.get("A")
+        self.cache.discard("A")
+        self.assertEqual(bytearray(b"abc"), data)
+
+    def test_entries_evicted_during_reads(self):
+        cache = DecryptedItemCache(max_bytes=64)
+        payload = b"x" * 32
+        errors = []
+        stop = threading.Event()
+
+        def evict():
+            while not stop.is_set():
+                cache.put("A", payload)
+                cache.put("B", payload)
+                cache.put("C", payload)
+
+        def read():
+            for _ in range(200):
+                data = cache.get("A")
+                # Give the evicting thread a turn before "parsing" the data.
+                time.sleep(0.0001)
+                if data is not None and bytes(data) != payload:
+                    errors.append(data)
+
+        evictor = threading.Thread(target=evict)
+        evictor.start()
+        try:
+            readers = [threading.Thread(target=read) for _ in range(2)]
+            for reader in readers:
+                reader.start()
+            for reader in readers:
+                reader.join()
+        finally:
+            stop.set()
+            evictor.join()
+        self.assertEqual([], errors)
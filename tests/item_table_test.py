@@ -0,0 +1,134 @@
+from unittest import TestCase
+# Python 2+3 compatibilty
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from onepassword.item_table import ItemTable, find_row, iter_rows
+
+
+class ItemTableTest(TestCase):
+    def setUp(self):
+        self.table = ItemTable([
+            ["B53B2FED1BDF44E1A4E2B9DA942A1C20", "system.Tombstone", "", "",
+                1362335365, "", 0, "Y"],
+            ["8DEA6242DA654AD4879C0269E00846B9", "passwords.Password",
+                "foobar", "foobar", 1362335420, "", 0, "N"],
+            ["A37F72DAE965416EA920D2E4A1D7B256", "webforms.WebForm", "atof",
+                "example.com", 1361021242, "", 0, "N"],
+            ["CEA5EA6531FC4BE9B7D7F89B5BB18B66", "webforms.WebForm",
+                "onetosix", "example.com", 1361021221, "", 0, "N"],
+        ])
+
+    def test_tombstones_are_kept_separately(self):
+        self.assertEqual(3, len(self.table))
+        self.assertEqual(["B53B2FED1BDF44E1A4E2B9DA942A1C20"],
+                         self.table.tombstones)
+        self.assertNotIn("", self.table)
+
+    def test_changed_identifiers(self):
+        other = ItemTable([
+            ["B53B2FED1BDF44E1A4E2B9DA942A1C20", "system.Tombstone", "", "",
+                1362335365, "", 0, "Y"],
+            ["8DEA6242DA654AD4879C0269E00846B9", "system.Tombstone", "", "",
+                1362335999, "", 0, "Y"],
+            ["A37F72DAE965416EA920D2E4A1D7B256", "webforms.WebForm", "atof",
+                "example.com", 1361021300, "", 0, "N"],
+            ["CEA5EA6531FC4BE9B7D7F89B5BB18B66", "webforms.WebForm",
+                "onetosix", "example.com", 1361021221, "", 0, "N"],
+            ["353445AF36AB4B7D857D456768137609", "passwords.Password",
+                "new", "", 1374493858, "", 0, "N"],
+        ])
+        self.assertEqual(
+            set(["8DEA6242DA654AD4879C0269E00846B9",
+                 "A37F72DAE965416EA920D2E4A1D7B256",
+                 "353445AF36AB4B7D857D456768137609"]),
+            self.table.changed_identifiers(other),
+        )
+        self.assertEqual(set(), self.table.changed_identifiers(self.table))
+
+    def test_row(self):
+        self.assertEqual(
+            ("A37F72DAE965416EA920D2E4A1D7B256", "webforms.WebForm", "atof",
+                "example.com", 1361021242),
+            self.table.row(self.table.position("atof")),
+        )
+
+    def test_missing_name(self):
+        self.assertNotIn("onetos", self.table)
+        self.assertIsNone(self.table.position("onetos"))
+
+    def test_repeated_strings_are_shared(self):
+        self.assertIs(self.table.types[1], self.table.types[2])
+        self.assertIs(self.table.domains[1], self.table.domains[2])
+
+    def test_last_row_with_a_name_wins(self):
+        self.table.append(["1234", "webforms.WebForm", "atof", "", 0])
+        self.assertEqual("1234", self.table.row(self.table.position("atof"))[0])
+
+    def test_short_rows(self):
+        self.table.append(["1234", "passwords.Password", "short"])
+        self.table.append(["5678", "webforms.WebForm", "shortish",
+                           "example.org"])
+        self.table.append(["9ABC", "passwords.Password"])
+        self.assertEqual(("1234", "passwords.Password", "short", None, 0),
+                         self.table.row(self.table.position("short")))
+        self.assertEqual(
+            ("5678", "webforms.WebForm", "shortish", "example.org", 0),
+            self.table.row(self.table.position("shortish")),
+        )
+        self.assertEqual(5, len(self.table))
+
+    def test_from_columns(self):
+        columns = self.table.columns()
+        self.assertEqual(self.table.names,
+                         ItemTable.from_columns(columns).names)
+        for malformed in (None, columns[0:6], columns[0:6] + (None,),
+                          (columns[0][0:1],) + columns[1:],
+                          columns[0:4] + (b"xyz",) + columns[5:]):
+            with self.assertRaises(ValueError):
+                ItemTable.from_columns(malformed)
+
+
+class StreamingTest(TestCase):
+    CONTENTS = """ [["B53B2FED1BDF44E1A4E2B9DA942A1C20","system.Tombstone","foobar",
+        "",1362335365,"",0,"Y"],
+      ["8DEA6242DA654AD4879C0269E00846B9", "passwords.Password", "foobar",
+        "foobar", 1362335420, "", 0, "N"] ,
+      ["A37F72DAE965416EA920D2E4A1D7B256","webforms.WebForm","a,t]o\\"f",
+        "example.com",1361021242,"",0,"N"]
+    ]
+"""
+
+    def test_iter_rows(self):
+        for chunk_size in (1, 7, 64, 4096):
+            rows = list(iter_rows(StringIO(self.CONTENTS), chunk_size))
+            self.assertEqual(["system.Tombstone", "passwords.Password",
+                              "webforms.WebForm"],
+                             [row[1] for row in rows])
+            self.assertEqual('a,t]o"f', rows[2][2])
+
+    def test_empty_contents(self):
+        self.assertEqual([], list(iter_rows(StringIO("[]"))))
+
+    def test_truncated_contents(self):
+        with self.assertRaises(ValueError):
+            list(iter_rows(StringIO(self.CONTENTS[0:150]), 16))
+        with self.assertRaises(ValueError):
+            list(iter_rows(StringIO("")))
+
+    def test_find_row_skips_tombstones(self):
+        row = find_row(StringIO(self.CONTENTS), "foobar")
+        self.assertEqual("8DEA6242DA654AD4879C0269E00846B9", row[0])
+        self.assertIsNone(find_row(StringIO(self.CONTENTS), "missing"))
+
+    def test_find_row_stops_at_the_match(self):
+        contents = StringIO('[["A","passwords.Password","a","",1,"",0,"N"],'
+                            + "this isn't JSON")
+        self.assertEqual("A", find_row(contents, "a")[0])
+
+    def test_find_row_skips_short_rows(self):
+        contents = StringIO('[["A","passwords.Password"],'
+                            '["B","passwords.Password","b"]]')
+        self.assertEqual("B", find_row(contents, "b")[0])
@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import time
+from mock import patch
+from unittest import TestCase
+
+from onepassword.key_cache import DerivedKeyCache
+
+
+class DerivedKeyCacheTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.source = os.path.join(self.directory, "encryptionKeys.js")
+        self.write_source("{}")
+        self.cache_directory = os.path.join(self.directory, "keys")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_cached_derivation(self):
+        self.build_cache().store("badger", b"SALT", 1000, b"K" * 32)
+        self.assertEqual(b"K" * 32, self.build_cache().get("badger", b"SALT", 1000))
+
+    def test_missing_derivation(self):
+        cache = self.build_cache()
+        cache.store("badger", b"SALT", 1000, b"K" * 32)
+        self.assertIsNone(cache.get("badger", b"SALT", 2000))
+        self.assertIsNone(cache.get("badger", b"PEPPER", 1000))
+
+    def test_incorrect_password(self):
+        cache = self.build_cache()
+        cache.store("badger", b"SALT", 1000, b"K" * 32)
+        self.assertIsNone(cache.get("not right", b"SALT", 1000))
+
+    def test_entries_are_private(self):
+        self.build_cache().store("badger", b"SALT", 1000, b"K" * 32)
+        for filename in os.listdir(self.cache_directory):
+            path = os.path.join(self.cache_directory, filename)
+            self.assertEqual(0o600, os.stat(path).st_mode & 0o777)
+
+    def test_expired_entries_are_wiped(self):
+        self.build_cache(ttl=-1).store("badger", b"SALT", 1000, b"K" * 32)
+        self.assertIsNone(self.build_cache().get("badger", b"SALT", 1000))
+        self.assertEqual([], os.listdir(self.cache_directory))
+
+    def test_store_wipes_expired_entries(self):
+        cache = self.build_cache()
+        cache.store("badger", b"SALT", 1000, b"K" * 32)
+        with patch("onepassword.key_cache.time.time",
+                   return_value=time.time() + 120):
+            cache.store("badger", b"PEPPER", 1000, b"K" * 32)
+        self.assertEqual(1, len(os.listdir(self.cache_directory)))
+        self.assertEqual(b"K" * 32, cache.get("badger", b"PEPPER", 1000))
+
+    def test_changed_source_invalidates_entries(self):
+        self.build_cache().store("badger", b"SALT", 1000, b"K" * 32)
+        self.write_source('{"list": []}')
+        self.assertIsNone(self.build_cache().get("badger", b"SALT", 1000))
+        self.assertEqual([], os.listdir(self.cache_directory))
+
+    def test_purge(self):
+        self.build_cache().store("badger", b"SALT", 1000, b"K" * 32)
+        DerivedKeyCache.purge(self.cache_directory)
+        self.assertEqual([], os.listdir(self.cache_directory))
+
+    def build_cache(self, ttl=60):
+        return DerivedKeyCache(self.source, directory=self.cache_directory,
+                               ttl=ttl)
+
+    def write_source(self, contents):
+        with open(self.source, "w") as f:
+            f.write(contents)
@@ -1,8 +1,18 @@
-from mock import Mock
+import json
+from mock import Mock, patch
 import os
-from unittest import TestCase
+import shutil
+import tempfile
+from unittest import TestCase, skipIf
+# inotify_simple is optional
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
 
-from onepassword.keychain import Keychain, KeychainItem
+from onepassword.encryption_key import EncryptionKey
+from onepassword.item_cache import DecryptedItemCache
+from onepassword.keychain import Keychain, KeychainItem, KeychainLockedError
 
 
 class KeychainTest(TestCase):
@@ -12,6 +22,309 @@ class KeychainTest(TestCase):
         self.assertTrue(keychain.unlock("badger"))
         self.assertFalse(keychain.locked)
 
+    def test_parallel_unlock(self):
+        keychain = Keychain(self.data_path)
+        self.assertFalse(keychain.unlock("not right", workers=2))
+        self.assertTrue(keychain.locked)
+        self.assertTrue(keychain.unlock("badger", workers=2))
+        self.assertFalse(keychain.locked)
+        for key in keychain._encryption_keys.values():
+            self.assertTrue(key.unlocked)
+
+    def test_lazy_unlock(self):
+        keychain = Keychain(self.data_path)
+        self.assertTrue(keychain.unlock("badger", lazy=True))
+        self.assertFalse(keychain.locked)
+        sl3_key = keychain._encryption_keys["CBB027E25BA74210ADD287F3037817EE"]
+        self.assertFalse(sl3_key.unlocked)
+
+        key = keychain.key(security_level="SL3")
+        self.assertIs(sl3_key, key)
+        self.assertTrue(key.unlocked)
+
+    def test_lazy_unlock_with_incorrect_password(self):
+        keychain = Keychain(self.data_path)
+        self.assertFalse(keychain.unlock("not right", lazy=True))
+        self.assertTrue(keychain.locked)
+        self.assertFalse(keychain.key(security_level="SL3").unlocked)
+
+    def test_exact_item_lookup_skips_fuzzy_matching(self):
+        keychain = Keychain(self.data_path)
+        keychain.unlock("badger")
+        with patch("onepassword.keychain.SearchIndex") as search_index:
+            self.assertEqual("foobar", keychain.item("foobar").password)
+            self.assertEqual("flibble",
+                             keychain.item("generic  ACCOUNT").password)
+            self.assertFalse(search_index.called)
+
+    def test_iter_decrypted(self):
+        keychain = Keychain(self.data_path)
+        keychain.unlock("badger")
+        for workers in (1, 3):
+            decrypted = [
+                (item.name, contents)
+                for item, contents in keychain.iter_decrypted(workers=workers)
+            ]
+            self.assertEqual(
+                ["foobar", "atof", "onetosix", "Generic Account"],
+                [name for name, _ in decrypted],
+            )
+            self.assertEqual({"password": "foobar"}, decrypted[0][1])
+
+    def test_iter_decrypted_uses_decrypt_many(self):
+        keychain = Keychain(self.data_path)
+        keychain.unlock("badger")
+        with patch.object(EncryptionKey, "decrypt") as decrypt:
+            names = [item.name for item, _ in keychain.iter_decrypted()]
+        self.assertEqual(["foobar", "atof", "onetosix", "Generic Account"],
+                         names)
+        self.assertFalse(decrypt.called)
+
+    def test_iter_decrypted_does_not_keep_item_data(self):
+        keychain = Keychain(self.data_path)
+        keychain.unlock("badger")
+        for item, _ in keychain.iter_decrypted():
+            self.assertFalse(hasattr(item, "_decrypted_json"))
+            self.assertFalse(hasattr(item, "_encrypted_json"))
+            self.assertIsNone(item.password)
+
+    def test_prefetch_metadata(self):
+        keychain = Keychain(self.data_path)
+        keychain.prefetch_metadata(workers=2)
+        with patch.object(KeychainItem, "_read_data_file") as read_data_file:
+            onetosix = keychain._build_item(keychain._items.position("onetosix"))
+            atof = keychain._build_item(keychain._items.position("atof"))
+            self.assertEqual("525E210E0B4C49799D7E47DD8E789C78",
+                             onetosix.key_identifier)
+            self.assertIsNone(onetosix.security_level)
+            self.assertIsNone(atof.key_identifier)
+            self.assertEqual("SL5", atof.security_level)
+            self.assertFalse(read_data_file.called)
+
+        keychain.unlock("badger")
+        self.assertEqual("123456", keychain.item("onetosix").password)
+
+    def test_prefetch_metadata_for_named_items(self):
+        keychain = Keychain(self.data_path)
+        keychain.prefetch_metadata(["foobar", "does-not-exist"])
+        self.assertEqual(["8DEA6242DA654AD4879C0269E00846B9"],
+                         list(keychain._metadata.keys()))
+
+    def test_prefetched_items_are_read_once(self):
+        keychain = Keychain(self.data_path)
+        keychain.unlock("badger", lazy=True)
+        with patch("onepassword.keychain.open", create=True,
+                   side_effect=open) as opened:
+            keychain.prefetch_metadata(["foobar", "onetosix"])
+            self.assertEqual("foobar", keychain.item("foobar").password)
+            self.assertEqual("123456", keychain.item("onetosix").password)
+        self.assertEqual(2, opened.call_count)
+
+    def test_tracer(self):
+        spans = []
+        keychain = Keychain(self.data_path, tracer=spans.append)
+        keychain.unlock("badger")
+        self.assertEqual("123456", keychain.item("onetosx",
+                                                 fuzzy_threshold=70).password)
+        self.assertEqual(
+            ["load keys", "load items", "unlock key", "unlock key", "match",
+             "read item", "decrypt"],
+            [span.name for span in spans],
+        )
+        self.assertEqual(set(["SL3", "SL5"]), set(
+            span.attributes["level"] for span in spans
+            if span.name == "unlock key"
+        ))
+
+    def test_no_tracer(self):
+        keychain = Keychain(self.data_path)
+        self.assertNotIn("_find_name", vars(keychain))
+        for key in keychain._encryption_keys.values():
+            self.assertNotIn("decrypt", vars(key))
+            self.assertNotIn("_decrypt_into", vars(key))
+
+    def test_item_for_url(self):
+        keychain = Keychain(self.data_path)
+        keychain.unlock("badger")
+        # atof and onetosix share a domain; atof was updated more recently.
+        item = keychain.item_for_url("https://www.example.com/login")
+        self.assertEqual("atof", item.name)
+        self.assertEqual("abcdef", item.password)
+        self.assertEqual("example.com", item.domain)
+        self.assertIsNone(keychain.item_for_url("https://example.org/"))
+
+    def test_stream_items(self):
+        keychain = Keychain(self.data_path, stream_items=True)
+        keychain.unlock("badger")
+        self.assertEqual("123456", keychain.item("onetosix").password)
+        self.assertIsNone(keychain._item_table)
+
+        self.assertEqual("flibble",
+                         keychain.item("generic  ACCOUNT").password)
+        self.assertIsNotNone(keychain._item_table)
+
+    def test_stream_items_with_duplicate_names(self):
+        path = self.copy_keychain()
+
+        def rename_atof(rows):
+            for row in rows:
+                if row[2] == "atof":
+                    row[2] = "onetosix"
+        self.rewrite_json(path, "contents.js", rename_atof)
+
+        streamed = Keychain(path, stream_items=True)
+        streamed.unlock("badger")
+        self.assertEqual("A37F72DAE965416EA920D2E4A1D7B256",
+                         streamed.item("onetosix").identifier)
+
+        loaded = Keychain(path)
+        loaded.unlock("badger")
+        self.assertEqual("CEA5EA6531FC4BE9B7D7F89B5BB18B66",
+                         loaded.item("onetosix").identifier)
+
+    def test_index_built_during_a_reload_is_not_kept(self):
+        keychain = Keychain(self.data_path)
+
+        def build(items):
+            keychain._load_item_list()
+            return {}
+
+        self.assertEqual({}, keychain._derived("_normalised_names", build))
+        self.assertIsNone(keychain._normalised_names)
+        self.assertEqual(("onetosix", 101),
+                         keychain._find_name("ONETOSIX ", 100))
+        self.assertIsNotNone(keychain._normalised_names)
+
+    def test_refresh_after_streaming(self):
+        path = self.copy_keychain()
+        item_cache = DecryptedItemCache()
+        keychain = Keychain(path, item_cache=item_cache, stream_items=True)
+        keychain.unlock("badger")
+        keychain.item("foobar")
+        self.assertFalse(keychain.refresh())
+
+        self.rewrite_json(path, "contents.js", lambda rows: None)
+        self.assertTrue(keychain.refresh())
+        self.assertEqual(0, len(item_cache))
+
+    def test_item_cache(self):
+        item_cache = DecryptedItemCache()
+        keychain = Keychain(self.data_path, item_cache=item_cache)
+        keychain.unlock("badger")
+        self.assertEqual("123456", keychain.item("onetosix").password)
+        self.assertEqual(1, len(item_cache))
+
+        with patch.object(KeychainItem, "decrypt_with") as decrypt_with:
+            self.assertEqual("123456", keychain.item("onetosix").password)
+            self.assertFalse(decrypt_with.called)
+
+    def test_lock(self):
+        item_cache = DecryptedItemCache()
+        keychain = Keychain(self.data_path, item_cache=item_cache)
+        keychain.unlock("badger")
+        keychain.item("onetosix")
+
+        keychain.lock()
+        self.assertTrue(keychain.locked)
+        self.assertEqual(0, len(item_cache))
+        for key in keychain._encryption_keys.values():
+            self.assertFalse(key.unlocked)
+
+    def test_refresh(self):
+        path = self.copy_keychain()
+        item_cache = DecryptedItemCache()
+        keychain = Keychain(path, item_cache=item_cache)
+        keychain.unlock("badger")
+        self.assertEqual("foobar", keychain.item("foobar").password)
+        self.assertFalse(keychain.refresh())
+
+        self.rewrite_json(path, "contents.js",
+                          lambda rows: rows[1].__setitem__(2, "renamed"))
+
+        self.assertTrue(keychain.refresh())
+        self.assertEqual(0, len(item_cache))
+        self.assertIsNone(keychain.item("foobar"))
+        self.assertEqual("foobar", keychain.item("renamed").password)
+        self.assertFalse(keychain.refresh())
+
+    def test_refresh_only_forgets_changed_items(self):
+        path = self.copy_keychain()
+        item_cache = DecryptedItemCache()
+        keychain = Keychain(path, item_cache=item_cache)
+        keychain.unlock("badger")
+        keychain.item("foobar")
+        keychain.item("onetosix")
+        search_index = keychain._search_index
+
+        self.rewrite_json(path, "contents.js",
+                          lambda rows: rows[1].__setitem__(4, 1400000000))
+
+        self.assertTrue(keychain.refresh())
+        self.assertEqual(1, len(item_cache))
+        self.assertIsNotNone(item_cache.get("CEA5EA6531FC4BE9B7D7F89B5BB18B66"))
+        self.assertIs(search_index, keychain._search_index)
+
+    def test_refresh_encryption_keys(self):
+        path = self.copy_keychain()
+        keychain = Keychain(path)
+        keychain.unlock("badger")
+        sl5_key = keychain.key(security_level="SL5")
+
+        self.rewrite_json(path, "encryptionKeys.js",
+                          lambda keys: keys["list"][1].update(iterations=1000))
+
+        self.assertTrue(keychain.refresh())
+        self.assertTrue(keychain.locked)
+        self.assertIs(sl5_key, keychain.key(security_level="SL5"))
+        self.assertFalse(keychain.key(security_level="SL3").unlocked)
+
+    def test_refresh_keys_that_no_longer_unlock(self):
+        path = self.copy_keychain()
+        keychain = Keychain(path)
+        keychain.watch(interval=0)
+        self.addCleanup(keychain.close)
+        keychain.unlock("badger")
+
+        # Keys encrypted with a new master password won't derive.
+        self.rewrite_json(path, "encryptionKeys.js",
+                          lambda keys: keys["list"][0].update(iterations=1000))
+
+        with self.assertRaises(KeychainLockedError):
+            keychain.item("onetosix")
+        self.assertTrue(keychain.locked)
+        with self.assertRaises(KeychainLockedError):
+            keychain.item("foobar")
+
+    @skipIf(inotify_simple is None, "inotify_simple isn't installed")
+    def test_watch_notices_changed_item_files(self):
+        path = self.copy_keychain()
+        item_cache = DecryptedItemCache()
+        keychain = Keychain(path, item_cache=item_cache)
+        keychain.watch()
+        self.addCleanup(keychain.close)
+        keychain.unlock("badger")
+        keychain.item("foobar")
+        keychain.item("onetosix")
+
+        self.rewrite_json(path, "8DEA6242DA654AD4879C0269E00846B9.1password",
+                          lambda item: None)
+
+        self.assertEqual("123456", keychain.item("onetosix").password)
+        self.assertEqual(1, len(item_cache))
+        self.assertIsNone(item_cache.get("8DEA6242DA654AD4879C0269E00846B9"))
+
+    def test_lock_closes_the_watcher(self):
+        keychain = Keychain(self.data_path)
+        keychain.watch()
+        watcher = keychain._watcher
+        keychain.unlock("badger")
+        with patch.object(watcher, "close",
+                          wraps=watcher.close) as close:
+            keychain.lock()
+            keychain.close()
+        close.assert_called_once_with()
+        self.assertIsNone(keychain._watcher)
+
     def test_key_by_security_level(self):
         keychain = Keychain(self.data_path)
         key = keychain.key(security_level="SL5")
@@ -34,6 +347,23 @@ class KeychainTest(TestCase):
         key = keychain.key(identifier="not-a-real-key")
         self.assertIsNone(key)
 
+    def copy_keychain(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "1Password.agilekeychain")
+        shutil.copytree(self.data_path, path)
+        return path
+
+    def rewrite_json(self, path, filename, change):
+        file_path = os.path.join(path, "data", "default", filename)
+        with open(file_path, "r") as f:
+            data = json.load(f)
+        change(data)
+        with open(file_path, "w") as f:
+            json.dump(data, f)
+        # Make sure the file looks different even if the clock is coarse.
+        os.utime(file_path, (0, 0))
+
     @property
     def data_path(self):
         return os.path.join(os.path.dirname(__file__), "data", "1Password.agilekeychain")
@@ -45,6 +375,10 @@ class KeychainItemTest(TestCase):
         self.assertEqual("onetosix", item.name)
         self.assertEqual("CEA5EA6531FC4BE9B7D7F89B5BB18B66", item.identifier)
 
+    def test_items_have_no_instance_dictionary(self):
+        item = KeychainItem.build(self.example_row, path=self.data_path)
+        self.assertFalse(hasattr(item, "__dict__"))
+
     def test_key_identifier(self):
         item = KeychainItem.build(self.example_row, path=self.data_path)
         self.assertEqual("525E210E0B4C49799D7E47DD8E789C78", item.key_identifier)
@@ -57,6 +391,17 @@ class KeychainItemTest(TestCase):
         )
         self.assertEqual("SL5", item.security_level)
 
+    def test_read_metadata(self):
+        item = KeychainItem.build(self.example_row, path=self.data_path)
+        self.assertEqual(("525E210E0B4C49799D7E47DD8E789C78", None),
+                         item.read_metadata())
+        self.assertFalse(hasattr(item, "_encrypted_json"))
+
+    def test_read_metadata_with_missing_file(self):
+        row = ["0" * 32] + self.example_row[1:]
+        item = KeychainItem.build(row, path=self.data_path)
+        self.assertIsNone(item.read_metadata())
+
     def test_decrypt(self):
         mock_key = Mock()
         mock_key.decrypt.return_value = """{"fields":[
@@ -0,0 +1,74 @@
+import json
+import os
+import shutil
+import tempfile
+from mock import patch
+from unittest import TestCase
+
+from onepassword.name_cache import NameCache
+
+
+class NameCacheTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.keychain_path = os.path.join(self.directory, "1P.agilekeychain")
+        os.makedirs(os.path.join(self.keychain_path, "data", "default"))
+        self.write_contents(["GitHub", "github.com", "Gmail", "mail", "mail"])
+        self.cache = NameCache(os.path.join(self.directory, "cache"))
+
+    def test_complete(self):
+        self.assertEqual(["GitHub", "github.com"],
+                         self.cache.complete(self.keychain_path, "git"))
+        self.assertEqual(["GitHub", "github.com", "Gmail"],
+                         self.cache.complete(self.keychain_path, "G"))
+        self.assertEqual(["mail"], self.cache.complete(self.keychain_path, "m"))
+        self.assertEqual([], self.cache.complete(self.keychain_path, "z"))
+
+    def test_all_names(self):
+        self.assertEqual(["GitHub", "github.com", "Gmail", "mail"],
+                         self.cache.complete(self.keychain_path, ""))
+
+    def test_cached_names_are_used(self):
+        self.cache.complete(self.keychain_path, "g")
+        with patch("onepassword.name_cache.json.load") as json_load:
+            self.assertEqual(["mail"],
+                             self.cache.complete(self.keychain_path, "m"))
+        self.assertFalse(json_load.called)
+
+    def test_changed_contents(self):
+        self.cache.complete(self.keychain_path, "g")
+        self.write_contents(["GitLab"])
+        self.assertEqual(["GitLab"],
+                         self.cache.complete(self.keychain_path, "g"))
+
+    def test_corrupt_cache(self):
+        self.cache.complete(self.keychain_path, "g")
+        cache_path = self.cache._cache_path(self.contents_path)
+        with open(cache_path, "wb") as f:
+            f.write(b"not marshal data")
+        self.assertEqual(["mail"], self.cache.complete(self.keychain_path, "m"))
+
+    def test_cache_is_private(self):
+        self.cache.complete(self.keychain_path, "g")
+        cache_path = self.cache._cache_path(self.contents_path)
+        self.assertEqual(0o600, os.stat(cache_path).st_mode & 0o777)
+
+    def write_contents(self, names):
+        rows = [
+            ["B53B2FED1BDF44E1A4E2B9DA942A1C20", "system.Tombstone", "gone",
+                "", 1362335365, "", 0, "Y"],
+        ]
+        for number, name in enumerate(names):
+            rows.append(["%032X" % number, "webforms.WebForm", name,
+                         "example.com", 1361021242, "", 0, "N"])
+        with open(self.contents_path, "w") as f:
+            json.dump(rows, f)
+        # Make sure the change is noticed even within the mtime resolution.
+        stat = os.stat(self.contents_path)
+        os.utime(self.contents_path, (stat.st_atime, stat.st_mtime + len(rows)))
+
+    @property
+    def contents_path(self):
+        return os.path.join(self.keychain_path, "data", "default",
+                            "contents.js")
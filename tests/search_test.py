@@ -0,0 +1,102 @@
+import random
+from unittest import TestCase
+
+from fuzzywuzzy import process
+
+from onepassword.search import SearchIndex, normalise, trigrams
+
+
+class NormaliseTest(TestCase):
+    def test_case_is_folded(self):
+        self.assertEqual("google: personal", normalise("Google: PERSONAL"))
+
+    def test_whitespace_is_collapsed(self):
+        self.assertEqual("generic account", normalise(" Generic \t Account "))
+
+
+class TrigramsTest(TestCase):
+    def test_trigrams_of_each_word(self):
+        self.assertEqual(
+            set([" ab", "ab ", " cd", "cde", "de "]),
+            trigrams("ab cde"),
+        )
+
+    def test_trigrams_of_empty_name(self):
+        self.assertEqual(set(), trigrams(""))
+
+
+class SearchIndexTest(TestCase):
+    def setUp(self):
+        self.index = SearchIndex([
+            "Google: personal",
+            "Google: work",
+            "foobar",
+            "onetosix",
+            "Generic Account",
+        ])
+
+    def test_exact_match(self):
+        self.assertEqual(("foobar", 100), self.index.best_match("foobar"))
+
+    def test_fuzzy_match(self):
+        self.assertEqual("foobar", self.index.best_match("foobr")[0])
+        self.assertEqual("Google: work", self.index.best_match("google wrk")[0])
+
+    def test_score_cutoff(self):
+        self.assertIsNone(self.index.best_match("onetos", score_cutoff=99))
+
+    def test_query_without_shared_trigrams_scores_every_name(self):
+        self.assertIsNotNone(self.index.best_match("zzz", score_cutoff=0))
+        self.assertIsNone(self.index.best_match("zzz", score_cutoff=50))
+
+    def test_candidate_limit(self):
+        index = SearchIndex(["example", "exam", "examples"], candidate_limit=1)
+        self.assertEqual(("example", 100), index.best_match("example"))
+
+    def test_ties_are_broken_in_name_order(self):
+        index = SearchIndex(["b example", "a example"])
+        self.assertEqual("b example", index.best_match("example")[0])
+
+    def test_short_names_are_candidates(self):
+        names = ["GitHub: %s %d" % (word, n)
+                 for n, word in enumerate(["work", "personal"] * 5)]
+        index = SearchIndex(names + ["Git"], candidate_limit=2)
+        self.assertEqual(("Git", 90), index.best_match("git personal"))
+
+    def test_reordered_words_are_candidates(self):
+        names = ["personal Google %d" % n for n in range(5)]
+        index = SearchIndex(names + ["work Google"], candidate_limit=2)
+        self.assertEqual("work Google", index.best_match("Google work")[0])
+
+    def test_same_match_as_scoring_every_name(self):
+        generator = random.Random(1)
+        services = ["GitHub", "Git", "Google", "Gmail", "Amazon Web Services",
+                    "Bank of Scotland", "DigitalOcean", "Slack"]
+        qualifiers = ["personal", "work", "staging", "billing", "admin"]
+        names = []
+        for n in range(150):
+            service = generator.choice(services)
+            qualifier = generator.choice(qualifiers)
+            if generator.random() < 0.7:
+                names.append("%s: %s %d" % (service, qualifier, n))
+            else:
+                names.append("%s %s" % (qualifier, service))
+        queries = []
+        for name in generator.sample(names, 10):
+            words = name.split()
+            dropped = generator.randrange(len(name))
+            queries.extend([
+                name[:dropped] + name[dropped + 1:],
+                " ".join(reversed(words)),
+                words[0],
+                words[0][:4],
+                "%s %s" % (generator.choice(qualifiers),
+                           generator.choice(services)),
+            ])
+        index = SearchIndex(names, candidate_limit=5)
+        for query in queries:
+            self.assertEqual(
+                process.extractOne(query, names),
+                index.best_match(query),
+                query,
+            )
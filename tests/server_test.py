@@ -0,0 +1,225 @@
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+from unittest import TestCase
+# Python 2+3 compatibilty
+try:
+    from http.client import HTTPConnection
+except ImportError:
+    from httplib import HTTPConnection
+
+from onepassword import Keychain
+from onepassword.agent import AgentError
+from onepassword.server import SecretServer, ServerStats
+
+
+class UnixHTTPConnection(HTTPConnection):
+    def __init__(self, socket_path):
+        HTTPConnection.__init__(self, "localhost")
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+class ServerTestCase(TestCase):
+    def start_server(self, keychain=None, **options):
+        if keychain is None:
+            keychain = Keychain(self.keychain_path)
+            keychain.unlock("badger")
+        self.server = SecretServer(keychain, **options)
+        self.server.listen()
+        thread = threading.Thread(target=self.server.serve)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.shutdown)
+
+    def request(self, connection, method, path, body=None, headers={}):
+        if body is not None:
+            body = json.dumps(body)
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read().decode("utf-8"))
+
+    @property
+    def keychain_path(self):
+        return os.path.join(os.path.dirname(__file__), "data",
+                            "1Password.agilekeychain")
+
+
+class UnixSocketServerTest(ServerTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.socket_path = os.path.join(directory, "server.sock")
+        self.start_server(socket_path=self.socket_path)
+        self.connection = UnixHTTPConnection(self.socket_path)
+        self.addCleanup(self.connection.close)
+
+    def test_requests_share_a_connection(self):
+        self.assertEqual(
+            (200, {"item": {"name": "onetosix", "password": "123456"}}),
+            self.request(self.connection, "GET", "/item?name=onetosix"),
+        )
+        first_socket = self.connection.sock
+        self.assertEqual(
+            (200, {"item": {"name": "foobar", "password": "foobar"}}),
+            self.request(self.connection, "POST", "/item",
+                         {"name": "foobr", "fuzzy_threshold": 70}),
+        )
+        self.assertEqual(
+            (404, {"item": None}),
+            self.request(self.connection, "GET", "/item?name=onetos"),
+        )
+        self.assertIs(first_socket, self.connection.sock)
+
+    def test_batch(self):
+        status, body = self.request(self.connection, "POST", "/batch",
+                                    {"names": ["foobar", "onetos", "atof"]})
+        self.assertEqual(200, status)
+        self.assertEqual(["foobar", None, "abcdef"], [
+            item and item["password"] for item in body["items"]
+        ])
+
+    def test_bad_requests(self):
+        self.assertEqual(400, self.request(self.connection, "POST", "/batch",
+                                           {"names": "foobar"})[0])
+        self.assertEqual(400, self.request(self.connection, "POST", "/item",
+                                           {})[0])
+        self.assertEqual(404, self.request(self.connection, "GET", "/nope")[0])
+
+    def test_invalid_content_length(self):
+        for length in ("-1", "abc"):
+            connection = UnixHTTPConnection(self.socket_path)
+            self.addCleanup(connection.close)
+            connection.connect()
+            connection.sock.settimeout(5)
+            connection.putrequest("POST", "/item")
+            connection.putheader("Content-Length", length)
+            connection.endheaders()
+            response = connection.getresponse()
+            self.assertEqual(400, response.status)
+            self.assertEqual("close", response.getheader("Connection"))
+
+    def test_socket_in_use(self):
+        server = SecretServer(self.server.keychain,
+                              socket_path=self.socket_path)
+        self.assertRaises(AgentError, server.listen)
+
+    def test_stats(self):
+        self.request(self.connection, "POST", "/batch",
+                     {"names": ["foobar", "atof"]})
+        self.request(self.connection, "POST", "/item", {})
+        status, stats = self.request(self.connection, "GET", "/stats")
+        self.assertEqual(200, status)
+        self.assertEqual(2, stats["requests"])
+        self.assertEqual(2, stats["items"])
+        self.assertEqual(1, stats["errors"])
+        self.assertIn("p99", stats["latency_ms"])
+
+    def test_socket_is_private(self):
+        self.assertEqual(0o600, os.stat(self.socket_path).st_mode & 0o777)
+
+
+class TCPServerTest(ServerTestCase):
+    def setUp(self):
+        self.start_server(port=0, token="s3cret")
+        self.connection = HTTPConnection("127.0.0.1", self.server.port)
+        self.addCleanup(self.connection.close)
+
+    def test_token_is_required(self):
+        self.assertEqual(401, self.request(
+            self.connection, "GET", "/item?name=foobar")[0])
+        self.assertEqual(401, self.request(
+            self.connection, "GET", "/item?name=foobar",
+            headers={"Authorization": "Bearer wrong"})[0])
+        self.assertEqual(200, self.request(
+            self.connection, "GET", "/item?name=foobar",
+            headers={"Authorization": "Bearer s3cret"})[0])
+
+    def test_listens_on_loopback(self):
+        self.assertEqual("http://127.0.0.1:%d" % self.server.port,
+                         self.server.address)
+
+    def test_token_must_be_set(self):
+        with self.assertRaises(ValueError):
+            SecretServer(None, port=0)
+
+
+class ChangedKeysServerTest(ServerTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, "1Password.agilekeychain")
+        shutil.copytree(self.keychain_path, self.path)
+        self.socket_path = os.path.join(directory, "server.sock")
+        self.connection = UnixHTTPConnection(self.socket_path)
+        self.addCleanup(self.connection.close)
+
+    def test_watched_keychain_derives_changed_keys(self):
+        keychain = Keychain(self.path)
+        keychain.watch(interval=0)
+        self.addCleanup(self.close_watcher, keychain)
+        keychain.unlock("badger", workers=4)
+        self.start_server(keychain, socket_path=self.socket_path,
+                          refresh_interval=0)
+
+        self.change_keys(lambda key: key.update(data=key["data"] + "\n"))
+
+        self.assertEqual(
+            (200, {"item": {"name": "onetosix", "password": "123456"}}),
+            self.request(self.connection, "GET", "/item?name=onetosix"),
+        )
+
+    def test_changed_keys_lock_a_keychain_without_the_password(self):
+        keychain = Keychain(self.path)
+        keychain.unlock("badger", workers=4)
+        self.start_server(keychain, socket_path=self.socket_path,
+                          refresh_interval=0)
+
+        self.change_keys(lambda key: key.update(data=key["data"] + "\n"))
+
+        self.assertEqual(
+            (503, {"error": "The keychain is locked"}),
+            self.request(self.connection, "GET", "/item?name=onetosix"),
+        )
+
+    def change_keys(self, change):
+        # Appending a newline changes each key's definition without changing
+        # what it decodes to, like a sync rewriting the file.
+        path = os.path.join(self.path, "data", "default", "encryptionKeys.js")
+        with open(path, "r") as f:
+            keys = json.load(f)
+        for key in keys["list"]:
+            change(key)
+        with open(path, "w") as f:
+            json.dump(keys, f)
+        # Make sure the file looks different even if the clock is coarse.
+        os.utime(path, (0, 0))
+
+    def close_watcher(self, keychain):
+        close = getattr(keychain._watcher, "close", None)
+        if close is not None:
+            close()
+
+
+class ServerStatsTest(TestCase):
+    def test_snapshot(self):
+        now = [100.0]
+        stats = ServerStats(clock=lambda: now[0])
+        for latency in (0.001, 0.002, 0.003, 0.004):
+            stats.record(latency, items=2)
+        stats.record(0.1, error=True)
+        now[0] = 105.0
+
+        snapshot = stats.snapshot()
+        self.assertEqual(5, snapshot["requests"])
+        self.assertEqual(8, snapshot["items"])
+        self.assertEqual(1, snapshot["errors"])
+        self.assertEqual(1.0, snapshot["requests_per_second"])
+        self.assertEqual(3.0, snapshot["latency_ms"]["p50"])
+        self.assertEqual(100.0, snapshot["latency_ms"]["max"])
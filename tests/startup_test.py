@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase, skipIf
+
+
+@skipIf(sys.version_info < (3, 7), "-X importtime needs Python 3.7")
+class StartupTest(TestCase):
+    def test_cli_does_not_import_heavy_dependencies(self):
+        imported = self.imported_modules("import onepassword.cli")
+        self.assertIn("onepassword.cli", imported)
+        self.assertNotIn("fuzzywuzzy", imported)
+        self.assertNotIn("Crypto", imported)
+        self.assertNotIn("onepassword.server", imported)
+
+    def imported_modules(self, code):
+        root = os.path.join(os.path.dirname(__file__), "..")
+        process = subprocess.Popen(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=root,
+            stderr=subprocess.PIPE,
+        )
+        _, output = process.communicate()
+        self.assertEqual(0, process.returncode)
+        return set(
+            line.split("|")[-1].strip()
+            for line in output.decode("utf-8").splitlines()
+            if line.startswith("import time:")
+        )
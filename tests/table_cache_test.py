@@ -0,0 +1,89 @@
+import json
+import marshal
+import os
+import shutil
+import tempfile
+from mock import patch
+from unittest import TestCase
+
+from onepassword import Keychain
+from onepassword.item_table import ItemTable
+from onepassword.table_cache import ItemTableCache
+
+
+class ItemTableCacheTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.contents_path = os.path.join(self.directory, "contents.js")
+        self.write_contents(self.rows)
+        self.cache = ItemTableCache(os.path.join(self.directory, "cache"))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        self.store()
+        table = self.cache.load(self.contents_path)
+        self.assertEqual(["foobar", "atof"], table.names)
+        self.assertEqual(["B53B2FED1BDF44E1A4E2B9DA942A1C20"], table.tombstones)
+        self.assertEqual(
+            ("A37F72DAE965416EA920D2E4A1D7B256", "webforms.WebForm", "atof",
+                "example.com", 1361021242),
+            table.row(table.position("atof")),
+        )
+
+    def test_missing_cache(self):
+        self.assertIsNone(self.cache.load(self.contents_path))
+
+    def test_changed_contents(self):
+        self.store()
+        self.write_contents(self.rows[0:2])
+        self.assertIsNone(self.cache.load(self.contents_path))
+
+    def test_corrupt_cache(self):
+        self.store()
+        cache_path = self.cache._cache_path(self.contents_path)
+        with open(cache_path, "wb") as f:
+            f.write(b"not marshal data")
+        self.assertIsNone(self.cache.load(self.contents_path))
+
+    def test_malformed_cache(self):
+        self.store()
+        cache_path = self.cache._cache_path(self.contents_path)
+        fingerprint = self.cache.fingerprint(self.contents_path)
+        for cached in ((fingerprint, ("not", "columns")), (fingerprint,),
+                       (fingerprint, ItemTable(self.rows).columns()[0:6])):
+            with open(cache_path, "wb") as f:
+                f.write(marshal.dumps(cached))
+            self.assertIsNone(self.cache.load(self.contents_path))
+
+    def test_keychain_uses_cached_table(self):
+        path = os.path.join(os.path.dirname(__file__), "data",
+                            "1Password.agilekeychain")
+        Keychain(path, table_cache=self.cache)
+        with patch("onepassword.keychain.json.load",
+                   side_effect=json.load) as json_load:
+            keychain = Keychain(path, table_cache=self.cache)
+            self.assertEqual(1, json_load.call_count)  # encryptionKeys.js
+
+        keychain.unlock("badger")
+        self.assertEqual("123456", keychain.item("onetosix").password)
+
+    def store(self):
+        fingerprint = self.cache.fingerprint(self.contents_path)
+        self.cache.store(self.contents_path, ItemTable(self.rows), fingerprint)
+
+    def write_contents(self, rows):
+        with open(self.contents_path, "w") as f:
+            json.dump(rows, f)
+
+    @property
+    def rows(self):
+        return [
+            ["B53B2FED1BDF44E1A4E2B9DA942A1C20", "system.Tombstone", "", "",
+                1362335365, "", 0, "Y"],
+            ["8DEA6242DA654AD4879C0269E00846B9", "passwords.Password",
+                "foobar", "foobar", 1362335420, "", 0, "N"],
+            ["A37F72DAE965416EA920D2E4A1D7B256", "webforms.WebForm", "atof",
+                "example.com", 1361021242, "", 0, "N"],
+        ]
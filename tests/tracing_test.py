@@ -0,0 +1,29 @@
+from unittest import TestCase
+
+from onepassword.tracing import Span, summarise, traced
+
+
+class TracingTest(TestCase):
+    def test_traced_reports_each_call(self):
+        spans = []
+        double = traced(spans.append, "double", lambda x: x * 2, unit="x")
+        self.assertEqual(4, double(2))
+        self.assertEqual(1, len(spans))
+        self.assertEqual("double", spans[0].name)
+        self.assertEqual({"unit": "x"}, spans[0].attributes)
+        self.assertTrue(spans[0].duration >= 0)
+
+    def test_traced_reports_failures(self):
+        spans = []
+        fail = traced(spans.append, "fail", lambda: 1 / 0)
+        self.assertRaises(ZeroDivisionError, fail)
+        self.assertEqual(["fail"], [span.name for span in spans])
+
+    def test_summarise(self):
+        spans = [
+            Span("load", 0.0, 1.0, {}),
+            Span("decrypt", 1.0, 1.5, {}),
+            Span("decrypt", 2.0, 2.25, {}),
+        ]
+        self.assertEqual([("load", 1, 1.0), ("decrypt", 2, 0.75)],
+                         summarise(spans))
@@ -0,0 +1,52 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase, skipIf
+from mock import patch
+# inotify_simple is optional
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+from onepassword.watcher import (InotifyWatcher, PollingWatcher,
+                                 WATCHED_FILES, watcher_for)
+
+
+class PollingWatcherTest(TestCase):
+    def test_reports_files_to_check_once_per_interval(self):
+        now = [100.0]
+        watcher = PollingWatcher("/tmp", interval=1, clock=lambda: now[0])
+        self.assertEqual(set(), watcher.changes())
+        now[0] = 101.0
+        self.assertEqual(set(WATCHED_FILES), watcher.changes())
+        self.assertEqual(set(), watcher.changes())
+
+    def test_used_without_inotify_simple(self):
+        with patch.dict("sys.modules", {"inotify_simple": None}):
+            self.assertIsInstance(watcher_for("/tmp"), PollingWatcher)
+
+
+@skipIf(inotify_simple is None, "inotify_simple isn't installed")
+class InotifyWatcherTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.watcher = watcher_for(self.directory)
+        self.addCleanup(self.watcher.close)
+
+    def test_reports_written_and_replaced_files(self):
+        self.assertIsInstance(self.watcher, InotifyWatcher)
+        self.assertEqual(set(), self.watcher.changes())
+
+        self.write("contents.js")
+        self.write("new.tmp")
+        os.rename(os.path.join(self.directory, "new.tmp"),
+                  os.path.join(self.directory, "ABC.1password"))
+        self.assertEqual(set(["contents.js", "new.tmp", "ABC.1password"]),
+                         self.watcher.changes())
+        self.assertEqual(set(), self.watcher.changes())
+
+    def write(self, filename):
+        with open(os.path.join(self.directory, filename), "w") as f:
+            f.write("[]")